@@ -13,26 +13,56 @@ import numpy as np
 # used for clearing the display
 import os
 import s1_game_optimise_for_RL as sg
+import batched_engine as be
+import endgame_solver
+import majority_model
+import game_record
+from belief_tracker import BeliefTracker
+from observation_encoder import ObservationEncoder
 from enum import Enum
 
 class StartupsEnv(Env):
-    def __init__(self, total_players, num_humans, default_company_list, static_agents):
+    def __init__(self, total_players, num_humans, default_company_list, static_agents, reward_samples=32, record_path=None, config=None, exact_reward_threshold=None, analytic_reward=False):
         super().__init__()
+        # rules, action table and observation layout; a config, when given, overrides the companies and player count
+        self.config = config or sg.get_game_config(default_company_list, total_players)
+        total_players = self.config.num_players
+        default_company_list = self.config.companies
         self.total_players = total_players
         self.num_humans = num_humans
         self.game_round = 0
         self.default_company_list = default_company_list
         self.static_agents = static_agents
-        self.num_static_agents = random.choice([0,len(static_agents)])
-        self.company_list, self.player_list, self.deck, self.starting_deck = sg.create_game_RL_with_static(self.default_company_list, self.total_players, self.num_humans, self.static_agents, self.num_static_agents)
+        # every deal, bot decision and seat draw in this env comes from self.rng; reset(seed=...) reseeds it
+        self.rng = random.Random()
+        self.num_static_agents = self.rng.choice([0,len(static_agents)])
+        self.company_list, self.player_list, self.deck, self.starting_deck = sg.create_game_RL_with_static(self.default_company_list, self.total_players, self.num_humans, self.static_agents, self.num_static_agents, rng=self.rng, config=self.config)
         self.agent_player = self.random_RL_player_selection()
         self.other_players = [p for p in self.player_list if p != self.agent_player]
         self.market = []
-        self.state_controller = GameStateController(self.player_list, self.agent_player)
+        self.state_controller = GameStateController(self.player_list, self.agent_player, self.config.hand_size)
         self.last_simulated_score = 0
+        # number of hidden-card deals averaged per reward; the variance of the last estimate is kept for logging
+        self.reward_samples = reward_samples
+        self.reward_variance = 0.0
+        self.reward_rng = np.random.default_rng()
+        # with a threshold, the reward is the exact expectation once at most that many cards are unseen (see
+        # endgame_solver.py); off by default, as it only beats reward_samples deals on the last few cards
+        self.exact_reward_threshold = exact_reward_threshold
+        # analytic_reward: deterministic closed-form reward instead of sampling, see majority_model.py
+        self.analytic_reward = analytic_reward
+        # with record_path every game is appended there as a binary game record, see game_record.py
+        self.record_writer = game_record.RecordWriter(record_path) if record_path else None
+        self.recorder = None
+        self._start_record(None)
+        # what the agent's seat knows about the hidden cards, updated on every move
+        self.beliefs = BeliefTracker(self.company_list, self.player_list)
+        self.encoder = ObservationEncoder(self.config, self.company_list, self.player_list, self.market, self.beliefs)
+        # a row of a caller's batch array to write the agent's observations into (see StartupsVectorEnv)
+        self.observation_out = None
         self._setup_action_space() 
         self.state = self._get_observation()
-        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(self._get_observation().shape[0],), dtype=np.float32)
+        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(self.config.observation_size,), dtype=np.float32)
         
     def step(self, action_id):
         reward = 0
@@ -61,7 +91,7 @@ class StartupsEnv(Env):
         # Execute RL agent's turn
         if self.state_controller.get_current_phase() == TurnPhase.RL_PICKUP and stop == False:
             g_round += 1
-            if not self._return_valid_action_check(action):
+            if not self._is_valid_action_id(action_id):
                 #print(f"Invalid pickup action attempted: {action}")
                 return self.state, reward-10, False, True, {"invalid_action": True}
             try:
@@ -69,6 +99,7 @@ class StartupsEnv(Env):
                 #print(f"Hand size before action: {len(self.agent_player._hand)}")
         
                 sg.execute_pickup(self.agent_player, action, self.market, self.deck)
+                self._record(self.agent_player, action)
                 reward += self._calculate_reward(self.agent_player,g_round) * 0.75
                 #reward += 0.1SS
                 #print(f"Pickup executed. New hand size: {len(self.agent_player._hand)}")
@@ -78,11 +109,12 @@ class StartupsEnv(Env):
                 return self.state, -1, False, True, {"invalid_action": True}
                 
         elif self.state_controller.get_current_phase() == TurnPhase.RL_PUTDOWN and stop == False:
-            if not self._return_valid_action_check(action):
+            if not self._is_valid_action_id(action_id):
                 #print(f"Invalid putdown action attempted: {action}")
                 return self.state, reward-1, False, True, {"invalid_action": True}
             try:
                 sg.execute_putdown(self.agent_player, action, self.player_list, self.market, self.company_list)
+                self._record(self.agent_player, action)
                 #reward += 0.1
                 #print(f"Putdown executed. New hand size: {len(self.agent_player._hand)}")
                 reward += self._calculate_reward(self.agent_player,g_round)
@@ -104,26 +136,35 @@ class StartupsEnv(Env):
         
         if terminated:
             sg.end_game_and_score(self.player_list, self.company_list)
+            self.encoder.refresh()
             reward += self._calculate_final_reward()
-            info = {"final_reward": reward}
+            info = {"final_reward": reward, "rl_rank": self._calculate_player_rank() + 1, "rl_coins": self._get_coins_for_score()}
+            self._finish_record()
         
         self._setup_action_space()
         self.state = self._get_observation()
         
         return self.state, reward, terminated, False, info
 
-    def reset(self):
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is not None:
+            self.rng = random.Random(seed)
+            self.reward_rng = np.random.default_rng(seed)
         #self.static_agents = static_agents
-        self.num_static_agents = random.choice([0,len(self.static_agents)])
-        self.company_list, self.player_list, self.deck, self.starting_deck = sg.create_game_RL_with_static(self.default_company_list, self.total_players, self.num_humans, self.static_agents, self.num_static_agents)
+        self.num_static_agents = self.rng.choice([0,len(self.static_agents or [])])
+        self.company_list, self.player_list, self.deck, self.starting_deck = sg.create_game_RL_with_static(self.default_company_list, self.total_players, self.num_humans, self.static_agents, self.num_static_agents, rng=self.rng, config=self.config)
         self.market = []
         self.game_round = 0
+        self._finish_record()
+        self._start_record(seed)
+        self.beliefs = BeliefTracker(self.company_list, self.player_list)
+        self.encoder = ObservationEncoder(self.config, self.company_list, self.player_list, self.market, self.beliefs)
         self.agent_player = self.random_RL_player_selection()
         self.other_players = [p for p in self.player_list if p != self.agent_player]
-        self.state_controller = GameStateController(self.player_list, self.agent_player)
+        self.state_controller = GameStateController(self.player_list, self.agent_player, self.config.hand_size)
         self._setup_action_space() 
         self.state = self._get_observation()
-        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(self._get_observation().shape[0],), dtype=np.float32)
         return self.state, {"info": "Game reset"}
     """
     def reward_and_return(self, g_round):
@@ -143,84 +184,10 @@ class StartupsEnv(Env):
         return self.state, reward, terminated, False, info
     """
     def _get_observation(self):
-        player = self.agent_player
-        self.other_players = [p for p in self.player_list if p != self.agent_player]
-        # player_coins
-        player_coins = player._coins
-        # player_hand
-        player_hand = list(player._hand) # might want to include card values?
-        # player_shares
-        player_shares = list(player._shares)
-        # player chips
-        player_chips = set(player._chips)
-        #market cards
-        market_cards = list(self.market)
-        # market card coins
-        market_card_coins = [card._coins_on for card in market_cards]
-        # other player shares
-        other_player_shares = [list(player._shares) for player in self.other_players]
-        # other player coins
-        other_player_coins = [player._coins for player in self.other_players]
-        # other player chips
-        other_player_chips = [list(player._chips) for player in self.other_players]
-        # other player hand - REMOVE LATER
-        #ther_player_hand = [player._hand for player in self.other_players]
-        # game phase
-        #game_phase = self.state_controller.get_current_phase()
-
-        # Convert to RL-friendly format - other_player_handREMOVE LATER
-        return self._convert_to_numeric_observation(player_coins, player_hand, player_shares, player_chips, market_cards, market_card_coins, other_player_shares, other_player_coins, other_player_chips) # , other_player_hand
-
-    def _convert_to_numeric_observation(self, player_coins, player_hand, player_shares, player_chips, market_cards, market_card_coins, other_player_shares, other_player_coins, other_player_chips):
-        obs = []
-        obs.append(float(player_coins))
-        
-        # Convert hand to counts
-        player_hand_dict = sg.get_card_dictionary(player_hand)
-        for company in self.company_list:
-            obs.append(float(player_hand_dict.get(company._name, 0)))
-        
-        player_shares_dict = sg.get_card_dictionary(player_shares)
-        for company in self.company_list:
-            obs.append(float(player_shares_dict.get(company._name, 0)))
-
-        company_set = set()
-        for company in player_chips:
-            company_name = company._name
-            company_set.add(company_name)
-        for company in self.company_list:
-            obs.append(1.0 if company._name in company_set else 0.0)
-
-        market_cards_dict = sg.get_card_dictionary(market_cards)
-        for company in self.company_list:
-            obs.append(float(market_cards_dict.get(company._name, 0)))
-
-        # Market card coins - max coins per company
-        for company in self.company_list:
-            max_coins = max([card._coins_on for card in self.market 
-                            if card._company == company._name] + [0])
-            obs.append(float(max_coins))
-        
-        # Other players (same pattern for each)
-        for other_player in self.other_players:
-            obs.append(float(other_player._coins))
-            
-            other_shares = sg.get_card_dictionary(other_player._shares)
-            for company in self.company_list:
-                obs.append(float(other_shares.get(company._name, 0)))
-
-            other_chips = sg.get_company_set(other_player)
-            for company in self.company_list:
-                obs.append(1.0 if company._name in other_chips else 0.0)
-            
-            # REMOVE LATER in training, this should be hidden
-           #other_hand = sg.get_card_dictionary(other_player._hand)
-           #for company in self.company_list:
-                #bs.append(float(other_hand.get(company._name, 0)))
-        
-        obs.append(float(self.state_controller._enumerate_phase()))
-
-        return np.array(obs, dtype=np.float32)
+        # written into observation_out when a caller supplied one, else a fresh array
+        seat = self.player_list.index(self.agent_player)
+        obs = self.encoder.encode(seat, self.state_controller._enumerate_phase(), self.observation_out)
+        return obs if self.observation_out is not None else obs.copy()
 
 
     def render(self):
@@ -229,16 +196,11 @@ class StartupsEnv(Env):
     def _setup_action_space(self):
         self.player_actions_pick_up = ["pickup_deck", "pickup_market"]
         self.player_actions_put_down = ["putdown_shares", "putdown_market"]
-        self.action_mapping = {}
-        action_id = 0
-        action_list = sg.get_all_game_actions(self.player_actions_pick_up, self.player_actions_put_down, self.company_list)
-        #action_list = self._return_valid_actions()
-        
-        for action in action_list:
-            self.action_mapping[action_id] = action
-            action_id += 1
-
-        self.action_space = spaces.Discrete(len(self.action_mapping))
+        # the action table is the same for every game with these rules, so it comes from the config
+        self.action_mapping = dict(enumerate(self.config.actions))
+        self.action_space = spaces.Discrete(self.config.num_actions)
+        self.company_ids = self.config.company_ids
+        self._action_ids = np.arange(self.config.num_actions)
         
     def print_action_mapping(self):
         #print("Action Space Mapping:")
@@ -247,54 +209,22 @@ class StartupsEnv(Env):
             # Assuming Action objects have attributes like .type and .target
             #print(f"  Action {action_id}: {action.type} {action.target if hasattr(action, 'target') and action.target else ''}")
 
-    def _return_valid_actions(self):
-        choices = []
+    def _legal_action_bits(self):
+        # bit i set when action_mapping[i] is valid for the agent in the current phase
         if self.state_controller.current_phase == TurnPhase.RL_PICKUP:
-            choices = sg.return_all_pickup_choices(self.agent_player, self.market)
+            return sg.legal_action_bits(self.agent_player, self.market, self.company_ids, True)
         elif self.state_controller.current_phase == TurnPhase.RL_PUTDOWN:
-            choices = sg.return_all_putdown_choices(self.agent_player, self.company_list)
+            return sg.legal_action_bits(self.agent_player, self.market, self.company_ids, False)
+        return 0
 
-        mask = np.zeros(self.action_space.n, dtype=np.int8)
-        for action_id, action in self.action_mapping.items():
-            if action in choices:
-                mask[action_id] = 1
-        return mask
-
-    def _return_valid_action_check(self, action):
-        choices = []
-        # I think your action is returning [type, target] where target is a card object
-        # and maybe you're comparing it to something where the target is a company
-        #print(f"Checking validity of action: {action}")
-        if self.state_controller.current_phase == TurnPhase.RL_PICKUP:
-            choices = sg.return_all_pickup_choices(self.agent_player, self.market)
-            #print(f"Available pickup choices: {[(i.type, i.target) for i in choices]}")
-            #print(f"Agent hand: {[(i._company) for i in self.agent_player._hand]}")
-            #print(f"Agent shares: {[(i.type, i.target) for i in self.agent_player._shares]}")
-        elif self.state_controller.current_phase == TurnPhase.RL_PUTDOWN:
-            choices = sg.return_all_putdown_choices(self.agent_player, self.company_list)
-            #print(f"Available putdown choices: {[(i.type, i.target) for i in choices]}")
-            #print(f"Agent hand: {[(i._company) for i in self.agent_player._hand]}")
-            #print(f"Agent shares: {[(i[0], i[1]) for i in self.agent_player._shares]}")
-
-        action_company = action.target._company if hasattr(action.target, '_company') else getattr(action.target, '_name', action.target)
-
-        check = False
-        for c in choices:
-            choice_company = c.target._company if hasattr(c.target, '_company') else getattr(c.target, '_name', c.target)
-            if action == c:
-                check = True
-            elif str(action) == str(c):
-                check = True
-            elif action.type == c.type and action_company == choice_company:
-                check = True
-            #elif action[0] == c[0] and action[1] == c[1]:
-            #check = True
-        #print(f"Action valid: {check}")
-        return check
+    def _is_valid_action_id(self, action_id):
+        return (self._legal_action_bits() >> int(action_id)) & 1 == 1
+
+    def _return_valid_actions(self):
+        return ((self._legal_action_bits() >> self._action_ids) & 1).astype(np.int8)
 
     def get_valid_actions(self, state):
-        choices = self.action_mapping.items()
-        valid_actions = [action_id for action_id, action in self.action_mapping.items() if self._return_valid_action_check(action)]
+        valid_actions = np.flatnonzero((self._legal_action_bits() >> self._action_ids) & 1).tolist()
 
         #for c in choices:
                 #print("Choice:", c[0], c[1], "in action_mapping?", c in valid_actions)
@@ -310,7 +240,15 @@ class StartupsEnv(Env):
         # placeholder - just a sparse reward for now
         # this will be slower, but I don't want to impose strategies
         #reward = self.more_cards_reward(game_round) - 0.001
-        new_score = sg.simulate_end_game_and_score(self.player_list, self.company_list, self.agent_player, self.starting_deck)
+        seat = self.player_list.index(self.agent_player)
+        shares, coins, unseen, hand_sizes = self.beliefs.score_inputs(self.player_list, seat)
+        if self.analytic_reward:
+            new_score, self.reward_variance = majority_model.analytic_score(shares, coins, unseen, seat, hand_sizes), 0.0
+        elif self.exact_reward_threshold is not None and unseen.sum() <= self.exact_reward_threshold:
+            new_score, self.reward_variance = endgame_solver.exact_mean_and_variance(shares, coins, unseen, seat, hand_sizes=hand_sizes)
+        else:
+            scores = be.determinized_scores(shares, coins, unseen, seat, self.reward_samples, self.reward_rng, hand_sizes=hand_sizes)
+            new_score, self.reward_variance = scores.mean(), scores.var()
         #reward += self._get_coins_for_score() * 0.01
         reward = new_score - self.last_simulated_score
         self.last_simulated_score = new_score
@@ -371,23 +309,50 @@ class StartupsEnv(Env):
             pickup_action = self._get_static_agent_action(current_player, True)
             if pickup_action:
                 sg.execute_pickup(current_player, pickup_action, self.market, self.deck)
+                self._record(current_player, pickup_action)
             
             putdown_action = self._get_static_agent_action(current_player, False)
             if putdown_action:
                 sg.execute_putdown(current_player, putdown_action, self.player_list, self.market, self.company_list)
+                self._record(current_player, putdown_action)
         else:        
             # Execute the current player's turn
             pickup_action = current_player.pickup_strategy(current_player, self.market, self.deck, self.player_list)
             if pickup_action:
                 sg.execute_pickup(current_player, pickup_action, self.market, self.deck)
+                self._record(current_player, pickup_action)
             
             putdown_action = current_player.putdown_strategy(current_player, self.market, self.deck, self.player_list)
             if putdown_action:
                 sg.execute_putdown(current_player, putdown_action, self.player_list, self.market, self.company_list)
+                self._record(current_player, putdown_action)
             
         # Advance to next player
         self.state_controller._advance_to_next_player()
 
+    def _start_record(self, seed):
+        if self.record_writer is not None:
+            self.recorder = game_record.GameRecorder(self.company_list, self.player_list, self.deck, seed)
+
+    def _record(self, player, action):
+        self.beliefs.record(player, action)
+        self.encoder.record(player, action)
+        if self.recorder is not None:
+            self.recorder.record(player, action)
+
+    def _finish_record(self):
+        # games cut short by a truncated episode are kept too; their move list just stops early
+        if self.recorder is not None and len(self.recorder.game):
+            self.record_writer.write(self.recorder.game)
+        self.recorder = None
+
+    def close(self):
+        if self.record_writer is not None:
+            self._finish_record()
+            self.record_writer.close()
+            self.record_writer = None
+        super().close()
+
     def _get_static_agent_action(self, player, is_pickup):
         """Efficiently get action from static agent without creating temporary environment"""
         # Set up minimal state for the static agent
@@ -400,7 +365,8 @@ class StartupsEnv(Env):
         self.state_controller.current_phase = temp_phase
         
         try:
-            state = self._get_observation()
+            # the encoder's own buffer: the observation is only needed for this prediction
+            state = self.encoder.encode(self.player_list.index(player), self.state_controller._enumerate_phase())
             valid_actions = self.get_valid_actions(state)
             
             if not valid_actions:
@@ -445,7 +411,7 @@ class StartupsEnv(Env):
         return reward_given_rank
 
     def random_RL_player_selection(self):
-        random_choice = random.choice(range(len(self.player_list)))
+        random_choice = self.rng.choice(range(len(self.player_list)))
         agent_player = None
         counter = 0
         for player in self.player_list:
@@ -466,9 +432,11 @@ class TurnPhase(Enum):
     ROUND_COMPLETE = "round_complete"
 
 class GameStateController:
-    def __init__(self, player_list, agent_player):
+    def __init__(self, player_list, agent_player, hand_size=3):
         self.player_list = player_list
         self.agent_player = agent_player
+        # cards held between turns: a pickup brings the agent to hand_size + 1, its put-down back to hand_size
+        self.hand_size = hand_size
         self.current_player_index = 0
         self.current_phase = self.get_starting_phase()
         self.other_players_completed = 0
@@ -511,9 +479,9 @@ class GameStateController:
     def _change_phase(self):
         hand_size = len(self.agent_player._hand)
         #print(f"Changing phase. Current phase: {self.current_phase}, Hand size: {hand_size}")
-        if self.current_phase == TurnPhase.RL_PICKUP and hand_size == 4:
+        if self.current_phase == TurnPhase.RL_PICKUP and hand_size == self.hand_size + 1:
             self.current_phase = TurnPhase.RL_PUTDOWN
-        elif self.current_phase == TurnPhase.RL_PUTDOWN and hand_size == 3:
+        elif self.current_phase == TurnPhase.RL_PUTDOWN and hand_size == self.hand_size:
             self.current_phase = TurnPhase.OTHER_PLAYERS
         elif self.current_phase == TurnPhase.OTHER_PLAYERS:
             self._advance_to_next_player()
@@ -92,6 +92,9 @@ class Agent(object):
         if os.path.exists(self.model_file):
             print(f"Loading existing model from {self.model_file}...")
             self.q_eval = keras.models.load_model(self.model_file)
+            if self.q_eval.input_shape[-1] != input_dims:
+                raise ValueError(f"{self.model_file} takes {self.q_eval.input_shape[-1]} inputs but the observation has {input_dims}; "
+                                 "check the game config it was trained with (e.g. unseen_features)")
         else:
             print("No saved model found. Building new model...")
             self.q_eval = build_dpqn(alpha, n_actions, input_dims, 128,128) # 128?
@@ -122,6 +125,20 @@ class Agent(object):
 
         return action_id
 
+    def choose_actions(self, states, masks):
+        # one action per row of a batch of states (e.g. from StartupsVectorEnv), with a single forward pass
+        # masks is (batch, n_actions), nonzero where the action is legal
+        masks = np.asarray(masks, dtype=bool)
+        q_values = self.q_eval.predict(states, verbose=0)
+        action_ids = np.argmax(np.where(masks, q_values, -np.inf), axis=1)
+
+        explore = np.random.random(len(states)) < self.epsilon
+        if explore.any():
+            # uniform over the legal actions of the exploring rows
+            noise = np.where(masks[explore], np.random.random(masks[explore].shape), -1.0)
+            action_ids[explore] = np.argmax(noise, axis=1)
+        return action_ids
+
     def learn(self):
         # learns on every step - temporal difference
         # we have created our memory with zeroes - do we pick random numbers, or just start learning? Latter here, but we have to wait until we've filled up a batch before we start learning
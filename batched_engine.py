@@ -0,0 +1,509 @@
+import numpy as np
+import s1_game_optimise_for_RL as sg
+
+# Action ids follow sg.get_all_game_actions:
+# 0 = pickup_deck, 1..C = pickup_market, C+1..2C = putdown_shares, 2C+1..3C = putdown_market
+PICKUP = 0
+PUTDOWN = 1
+
+
+class BatchedStartupsEngine:
+    """Plays many Startups games in lockstep, each zone stored as a stacked NumPy count array"""
+    def __init__(self, num_games, num_players=4, company_list=None, starting_coins=10, removed_cards=5, hand_size=3, seed=None):
+        company_list = company_list if company_list is not None else sg.default_companies
+        self.company_names = [c[0] for c in company_list]
+        self.total_shares = np.array([c[1] for c in company_list], dtype=np.int16)
+        self.num_games = num_games
+        self.num_players = num_players
+        self.num_companies = len(company_list)
+        self.num_actions = 1 + 3 * self.num_companies
+        self.starting_coins = starting_coins
+        self.removed_cards = removed_cards
+        self.hand_size = hand_size
+        self.card_ids = np.repeat(np.arange(self.num_companies, dtype=np.int8), self.total_shares)
+        self.deck_length = len(self.card_ids) - removed_cards - hand_size * num_players
+        self.market_slots = int(self.total_shares.max())
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, num_games, config, seed=None):
+        """Engine for the rules of an sg.GameConfig"""
+        return cls(num_games, config.num_players, config.companies, config.starting_coins, config.removed_cards, config.hand_size, seed)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        N, P, C = self.num_games, self.num_players, self.num_companies
+        games = np.arange(N)
+        shuffled = self.rng.permuted(np.tile(self.card_ids, (N, 1)), axis=1)
+        self.removed = shuffled[:, :self.removed_cards]
+        dealt = shuffled[:, self.removed_cards:self.removed_cards + self.hand_size * P]
+        self.deck = np.ascontiguousarray(shuffled[:, self.removed_cards + self.hand_size * P:])
+        self.deck_position = np.zeros(N, dtype=np.int16)
+
+        self.hands = np.zeros((N, P, C), dtype=np.int16)
+        self.shares = np.zeros((N, P, C), dtype=np.int16)
+        self.chips = np.zeros((N, P, C), dtype=bool)
+        self.coins = np.full((N, P), self.starting_coins, dtype=np.int32)
+        self.market = np.zeros((N, C), dtype=np.int16)
+        # coins on each market card per company, oldest (richest) card in slot 0
+        self.market_coins = np.zeros((N, C, self.market_slots), dtype=np.int32)
+        self.last_pickup = np.full((N, P), -1, dtype=np.int8)
+
+        # deal_hands gives one card to each player in turn
+        seats = np.tile(np.arange(P), self.hand_size)
+        np.add.at(self.hands, (games[:, None], seats[None, :], dealt), 1)
+
+        self.current_player = np.zeros(N, dtype=np.int8)
+        self.phase = np.full(N, PICKUP, dtype=np.int8)
+        self.done = np.zeros(N, dtype=bool)
+        self.final_coins = None
+        self.winner = None
+        self.rank = None
+        return self.legal_action_mask()
+
+    def deck_size(self):
+        return self.deck_length - self.deck_position
+
+    def pickup_cost(self):
+        games = np.arange(self.num_games)
+        chips = self.chips[games, self.current_player]
+        return (self.market * ~chips).sum(axis=1)
+
+    def legal_action_mask(self):
+        N, C = self.num_games, self.num_companies
+        games = np.arange(N)
+        p = self.current_player
+        chips = self.chips[games, p]
+        hands = self.hands[games, p]
+        mask = np.zeros((N, self.num_actions), dtype=bool)
+
+        pickup = (self.phase == PICKUP) & ~self.done
+        mask[:, 0] = pickup & (self.deck_size() > 0) & (self.coins[games, p] >= self.pickup_cost())
+        mask[:, 1:1 + C] = pickup[:, None] & (self.market > 0) & ~chips
+
+        putdown = ((self.phase == PUTDOWN) & ~self.done)[:, None] & (hands > 0)
+        mask[:, 1 + C:1 + 2 * C] = putdown
+        # a card picked up this turn cannot go straight back to the market
+        mask[:, 1 + 2 * C:] = putdown & (np.arange(C) != self.last_pickup[games, p][:, None])
+        return mask
+
+    def step(self, actions):
+        """Apply one action per game for the player to move; returns (applied, next legal mask)"""
+        C = self.num_companies
+        actions = np.asarray(actions)
+        games = np.arange(self.num_games)
+        applied = self.legal_action_mask()[games, actions]
+        p = self.current_player
+
+        g = games[applied & (actions == 0)]
+        if len(g):
+            self._pickup_deck(g, p[g])
+        g = games[applied & (actions >= 1) & (actions <= C)]
+        if len(g):
+            self._pickup_market(g, p[g], actions[g] - 1)
+        g = games[applied & (actions > C) & (actions <= 2 * C)]
+        if len(g):
+            self._putdown_shares(g, p[g], actions[g] - 1 - C)
+        g = games[applied & (actions > 2 * C)]
+        if len(g):
+            self._putdown_market(g, p[g], actions[g] - 1 - 2 * C)
+
+        picked = applied & (self.phase == PICKUP)
+        put = applied & (self.phase == PUTDOWN)
+        self.phase[picked] = PUTDOWN
+        self.phase[put] = PICKUP
+        self.current_player[put] = (self.current_player[put] + 1) % self.num_players
+        # a round always finishes; the game ends when the deck is empty as a new round starts
+        self.done |= put & (self.current_player == 0) & (self.deck_size() == 0)
+        self._skip_blocked_pickups()
+        return applied, self.legal_action_mask()
+
+    def _skip_blocked_pickups(self):
+        # with the deck empty and nothing collectable in the market, the player only puts down
+        mask = self.legal_action_mask()
+        blocked = (self.phase == PICKUP) & ~self.done & ~mask[:, :1 + self.num_companies].any(axis=1)
+        self.phase[blocked] = PUTDOWN
+
+    def _pickup_deck(self, g, p):
+        chips = self.chips[g, p]
+        cost = (self.market[g] * ~chips).sum(axis=1)
+        card = self.deck[g, self.deck_position[g]]
+        self.deck_position[g] += 1
+        self.hands[g, p, card] += 1
+        self.last_pickup[g, p] = card
+        self.coins[g, p] -= cost
+        # one coin on every market card the player has no anti-monopoly chip for
+        filled = np.arange(self.market_slots)[None, None, :] < self.market[g][:, :, None]
+        self.market_coins[g] += (filled & ~chips[:, :, None])
+
+    def _pickup_market(self, g, p, c):
+        self.coins[g, p] += self.market_coins[g, c, 0]
+        self.market_coins[g, c, :-1] = self.market_coins[g, c, 1:]
+        self.market_coins[g, c, -1] = 0
+        self.market[g, c] -= 1
+        self.hands[g, p, c] += 1
+        self.last_pickup[g, p] = c
+
+    def _putdown_shares(self, g, p, c):
+        self.hands[g, p, c] -= 1
+        self.shares[g, p, c] += 1
+        self.last_pickup[g, p] = -1
+        company_shares = self.shares[g, :, c]
+        max_shares = company_shares.max(axis=1)
+        # same rules as Player.add_chip followed by remove_chip for every player
+        gains_chip = (company_shares.sum(axis=1) <= 1) | (self.shares[g, p, c] > max_shares)
+        self.chips[g, p, c] |= gains_chip
+        self.chips[g, :, c] &= ~(company_shares < max_shares[:, None])
+
+    def _putdown_market(self, g, p, c):
+        self.hands[g, p, c] -= 1
+        self.market_coins[g, c, self.market[g, c]] = 0
+        self.market[g, c] += 1
+        self.last_pickup[g, p] = -1
+
+    def score(self):
+        """end_game_and_score for every game: hands go to shares before scoring"""
+        self.final_coins, self.winner, self.rank = score_games(self.shares + self.hands, self.coins)
+        return self.final_coins
+
+    def to_compact(self, game):
+        """CompactGameState copy of one game, for inspection and checks against the object engine"""
+        state = sg.CompactGameState(sg.create_companies([[n, int(t)] for n, t in zip(self.company_names, self.total_shares)]), self.num_players, self.starting_coins)
+        state.deck = [int(c) for c in self.deck[game]]
+        state.deck_position = int(self.deck_position[game])
+        state.deck_counts = np.bincount(self.deck[game, state.deck_position:], minlength=self.num_companies).tolist()
+        state.market = self.market[game].tolist()
+        state.market_coins = [self.market_coins[game, c, :self.market[game, c]].tolist() for c in range(self.num_companies)]
+        state.hands = self.hands[game].tolist()
+        state.shares = self.shares[game].tolist()
+        state.chips = self.chips[game].tolist()
+        state.coins = self.coins[game].tolist()
+        state.last_pickup = self.last_pickup[game].tolist()
+        state.current_player = int(self.current_player[game])
+        state.pickup_phase = bool(self.phase[game] == PICKUP)
+        state.done = bool(self.done[game])
+        return state
+
+
+def sample_legal_actions(mask, rng):
+    """Uniformly random legal action per game (0 for games with nothing legal)"""
+    noise = rng.random(mask.shape)
+    return np.argmax(np.where(mask, noise, -1.0), axis=1)
+
+
+def score_games(shares, coins):
+    """Score finished games from a (games, players, companies) share tensor and (games, players) coins.
+
+    Same rules as sg.end_game_and_score: a unique majority holder in a company collects each other
+    holder's shares from them and is paid 3x the total; ties give no majority. Returns final coins,
+    the winner (first seat with most coins, as find_winner_simple) and each seat's rank
+    (0 is best, ties broken by seat as in StartupsEnv._calculate_player_rank).
+    """
+    shares = np.asarray(shares)
+    coins = np.asarray(coins)
+    is_max = shares == shares.max(axis=1, keepdims=True)
+    unique = is_max.sum(axis=1, keepdims=True) == 1
+    majority = is_max & unique
+    # with no unique majority in a company nobody pays for it
+    paid = np.where(unique & ~majority, shares, 0)
+    received = np.where(majority, 3 * paid.sum(axis=1, keepdims=True), 0)
+    final_coins = coins + (received - paid).sum(axis=2)
+
+    winner = np.argmax(final_coins, axis=1)
+    order = np.argsort(-final_coins, axis=1, kind='stable')
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(final_coins.shape[1])[None, :], axis=1)
+    return final_coins, winner, rank
+
+
+def determinized_scores(shares, coins, unseen_counts, seat, num_samples, rng, hand_size=3, hand_sizes=None):
+    """Shaped end-game score for `seat` over num_samples random deals of the unseen cards.
+
+    Mirrors one call of sg.simulate_end_game_and_score per sample: the unseen cards are shuffled and
+    dealt round-robin, hand_size each, to every other seat, which then score alongside the visible
+    shares. As there, the scoring seat's own hand is not added. hand_sizes, when given, is the number
+    of cards to deal each seat instead (see BeliefTracker.hidden_hand_sizes).
+    """
+    shares = np.asarray(shares)
+    coins = np.asarray(coins)
+    num_players, num_companies = shares.shape
+    pool = np.repeat(np.arange(num_companies), np.asarray(unseen_counts))
+    if hand_sizes is None:
+        hand_sizes = [hand_size] * num_players
+    seats = round_robin_seats(hand_sizes, seat, len(pool))
+    dealt = len(seats)
+
+    sim_shares = np.broadcast_to(shares, (num_samples, num_players, num_companies)).copy()
+    if dealt > 0:
+        cards = rng.permuted(np.tile(pool, (num_samples, 1)), axis=1)[:, :dealt]
+        np.add.at(sim_shares, (np.arange(num_samples)[:, None], seats[None, :], cards), 1)
+
+    final_coins, winner, _ = score_games(sim_shares, np.broadcast_to(coins, (num_samples, num_players)))
+    return shaped_scores(final_coins, winner, seat)
+
+
+def round_robin_seats(hand_sizes, seat, num_cards):
+    """Seat receiving each of up to num_cards cards dealt one at a time around the table, as deal_hands
+    does, to every seat but `seat` until each holds hand_sizes of them; a short pool runs out in the
+    last round, so the later seats of that round go without"""
+    sizes = np.array(hand_sizes, dtype=np.int64)
+    sizes[seat] = 0
+    # round r deals to the seats owed more than r cards, in seat order
+    _, seats = np.nonzero(sizes[None, :] > np.arange(sizes.max(initial=0))[:, None])
+    return seats[:num_cards]
+
+
+def shaped_scores(final_coins, winner, seat):
+    """sg.simulate_end_game_and_score's value for `seat` from (samples, players) final coins"""
+    # max()/min() over player_list return the first seat on ties
+    loser = np.argmin(final_coins, axis=1)
+    distance_from_average = final_coins[:, seat] - final_coins.mean(axis=1)
+    win_value = np.where(winner == seat, 1, np.where(loser == seat, -1, 0))
+    return 0.5 * distance_from_average + win_value
+
+
+def simulated_score_inputs(player_list, company_list, player):
+    """(shares, coins, unseen counts, seat) as sg.simulate_end_game_and_score sees the game"""
+    names = [c._name for c in company_list]
+    shares = np.array([[p._share_counts.get(name, 0) for name in names] for p in player_list])
+    coins = np.array([p._coins for p in player_list])
+    own_hand = sg.get_card_dictionary(player._hand)
+    # unseen cards: the full deck less the player's own hand and every visible share
+    unseen = np.array([c._total_shares - own_hand.get(c._name, 0) for c in company_list]) - shares.sum(axis=0)
+    return shares, coins, np.maximum(unseen, 0), player_list.index(player)
+
+
+def estimate_simulated_score(player_list, company_list, player, num_samples=32, rng=None, hand_size=3):
+    """Mean and variance of sg.simulate_end_game_and_score over num_samples determinizations"""
+    rng = rng if rng is not None else np.random.default_rng()
+    shares, coins, unseen, seat = simulated_score_inputs(player_list, company_list, player)
+    scores = determinized_scores(shares, coins, unseen, seat, num_samples, rng, hand_size)
+    return scores.mean(), scores.var()
+
+
+# Vectorized versions of the heuristic bots in s1_game_optimise_for_RL. Each *_pickup / *_putdown
+# function sorts every legal action of every game into the good/ok/bad buckets of the strategy it
+# mirrors, weighted by how often that strategy's choice list holds the action (one entry per market
+# card or hand card, repeated once per seat where the original loops over player_list). The action is
+# then drawn from the first non-empty bucket, which gives the same distribution as random.choice over
+# the original list. Two deliberate differences: the batched engine takes the market card the policy
+# names, where the object engine picks a random one, and pickup_deck is never offered with the deck
+# empty, where the object engine would let the pickup fall through.
+
+class BatchedTurnContext:
+    """Per-game counts for the player to move, shared by the vectorized policies (the batched TurnContext)"""
+    def __init__(self, engine, mask=None):
+        N, C = engine.num_games, engine.num_companies
+        games = np.arange(N)
+        p = engine.current_player
+        self.mask = engine.legal_action_mask() if mask is None else mask
+        self.num_players = engine.num_players
+        self.num_companies = C
+        hands = engine.hands[games, p].astype(np.int32)
+        self.shares = engine.shares                         # every seat, the deciding one included
+        self.own = engine.shares[games, p] + hands          # count_card for each company
+        self.market = engine.market
+        self.max_market_coins = engine.market_coins[:, :, 0]  # slot 0 holds the richest card
+        # how often return_all_pickup_choices / return_all_putdown_choices list each legal action
+        counts = np.zeros(self.mask.shape, dtype=np.int32)
+        counts[:, 0] = self.mask[:, 0]
+        counts[:, 1:1 + C] = engine.market * self.mask[:, 1:1 + C]
+        counts[:, 1 + C:1 + 2 * C] = hands * self.mask[:, 1 + C:1 + 2 * C]
+        counts[:, 1 + 2 * C:] = hands * self.mask[:, 1 + 2 * C:]
+        self.counts = counts
+
+    def blocks(self):
+        """Column slices for pickup_market, putdown_shares and putdown_market"""
+        C = self.num_companies
+        return slice(1, 1 + C), slice(1 + C, 1 + 2 * C), slice(1 + 2 * C, 1 + 3 * C)
+
+    def seats(self, condition):
+        """Number of seats per game and company where condition, a (games, players, companies) array, holds"""
+        return condition.sum(axis=1)
+
+    def empty_buckets(self):
+        return tuple(np.zeros(self.counts.shape) for _ in range(3))
+
+
+def random_pickup(ctx):
+    # random_ai_pickup_strategy: deck or market with even odds, then a random collectable market card
+    good, ok, bad = ctx.empty_buckets()
+    pick_market, _, _ = ctx.blocks()
+    market = ctx.counts[:, pick_market]
+    market_total = market.sum(axis=1, keepdims=True)
+    has_deck = ctx.counts[:, :1] > 0
+    has_market = market_total > 0
+    share = np.where(has_deck & has_market, 0.5, 1.0)
+    good[:, :1] = has_deck * share
+    good[:, pick_market] = market / np.maximum(market_total, 1) * share
+    return good, ok, bad
+
+
+def random_putdown(ctx):
+    # random_ai_putdown_strategy only ever offers putdown_shares, for a random card in hand
+    good, ok, bad = ctx.empty_buckets()
+    _, put_shares, _ = ctx.blocks()
+    good[:, put_shares] = ctx.counts[:, put_shares]
+    return good, ok, bad
+
+
+def avoid_loss_pickup(ctx, seek=False):
+    # seek_loss puts in bad exactly what avoid_loss puts in good, and the other way round
+    good, ok, bad = ctx.empty_buckets()
+    pick_market, _, _ = ctx.blocks()
+    market = ctx.counts[:, pick_market]
+    over = ctx.seats(ctx.shares > (ctx.own + 1)[:, None, :])
+    good[:, :1] = ctx.counts[:, :1]
+    good[:, pick_market] = market * (ctx.num_players - over)
+    bad[:, pick_market] = market * over
+    return (bad, ok, good) if seek else (good, ok, bad)
+
+
+def avoid_loss_putdown(ctx, seek=False):
+    good, ok, bad = ctx.empty_buckets()
+    _, put_shares, put_market = ctx.blocks()
+    P = ctx.num_players
+    shares = ctx.shares
+    own = ctx.own[:, None, :]
+    outvoted = ctx.seats(shares >= own)
+    level = ctx.seats((shares == own - 1) & (shares > 0))
+    good[:, put_shares] = ctx.counts[:, put_shares] * (P - outvoted)
+    bad[:, put_shares] = ctx.counts[:, put_shares] * outvoted
+    good[:, put_market] = ctx.counts[:, put_market] * (P - level)
+    bad[:, put_market] = ctx.counts[:, put_market] * level
+    return (bad, ok, good) if seek else (good, ok, bad)
+
+
+def seek_loss_pickup(ctx):
+    return avoid_loss_pickup(ctx, seek=True)
+
+
+def seek_loss_putdown(ctx):
+    return avoid_loss_putdown(ctx, seek=True)
+
+
+def same_cards_pickup(ctx):
+    good, ok, bad = ctx.empty_buckets()
+    pick_market, _, _ = ctx.blocks()
+    market = ctx.counts[:, pick_market]
+    held = ctx.own > 0
+    bad[:, :1] = ctx.counts[:, :1]
+    good[:, pick_market] = market * held
+    bad[:, pick_market] = market * ~held
+    return good, ok, bad
+
+
+def same_cards_putdown(ctx):
+    good, ok, bad = ctx.empty_buckets()
+    _, put_shares, put_market = ctx.blocks()
+    held = ctx.own > 0
+    good[:, put_shares] = ctx.counts[:, put_shares] * held
+    bad[:, put_market] = ctx.counts[:, put_market] * held
+    ok[:, put_shares] = ctx.counts[:, put_shares] * ~held
+    ok[:, put_market] = ctx.counts[:, put_market] * ~held
+    return good, ok, bad
+
+
+def different_cards_pickup(ctx):
+    good, ok, bad = ctx.empty_buckets()
+    pick_market, _, _ = ctx.blocks()
+    market = ctx.counts[:, pick_market]
+    own = ctx.own
+    ok[:, :1] = ctx.counts[:, :1]
+    bad[:, pick_market] = market * (own > 1)
+    ok[:, pick_market] = market * (own == 1)
+    good[:, pick_market] = market * (own == 0)
+    return good, ok, bad
+
+
+def different_cards_putdown(ctx):
+    good, ok, bad = ctx.empty_buckets()
+    _, put_shares, put_market = ctx.blocks()
+    own = ctx.own
+    good[:, put_market] = ctx.counts[:, put_market] * (own > 1)
+    ok[:, put_market] = ctx.counts[:, put_market] * (own <= 1)
+    bad[:, put_shares] = ctx.counts[:, put_shares] * (own >= 1)
+    ok[:, put_shares] = ctx.counts[:, put_shares] * (own == 0)
+    return good, ok, bad
+
+
+def gain_money_pickup(ctx):
+    good, ok, bad = ctx.empty_buckets()
+    pick_market, _, _ = ctx.blocks()
+    market = ctx.counts[:, pick_market]
+    only_choice = ctx.counts[:, :1 + ctx.num_companies].sum(axis=1, keepdims=True) == 1
+    good[:, :1] = ctx.counts[:, :1] * only_choice
+    bad[:, :1] = ctx.counts[:, :1] * ~only_choice
+    ok[:, pick_market] = market
+    good[:, pick_market] = market * (ctx.max_market_coins > 1)
+    return good, ok, bad
+
+
+def lose_unwanted_cards_putdown(ctx):
+    good, ok, bad = ctx.empty_buckets()
+    _, put_shares, put_market = ctx.blocks()
+    P = ctx.num_players
+    own = ctx.own
+    outvoted = ctx.seats(ctx.shares >= own[:, None, :])
+    good[:, put_shares] = ctx.counts[:, put_shares] * (P - outvoted)
+    bad[:, put_shares] = ctx.counts[:, put_shares] * outvoted
+    market = ctx.counts[:, put_market] * P
+    in_market = ctx.market > 0
+    bad[:, put_market] = market * (own > 1)
+    good[:, put_market] = market * ((own <= 1) & in_market)
+    ok[:, put_market] = market * ((own <= 1) & ~in_market)
+    return good, ok, bad
+
+
+POLICIES = {
+    "random": (random_pickup, random_putdown),
+    "random_2": (random_pickup, random_putdown),
+    "avoid_loss": (avoid_loss_pickup, avoid_loss_putdown),
+    "avoid_loss_2": (avoid_loss_pickup, avoid_loss_putdown),
+    "seek_loss": (seek_loss_pickup, seek_loss_putdown),
+    "same_cards": (same_cards_pickup, same_cards_putdown),
+    "different_cards": (different_cards_pickup, different_cards_putdown),
+    "gain_money": (gain_money_pickup, lose_unwanted_cards_putdown),
+    "avoid_seek": (avoid_loss_pickup, seek_loss_putdown),
+    "seek_avoid": (seek_loss_pickup, avoid_loss_putdown),
+    "money_same": (gain_money_pickup, same_cards_putdown),
+    "gain_random": (gain_money_pickup, random_putdown),
+    "random_avoid": (random_pickup, avoid_loss_putdown)
+}
+
+
+def policy_weights(ctx, pickup_policy, putdown_policy):
+    """Unnormalised action weights per game: the first non-empty of the good, ok and bad buckets"""
+    # the legal mask keeps each policy's buckets to games in its own phase, so the two can be added
+    good, ok, bad = (a + b for a, b in zip(pickup_policy(ctx), putdown_policy(ctx)))
+    has_good = good.sum(axis=1, keepdims=True) > 0
+    has_ok = ok.sum(axis=1, keepdims=True) > 0
+    return np.where(has_good, good, np.where(has_ok, ok, bad))
+
+
+def sample_weighted_actions(weights, rng):
+    """One action per game drawn in proportion to weights (0 for games with no weight)"""
+    total = weights.sum(axis=1)
+    cumulative = weights.cumsum(axis=1)
+    draw = rng.random(len(total)) * total
+    return np.where(total > 0, (cumulative > draw[:, None]).argmax(axis=1), 0)
+
+
+def policy_actions(engine, name, rng, ctx=None):
+    """Actions for every game as the named POLICIES entry would play them"""
+    ctx = ctx if ctx is not None else BatchedTurnContext(engine)
+    return sample_weighted_actions(policy_weights(ctx, *POLICIES[name]), rng)
+
+
+def lineup_actions(engine, lineup, rng, ctx=None):
+    """Actions for every game when seat i plays POLICIES[lineup[i]]"""
+    ctx = ctx if ctx is not None else BatchedTurnContext(engine)
+    actions = np.zeros(engine.num_games, dtype=np.int64)
+    for name in set(lineup):
+        seats = [i for i, n in enumerate(lineup) if n == name]
+        games = np.isin(engine.current_player, seats)
+        if games.any():
+            actions[games] = policy_actions(engine, name, rng, ctx)[games]
+    return actions
@@ -0,0 +1,82 @@
+import numpy as np
+import s1_game_optimise_for_RL as sg
+from game_record import observed_action_id
+
+# What each seat knows about the cards it cannot see, kept up to date move by move instead of being
+# rebuilt from the starting deck. For every seat s:
+#   unseen[s, c]    cards of company c that s has not seen: the deck, the removed cards and whatever
+#                   of the opponents' hands s has no record of
+#   known[s, q, c]  cards of company c that s saw opponent q take from the market and that q still holds
+# Hand sizes are public, so each opponent's hand is its known cards plus hidden_hand_sizes(s)[q] cards
+# drawn from unseen[s]. A market pickup tells everyone else which card went into the hand; a put-down
+# reveals a card, which comes off the known cards when there is one of that company and off unseen
+# otherwise. Every update and query is O(players * companies) at most.
+
+
+class BeliefTracker:
+    """Per-seat unseen-card counts and known opponent cards for one game.
+
+    Create it once the hands are dealt (or at any later point) and call record() after every
+    execute_pickup/execute_putdown, the same hook as game_record.GameRecorder, so it can be handed to
+    sg.play_game as its recorder.
+    """
+    def __init__(self, company_list, player_list, market=()):
+        self.company_ids = sg.get_company_ids(company_list)
+        self.num_players = len(player_list)
+        self.num_companies = len(company_list)
+        self._seats = {id(p): seat for seat, p in enumerate(player_list)}
+        names = [c._name for c in company_list]
+        self.hand_sizes = np.array([len(p._hand) for p in player_list])
+        self.shares = np.array([[p._share_counts.get(name, 0) for name in names] for p in player_list])
+        hands = np.array([[sg.get_card_dictionary(p._hand).get(name, 0) for name in names] for p in player_list])
+        market_counts = sg.get_card_dictionary(market)
+        visible = self.shares.sum(axis=0) + np.array([market_counts.get(name, 0) for name in names])
+        totals = np.array([c._total_shares for c in company_list])
+        self.unseen = totals - visible - hands
+        self.known = np.zeros((self.num_players, self.num_players, self.num_companies), dtype=np.int64)
+
+    def record(self, player, action):
+        seat = self._seats[id(player)]
+        action_id = observed_action_id(player, action, self.hand_sizes[seat], self.company_ids)
+        if action_id is not None:
+            self.apply(seat, action_id, self.company_ids[player._last_pickup._company] if action_id == 0 else None)
+
+    def apply(self, seat, action_id, drawn=None):
+        """Update for seat playing action_id (get_all_game_actions order); drawn is the company id of a deck draw"""
+        C = self.num_companies
+        if action_id == 0:
+            self.hand_sizes[seat] += 1
+            self.unseen[seat, drawn] -= 1
+        elif action_id <= C:
+            self.hand_sizes[seat] += 1
+            self.known[:, seat, action_id - 1] += 1
+            self.known[seat, seat, action_id - 1] = 0
+        else:
+            c = (action_id - 1 - C) % C
+            self.hand_sizes[seat] -= 1
+            if action_id <= 2 * C:
+                self.shares[seat, c] += 1
+            from_known = self.known[:, seat, c] > 0
+            self.known[from_known, seat, c] -= 1
+            revealed = ~from_known
+            revealed[seat] = False
+            self.unseen[revealed, c] -= 1
+
+    def unseen_counts(self, seat):
+        return self.unseen[seat].copy()
+
+    def known_hands(self, seat):
+        """(players, companies) cards seat knows each opponent holds"""
+        return self.known[seat].copy()
+
+    def hidden_hand_sizes(self, seat):
+        """Cards of each seat's hand that seat cannot place (0 for itself)"""
+        sizes = self.hand_sizes - self.known[seat].sum(axis=1)
+        sizes[seat] = 0
+        return sizes
+
+    def score_inputs(self, player_list, seat):
+        """(shares, coins, unseen counts, hidden hand sizes) for be.determinized_scores from seat's view:
+        the cards it knows an opponent holds are scored as that opponent's"""
+        coins = np.array([p._coins for p in player_list])
+        return self.shares + self.known[seat], coins, self.unseen_counts(seat), self.hidden_hand_sizes(seat)
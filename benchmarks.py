@@ -0,0 +1,242 @@
+import argparse
+import json
+import platform
+import random
+import time
+from datetime import datetime
+import numpy as np
+import s1_game_optimise_for_RL as sg
+import RL_environment2 as sr
+import batched_engine as be
+import majority_model
+from belief_tracker import BeliefTracker
+from tournament import seat_players
+from vector_env import StartupsVectorEnv
+
+SEED = 1234
+BENCHMARKS = {}
+
+
+def benchmark(name, number):
+    """Register a benchmark; the decorated function does the setup and returns the callable to time"""
+    def register(setup):
+        BENCHMARKS[name] = (setup, number)
+        return setup
+    return register
+
+
+def reseed():
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+
+def time_call(func, number, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return {"number": number, "repeat": repeat, "best": min(times), "mean": sum(times) / len(times)}
+
+
+@benchmark("create_game_RL_with_static", 2000)
+def bench_create_game():
+    return lambda: sg.create_game_RL_with_static(sg.default_companies, 4, 0, [], 0)
+
+
+def _full_game(name, config=None):
+    rng = random.Random(SEED)
+    config = config or sg.get_game_config()
+
+    def play():
+        company_list = config.create_companies()
+        player_list = seat_players([name] * config.num_players, rng, config.starting_coins, config)
+        deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+        sg.deal_hands(deck, config.hand_size, player_list)
+        sg.play_game(player_list, company_list, deck, [])
+    return play
+
+
+for _name in sg.STRATEGIES:
+    benchmark(f"full_game[{_name}]", 50)(lambda name=_name: _full_game(name))
+
+# how a game scales with the table size and the company set
+for _variant in sg.VARIANTS:
+    for _players in (3, 4, 5, 7):
+        try:
+            _config = sg.get_game_config(_variant, _players)
+        except ValueError:
+            continue    # too few cards for this table: no deck to play (e.g. "small" at 7 players)
+        benchmark(f"full_game_scaling[avoid_loss, {_variant}, {_players}p]", 50)(
+            lambda config=_config: _full_game("avoid_loss", config))
+
+
+def _mid_game():
+    company_list, player_list, deck, starting_deck = sg.create_game_RL(sg.default_companies, 4, 0)
+    market = []
+    for _ in range(3):
+        for p in player_list:
+            sg.execute_pickup(p, p.pickup_strategy(p, market, deck, player_list), market, deck)
+            sg.execute_putdown(p, p.putdown_strategy(p, market, deck, player_list), player_list, market, company_list)
+    return company_list, player_list, deck, starting_deck
+
+
+@benchmark("simulate_end_game_and_score", 2000)
+def bench_simulate_score():
+    company_list, player_list, deck, starting_deck = _mid_game()
+    return lambda: sg.simulate_end_game_and_score(player_list, company_list, player_list[0], starting_deck)
+
+
+@benchmark("majority_model.analytic_score", 5000)
+def bench_analytic_score():
+    company_list, player_list, deck, starting_deck = _mid_game()
+    shares, coins, unseen, hand_sizes = BeliefTracker(company_list, player_list).score_inputs(player_list, 0)
+    return lambda: majority_model.analytic_score(shares, coins, unseen, 0, hand_sizes)
+
+
+def _env():
+    env = sr.StartupsEnv(4, 0, sg.default_companies, [])
+    env.reset(seed=SEED)
+    return env
+
+
+@benchmark("StartupsEnv.reset", 500)
+def bench_env_reset():
+    env = _env()
+    return env.reset
+
+
+@benchmark("StartupsEnv.step", 500)
+def bench_env_step():
+    env = _env()
+    state = {"obs": env.state}
+
+    def step():
+        valid = env.get_valid_actions(state["obs"])
+        obs, reward, terminated, truncated, info = env.step(env.rng.choice(valid) if valid else 0)
+        if terminated or truncated:
+            obs, info = env.reset()
+        state["obs"] = obs
+    return step
+
+
+@benchmark("StartupsVectorEnv.step[16]", 50)
+def bench_vector_env_step():
+    env = StartupsVectorEnv(16, 4, 0, sg.default_companies, [])
+    rng = np.random.default_rng(SEED)
+    state = {"masks": env.reset(seed=SEED)[1]["action_mask"]}
+
+    def step():
+        masks = state["masks"].astype(bool)
+        actions = np.argmax(np.where(masks, rng.random(masks.shape), -1.0), axis=1)
+        state["masks"] = env.step(actions)[4]["action_mask"]
+    return step
+
+
+@benchmark("StartupsEnv._get_observation", 5000)
+def bench_env_observation():
+    return _env()._get_observation
+
+
+@benchmark("StartupsEnv.get_valid_actions", 5000)
+def bench_env_valid_actions():
+    env = _env()
+    return lambda: env.get_valid_actions(env.state)
+
+
+@benchmark("BatchedStartupsEngine.step[256, heuristic lineup]", 200)
+def bench_batched_lineup_step():
+    engine = be.BatchedStartupsEngine(256, seed=SEED)
+    rng = np.random.default_rng(SEED)
+    lineup = ["avoid_loss", "random", "gain_money", "same_cards"]
+
+    def step():
+        if engine.done.all():
+            engine.reset()
+        engine.step(be.lineup_actions(engine, lineup, rng))
+    return step
+
+
+def _agent_benchmarks():
+    # the agent needs keras; its benchmarks are skipped where it is not installed
+    try:
+        from ai_agent import Agent, ReplayBuffer
+    except ImportError:
+        return
+
+    env = _env()
+    input_dims = env.observation_space.shape[0]
+    n_actions = env.action_space.n
+
+    @benchmark("ReplayBuffer.store_transition", 20000)
+    def bench_store():
+        buffer = ReplayBuffer(100000, input_dims, n_actions, discrete=True)
+        obs = np.zeros(input_dims, dtype=np.float32)
+        return lambda: buffer.store_transition(obs, 1, 0.5, obs, False)
+
+    @benchmark("ReplayBuffer.sample_buffer", 2000)
+    def bench_sample():
+        buffer = ReplayBuffer(100000, input_dims, n_actions, discrete=True)
+        for i in range(10000):
+            buffer.store_transition(np.random.random(input_dims), i % n_actions, 0.0, np.random.random(input_dims), False)
+        return lambda: buffer.sample_buffer(128)
+
+    @benchmark("Agent.learn", 20)
+    def bench_learn():
+        agent = Agent(alpha=0.0001, gamma=0.99, n_actions=n_actions, epsilon=0.0, batch_size=128, input_dims=input_dims,
+                      epsilon_dec=0.999, mem_size=10000, fname='benchmark_model_unsaved.keras')
+        for i in range(1000):
+            agent.remember(np.random.random(input_dims), i % n_actions, 0.0, np.random.random(input_dims), False)
+        return agent.learn
+
+
+_agent_benchmarks()
+
+
+def run_benchmarks(names=None, repeat=5):
+    results = {}
+    for name, (setup, number) in BENCHMARKS.items():
+        if names and not any(n.lower() in name.lower() for n in names):
+            continue
+        reseed()
+        func = setup()
+        reseed()
+        results[name] = time_call(func, number, repeat)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": SEED,
+        },
+        "results": results,
+    }
+
+
+def print_results(report, baseline=None):
+    for name, r in report["results"].items():
+        line = f"{name:<40}{r['best'] * 1e6:>12.1f} us"
+        if baseline and name in baseline["results"]:
+            line += f"{r['best'] / baseline['results'][name]['best']:>8.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the engine, environment and agent hot paths")
+    parser.add_argument("names", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="earlier JSON results to show relative timings against")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.names, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
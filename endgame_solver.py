@@ -0,0 +1,241 @@
+from collections import OrderedDict
+from math import comb
+import numpy as np
+import s1_game_optimise_for_RL as sg
+import batched_engine as be
+import majority_model
+
+# Exact version of sg.simulate_end_game_and_score. That function deals the cards a seat cannot see to
+# the other seats at random, once; here every distinct deal is enumerated as per-company counts with its
+# probability, so the expected score comes out exactly. Deals are built seat by seat and the deals of
+# the remaining seats from a given pool are memoized, so the same sub-deal is only enumerated once.
+# Enumerations grow fast (a 14-card pool has tens of thousands of deals), so the ones kept between
+# calls are bounded by the number of deals they hold rather than by their count.
+
+MAX_CACHED_DEALS = 200000
+
+
+def _hands(pool, size, company=0):
+    """Every (counts, number of ways) for a hand of `size` cards drawn from the pool counts"""
+    if size == 0:
+        yield (0,) * (len(pool) - company), 1
+        return
+    if company == len(pool):
+        return
+    for k in range(min(size, pool[company]), -1, -1):
+        for rest, ways in _hands(pool, size - k, company + 1):
+            yield (k,) + rest, comb(pool[company], k) * ways
+
+
+def hidden_deals(pool, sizes, memo=None):
+    """All deals of hands of the given sizes from the pool counts, as arrays of their (deals,)
+    probabilities and (deals, len(sizes), companies) hands"""
+    if not sizes:
+        return np.ones(1), np.zeros((1, 0, len(pool)), dtype=np.int8)
+    memo = {} if memo is None else memo
+    key = (pool, sizes)
+    if key in memo:
+        return memo[key]
+    total = comb(sum(pool), sizes[0])
+    if len(sizes) == 1:
+        hands = list(_hands(pool, sizes[0]))
+        memo[key] = (np.array([ways for _, ways in hands], dtype=np.float64) / total,
+                     np.array([hand for hand, _ in hands], dtype=np.int8).reshape(len(hands), 1, len(pool)))
+        return memo[key]
+    probabilities, hands = [np.zeros(0)], [np.zeros((0, len(sizes), len(pool)), dtype=np.int8)]
+    for hand, ways in _hands(pool, sizes[0]):
+        rest = tuple(n - k for n, k in zip(pool, hand))
+        p, rest_hands = hidden_deals(rest, sizes[1:], memo)
+        deals = np.empty((len(p), len(sizes), len(pool)), dtype=np.int8)
+        deals[:, 0] = hand
+        deals[:, 1:] = rest_hands
+        probabilities.append(ways / total * p)
+        hands.append(deals)
+    memo[key] = np.concatenate(probabilities), np.concatenate(hands)
+    return memo[key]
+
+
+_deal_cache = OrderedDict()   # (pool, sizes) -> (probabilities, hands), least recently used first
+_cached_deals = 0
+
+
+def _deal_arrays(pool, sizes):
+    global _cached_deals
+    key = (pool, sizes)
+    if key in _deal_cache:
+        _deal_cache.move_to_end(key)
+        return _deal_cache[key]
+    _deal_cache[key] = probabilities, hands = hidden_deals(pool, sizes)
+    _cached_deals += len(probabilities)
+    while _cached_deals > MAX_CACHED_DEALS and len(_deal_cache) > 1:
+        _, (dropped, _) = _deal_cache.popitem(last=False)
+        _cached_deals -= len(dropped)
+    return probabilities, hands
+
+
+def deal_sizes(unseen_total, num_opponents, hand_size=3):
+    """Cards each opponent gets when simulate_deal_hands deals round-robin from the unseen pool"""
+    dealt = min(hand_size * num_opponents, unseen_total)
+    return tuple((dealt - i + num_opponents - 1) // num_opponents for i in range(num_opponents))
+
+
+def exact_scores(shares, coins, unseen_counts, seat, hand_size=3, hand_sizes=None):
+    """(probabilities, scores) over every distinct deal of the unseen cards, for be.determinized_scores' score"""
+    shares = np.asarray(shares)
+    num_players, num_companies = shares.shape
+    opponents = [p for p in range(num_players) if p != seat]
+    pool = tuple(int(n) for n in unseen_counts)
+    if hand_sizes is None:
+        sizes = deal_sizes(sum(pool), len(opponents), hand_size)
+    else:
+        # the same hands as be.determinized_scores deals, should the pool run short
+        dealt = np.bincount(be.round_robin_seats(hand_sizes, seat, sum(pool)), minlength=num_players)
+        sizes = tuple(int(dealt[p]) for p in opponents)
+    probabilities, hands = _deal_arrays(pool, sizes)
+
+    # a company's transfers only depend on how many of its cards each opponent is dealt, so they are
+    # scored once per count vector (the outcome grid of majority_model) and looked up for every deal
+    seat_sizes = [0] * num_players
+    for p, size in zip(opponents, sizes):
+        seat_sizes[p] = size
+    seat_sizes = tuple(seat_sizes)
+    radix = np.cumprod([1] + [h + 1 for h in seat_sizes[:0:-1]])[::-1]
+    outcome = np.einsum('dqc,q->dc', hands, radix[opponents])
+    transfers = majority_model.outcome_transfers(shares, seat_sizes)
+    final_coins = np.broadcast_to(np.asarray(coins, dtype=np.float64), (len(probabilities), num_players)).copy()
+    for c in range(num_companies):
+        final_coins += transfers[c][outcome[:, c]]
+    return probabilities, be.shaped_scores(final_coins, np.argmax(final_coins, axis=1), seat)
+
+
+def exact_mean_and_variance(shares, coins, unseen_counts, seat, hand_size=3, hand_sizes=None):
+    probabilities, scores = exact_scores(shares, coins, unseen_counts, seat, hand_size, hand_sizes)
+    mean = float(probabilities @ scores)
+    return mean, float(probabilities @ (scores - mean) ** 2)
+
+
+def exact_simulated_score(player_list, company_list, player, hand_size=3):
+    """Exact mean and variance of sg.simulate_end_game_and_score; the exact counterpart of
+    be.estimate_simulated_score, for when few enough cards are unseen to enumerate"""
+    shares, coins, unseen, seat = be.simulated_score_inputs(player_list, company_list, player)
+    return exact_mean_and_variance(shares, coins, unseen, seat, hand_size)
+
+
+def hidden_counts(state, seat):
+    """(unseen counts, hidden hand sizes) from seat's view of a CompactGameState: the cards of each company
+    in the deck, the removed cards and the opponents' hands, and how many cards each opponent holds"""
+    unseen = [max(total - state.hands[seat][c] - state.market[c] - sum(shares[c] for shares in state.shares), 0)
+              for c, total in enumerate(state.total_shares)]
+    hand_sizes = [0 if q == seat else sum(hand) for q, hand in enumerate(state.hands)]
+    return unseen, hand_sizes
+
+
+def state_value(state, seat, score_hand=True):
+    """Exact expected simulated end-game score for seat in a CompactGameState, over every deal of the
+    cards seat cannot see to the opponents' hands; with score_hand the seat's own hand counts as shares,
+    as it will when the game ends"""
+    unseen, hand_sizes = hidden_counts(state, seat)
+    shares = [row[:] for row in state.shares]
+    if score_hand:
+        shares[seat] = [s + h for s, h in zip(shares[seat], state.hands[seat])]
+    return exact_mean_and_variance(shares, state.coins, unseen, seat, hand_sizes=hand_sizes)[0]
+
+
+def action_values(state, seat, pickup, score_hand=True):
+    """{action id: exact expected score after it} for every legal action of seat in a CompactGameState.
+
+    Only what seat can see is used. A deck draw is averaged over every card seat cannot see, each
+    equally likely to be on top.
+    """
+    state.current_player = seat
+    state.pickup_phase = pickup
+    bits = state.legal_action_bits(seat, pickup)
+    values = {}
+    for action_id in range(1 + 3 * state.num_companies):
+        if not bits >> action_id & 1:
+            continue
+        if action_id == 0:
+            values[0] = _deck_value(state, seat, score_hand)
+        else:
+            state.apply(action_id)
+            values[action_id] = state_value(state, seat, score_hand)
+            state.undo()
+    return values
+
+
+def _deck_value(state, seat, score_hand):
+    hidden, _ = hidden_counts(state, seat)
+    total = sum(hidden)
+    top = state.deck_position
+    original = state.deck[top]
+    value = 0.0
+    for c, n in enumerate(hidden):
+        if n > 0:
+            state.deck[top] = c
+            state.apply(0)
+            value += n / total * state_value(state, seat, score_hand)
+            state.undo()
+    state.deck[top] = original
+    return value
+
+
+class EndgamePlayer:
+    """Bot that plays the action with the best exact expected score once at most `threshold` cards are
+    unseen (the deck, the removed cards and the opponents' hands), and a heuristic strategy before that;
+    plugs into Player like the heuristic AIs. The default reaches about the last round and a half of a
+    standard four-player game. The unseen cards are worked out from config's deck, so build one per game
+    with that game's GameConfig."""
+    def __init__(self, threshold=18, fallback="avoid_loss", config=None):
+        self.threshold = threshold
+        self.fallback = sg.get_strategy(fallback)
+        self.config = config or sg.get_game_config()
+        self.company_list = self.config.create_companies()
+
+    def strategy_pair(self):
+        return (self.pickup_strategy, self.putdown_strategy)
+
+    def pickup_strategy(self, player, market, deck, player_list):
+        action_id = self._solve(player, market, deck, player_list, True)
+        if action_id is None:
+            return self.fallback[0](player, market, deck, player_list)
+        if action_id == 0:
+            return sg.Action("pickup_deck")
+        return sg.Action("pickup_market", self.company_list[action_id - 1]._name)
+
+    def putdown_strategy(self, player, market, deck, player_list):
+        action_id = self._solve(player, market, deck, player_list, False)
+        if action_id is None:
+            return self.fallback[1](player, market, deck, player_list)
+        C = len(self.company_list)
+        if action_id <= 2 * C:
+            return sg.Action("putdown_shares", self.company_list[action_id - 1 - C]._name)
+        return sg.Action("putdown_market", self.company_list[action_id - 1 - 2 * C]._name)
+
+    def _solve(self, player, market, deck, player_list, pickup):
+        state = sg.CompactGameState.from_game(self.company_list, player_list, deck, market)
+        seat = player_list.index(player)
+        if sum(hidden_counts(state, seat)[0]) > self.threshold:
+            return None
+        values = action_values(state, seat, pickup)
+        if not values:
+            return None
+        market = [c for c in range(state.num_companies) if 1 + c in values]
+        if pickup and market:
+            # the object engine takes a random collectable card whatever the target, so every market
+            # pickup is worth the same: the average over the cards it could take
+            weights = [state.market[c] for c in market]
+            average = sum(w * values[1 + c] for w, c in zip(weights, market)) / sum(weights)
+            for c in market:
+                values[1 + c] = average
+        return max(values, key=values.get)
+
+
+def make_endgame_strategy(config=None, **kwargs):
+    """(pickup_strategy, putdown_strategy) backed by a fresh EndgamePlayer for a game played with config"""
+    return EndgamePlayer(config=config, **kwargs).strategy_pair()
+
+
+# A factory, as STRATEGIES_ISMCTS: each game gets a player for its own deck (see tournament.resolve_strategy)
+STRATEGIES_ENDGAME = {
+    "endgame": make_endgame_strategy,
+}
@@ -0,0 +1,199 @@
+import struct
+import s1_game_optimise_for_RL as sg
+
+# Binary game records. One record is
+#   header      magic, version, seed (-1 when unseeded), players, companies, starting coins
+#   companies   total shares per company, one byte each, in company_list order
+#   deal        cards in each seat's hand (one byte per seat), then the company id of every card
+#   deck        card count (uint16), then the company id of every card in draw order
+#   moves       move count (uint16), then one byte per move: seat << 5 | action id
+# Action ids follow get_all_game_actions. Only moves that changed the game are kept, so a pickup the
+# engine refused or a turn with nothing to pick up leaves no byte. A file is a run of records, each
+# preceded by its length, so readers can stream it.
+
+MAGIC = b"SGR"
+VERSION = 1
+_HEADER = struct.Struct("<3sBqBBB")
+_COUNT = struct.Struct("<H")
+_LENGTH = struct.Struct("<I")
+SEAT_SHIFT = 5
+ACTION_MASK = (1 << SEAT_SHIFT) - 1
+
+
+def encode_move(seat, action_id):
+    return seat << SEAT_SHIFT | action_id
+
+
+def decode_move(move):
+    """(seat, action id) of one move byte"""
+    return move >> SEAT_SHIFT, move & ACTION_MASK
+
+
+class GameRecord:
+    """Initial deal and move list of one game; replay() rebuilds the game at any move through the engine"""
+    def __init__(self, total_shares, hands, deck, starting_coins=10, seed=None, moves=None):
+        self.total_shares = list(total_shares)
+        self.hands = hands                  # company ids per seat, as dealt
+        self.deck = deck                    # company ids in draw order after the deal
+        self.starting_coins = starting_coins
+        self.seed = seed
+        self.moves = bytearray() if moves is None else bytearray(moves)
+
+    @property
+    def num_players(self):
+        return len(self.hands)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def to_bytes(self):
+        parts = [_HEADER.pack(MAGIC, VERSION, -1 if self.seed is None else self.seed,
+                              self.num_players, len(self.total_shares), self.starting_coins),
+                 bytes(self.total_shares),
+                 bytes(len(hand) for hand in self.hands)]
+        parts.extend(bytes(hand) for hand in self.hands)
+        parts.append(_COUNT.pack(len(self.deck)))
+        parts.append(bytes(self.deck))
+        parts.append(_COUNT.pack(len(self.moves)))
+        parts.append(bytes(self.moves))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, num_players, num_companies, starting_coins = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} game record")
+        pos = _HEADER.size
+        total_shares = list(data[pos:pos + num_companies])
+        pos += num_companies
+        hand_sizes = data[pos:pos + num_players]
+        pos += num_players
+        hands = []
+        for size in hand_sizes:
+            hands.append(list(data[pos:pos + size]))
+            pos += size
+        (deck_size,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size
+        deck = list(data[pos:pos + deck_size])
+        pos += deck_size
+        (move_count,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size
+        moves = data[pos:pos + move_count]
+        return cls(total_shares, hands, deck, starting_coins, None if seed == -1 else seed, moves)
+
+    def initial_state(self, company_list=None):
+        """CompactGameState as dealt, before the first move"""
+        if company_list is None:
+            # the record keeps only share totals; take the variant they belong to
+            companies = sg.default_companies
+            for variant in sg.VARIANTS.values():
+                if [total_shares for _, total_shares in variant] == self.total_shares:
+                    companies = variant
+            company_list = sg.create_companies(companies)
+        if [c._total_shares for c in company_list] != self.total_shares:
+            raise ValueError("company list does not match the recorded game")
+        state = sg.CompactGameState(company_list, self.num_players, self.starting_coins)
+        for seat, hand in enumerate(self.hands):
+            for c in hand:
+                state.hands[seat][c] += 1
+        state.deck = list(self.deck)
+        for c in state.deck:
+            state.deck_counts[c] += 1
+        return state
+
+    def states(self, company_list=None):
+        """Yield the state before the first move and after every move; the same state object is updated in place"""
+        state = self.initial_state(company_list)
+        yield state
+        C = state.num_companies
+        for move in self.moves:
+            seat, action_id = decode_move(move)
+            # the record says who moved, so turn order never has to be reconstructed
+            state.current_player = seat
+            state.pickup_phase = action_id <= C
+            state.apply(action_id)
+            yield state
+
+    def replay(self, upto=None, company_list=None):
+        """State after the first upto moves (all of them by default); undo() steps back from there"""
+        upto = len(self.moves) if upto is None else upto
+        for i, state in enumerate(self.states(company_list)):
+            if i == upto:
+                break
+        return state
+
+
+class GameRecorder:
+    """Builds the GameRecord of a game as it is played.
+
+    Create it after the deal and call record() after every execute_pickup/execute_putdown; the move is
+    read off the player's hand, so moves the engine refused are dropped.
+    """
+    def __init__(self, company_list, player_list, deck, seed=None):
+        C = len(company_list)
+        if len(player_list) > 1 << (8 - SEAT_SHIFT) or 3 * C >= 1 << SEAT_SHIFT:
+            raise ValueError("too many players or companies for one byte per move")
+        self.company_ids = sg.get_company_ids(company_list)
+        self._seats = {id(p): seat for seat, p in enumerate(player_list)}
+        self._hand_sizes = [len(p._hand) for p in player_list]
+        ids = self.company_ids
+        self.game = GameRecord([c._total_shares for c in company_list],
+                               [[ids[card._company] for card in p._hand] for p in player_list],
+                               [ids[card._company] for card in deck],
+                               player_list[0]._coins if player_list else 10, seed)
+
+    def record(self, player, action):
+        seat = self._seats[id(player)]
+        action_id = observed_action_id(player, action, self._hand_sizes[seat], self.company_ids)
+        self._hand_sizes[seat] = len(player._hand)
+        if action_id is not None:
+            self.game.moves.append(encode_move(seat, action_id))
+
+
+def observed_action_id(player, action, hand_size_before, company_ids):
+    """Action id of a move just executed for player, read off its hand; None if the engine refused it"""
+    size = len(player._hand)
+    if size > hand_size_before:
+        if action.type == "pickup_deck":
+            return 0
+        # the engine picks the market card itself, so take the one actually taken
+        return 1 + company_ids[player._last_pickup._company]
+    if size < hand_size_before:
+        target = action.target._name if hasattr(action.target, '_name') else action.target
+        C = len(company_ids)
+        action_id = 1 + C + company_ids[target]
+        if action.type == "putdown_market":
+            action_id += C
+        return action_id
+    return None
+
+
+class RecordWriter:
+    """Appends length-prefixed records to a file"""
+    def __init__(self, path):
+        self._file = open(path, "ab")
+
+    def write(self, game):
+        data = game.to_bytes()
+        self._file.write(_LENGTH.pack(len(data)))
+        self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_records(path):
+    """Yield every GameRecord in a file written by RecordWriter, one at a time"""
+    with open(path, "rb") as f:
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(prefix)
+            yield GameRecord.from_bytes(f.read(length))
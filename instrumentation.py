@@ -0,0 +1,92 @@
+import functools
+import time
+import s1_game_optimise_for_RL as sg
+import RL_environment2 as sr
+
+# Opt-in phase timers. enable() swaps each probed function for a timing wrapper and disable() puts
+# the original back, so nothing is added to the hot paths while instrumentation is off.
+# Timings are inclusive: chip maintenance is also counted inside engine.putdown, and so on.
+
+_probes = []        # (owner, attribute, phase name)
+_originals = {}     # (owner, attribute) -> original object
+_counters = {}      # phase name -> [calls, seconds]
+enabled = False
+
+
+def probe(owner, attribute, name):
+    _probes.append((owner, attribute, name))
+    _counters.setdefault(name, [0, 0.0])
+
+
+probe(sg, "execute_pickup", "engine.pickup")
+probe(sg, "execute_putdown", "engine.putdown")
+probe(sg.Player, "add_chip", "engine.chip_maintenance")
+probe(sg.Player, "remove_chip", "engine.chip_maintenance")
+probe(sg, "end_game_and_score", "engine.scoring")
+probe(sr.StartupsEnv, "_execute_other_players_turn", "env.opponent_turns")
+probe(sr.StartupsEnv, "_get_static_agent_action", "env.static_agent_inference")
+probe(sr.StartupsEnv, "_calculate_reward", "env.reward_shaping")
+probe(sr.StartupsEnv, "_get_observation", "env.observation_encoding")
+
+try:
+    import ai_agent
+    probe(ai_agent.Agent, "choose_action", "agent.action_selection")
+    probe(ai_agent.Agent, "choose_actions", "agent.action_selection")
+    probe(ai_agent.Agent, "learn", "agent.learn")
+except ImportError:
+    # no keras here, so there is no agent to time
+    pass
+
+
+def _timed(func, counter):
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += clock() - start
+    return wrapper
+
+
+def enable():
+    global enabled
+    if enabled:
+        return
+    for owner, attribute, name in _probes:
+        original = owner.__dict__[attribute]
+        _originals[(owner, attribute)] = original
+        setattr(owner, attribute, _timed(original, _counters[name]))
+    enabled = True
+
+
+def disable():
+    global enabled
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+    enabled = False
+
+
+def reset():
+    for counter in _counters.values():
+        counter[0] = 0
+        counter[1] = 0.0
+
+
+def snapshot():
+    """{phase: {"calls": n, "seconds": t}} accumulated since the last reset"""
+    return {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in _counters.items()}
+
+
+def episode_report():
+    """Counters for the episode just played, flattened for a metrics row, then reset for the next one"""
+    row = {}
+    for name, (calls, seconds) in _counters.items():
+        row[f"{name}.calls"] = calls
+        row[f"{name}.seconds"] = seconds
+    reset()
+    return row
@@ -0,0 +1,216 @@
+import math
+import time
+import s1_game_optimise_for_RL as sg
+
+
+class _Node:
+    __slots__ = ('parent', 'action', 'player', 'children', 'child_bits', 'visits', 'availability', 'total_reward')
+
+    def __init__(self, parent, action, player):
+        self.parent = parent
+        self.action = action
+        self.player = player        # seat that played the action leading here
+        self.children = {}
+        self.child_bits = 0         # actions already expanded, same bit layout as legal_action_bits
+        self.visits = 0
+        self.availability = 1
+        self.total_reward = 0.0
+
+
+class ISMCTSPlayer:
+    """Information-set MCTS bot; pickup_strategy and putdown_strategy plug into Player like the heuristic AIs.
+
+    Each iteration deals the cards this seat cannot see (opponents' hands and the deck) at random from
+    the cards not visible in its hand, the shares or the market, then searches one tree shared by all
+    determinizations. The subtree under the pickup is kept for the putdown of the same turn.
+    The hidden cards are dealt from config's deck, so build one per game with that game's GameConfig.
+    """
+    def __init__(self, iterations=100, time_limit=None, exploration=0.7, config=None, rng=None, beliefs=None):
+        self.iterations = iterations
+        self.time_limit = time_limit    # seconds per decision; overrides iterations when set
+        self.exploration = exploration
+        self.config = config or sg.get_game_config()
+        self.company_list = self.config.create_companies()
+        self.rng = rng                  # None: draw from the rng of the player being searched for
+        self._rng = rng
+        # a BeliefTracker fed every move of the game, e.g. as play_game's recorder; without one the
+        # hidden cards are worked out from the table at each decision and market pickups are forgotten
+        self.beliefs = beliefs
+        self._pending = None            # (player, tree after our pickup, action chosen)
+
+    def strategy_pair(self):
+        return (self.pickup_strategy, self.putdown_strategy)
+
+    def pickup_strategy(self, player, market, deck, player_list):
+        root = _Node(None, None, None)
+        action_id = self._search(root, player, market, deck, player_list, True)
+        if action_id is None:
+            self._pending = None
+            return None
+        self._pending = (player, root, action_id)
+        if action_id == 0:
+            return sg.Action("pickup_deck")
+        return sg.Action("pickup_market", self.company_list[action_id - 1]._name)
+
+    def putdown_strategy(self, player, market, deck, player_list):
+        root = None
+        if self._pending is not None and self._pending[0] is player:
+            _, pickup_root, action_id = self._pending
+            if action_id != 0 and player._last_pickup is not None:
+                # the engine takes a random collectable market card, so follow the card actually taken
+                action_id = 1 + self._company_index(player._last_pickup._company)
+            root = pickup_root.children.get(action_id)
+        self._pending = None
+        if root is None:
+            root = _Node(None, None, None)
+        root.parent = None
+        action_id = self._search(root, player, market, deck, player_list, False)
+        if action_id is None:
+            return None
+        C = len(self.company_list)
+        if action_id <= 2 * C:
+            return sg.Action("putdown_shares", self.company_list[action_id - 1 - C]._name)
+        return sg.Action("putdown_market", self.company_list[action_id - 1 - 2 * C]._name)
+
+    def _company_index(self, company_name):
+        for i, company in enumerate(self.company_list):
+            if company._name == company_name:
+                return i
+        return -1
+
+    def _search(self, root, player, market, deck, player_list, pickup):
+        self._rng = self.rng if self.rng is not None else player.rng
+        info_state, seat, unseen, hand_sizes = self._information_state(player, market, deck, player_list, pickup)
+        legal = info_state.legal_actions()
+        if legal == 0:
+            return None
+        if legal & (legal - 1) == 0:
+            return legal.bit_length() - 1
+
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        iteration = 0
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline and iteration > 0:
+                    break
+            elif iteration >= self.iterations:
+                break
+            iteration += 1
+            state = self._determinize(info_state, seat, unseen, hand_sizes, len(deck))
+            self._iterate(root, state)
+
+        best = None
+        for action_id, child in root.children.items():
+            if legal >> action_id & 1 and (best is None or child.visits > best.visits):
+                best = child
+        return best.action if best is not None else self._random_action(legal)
+
+    def _information_state(self, player, market, deck, player_list, pickup):
+        state = sg.CompactGameState.from_game(self.company_list, player_list, deck, market)
+        seat = player_list.index(player)
+        base = state.clone()
+        if self.beliefs is not None:
+            unseen = self.beliefs.unseen_counts(seat).tolist()
+            known = self.beliefs.known_hands(seat).tolist()
+            hand_sizes = self.beliefs.hidden_hand_sizes(seat).tolist()
+        else:
+            unseen = list(state.total_shares)
+            for c in range(state.num_companies):
+                unseen[c] -= state.hands[seat][c] + state.market[c]
+                for q in range(state.num_players):
+                    unseen[c] -= state.shares[q][c]
+            known = [[0] * state.num_companies for _ in range(state.num_players)]
+            hand_sizes = [sum(hand) for hand in state.hands]
+        # the rest of the opponents' hands and the deck are hidden; they are filled in per determinization
+        for q in range(state.num_players):
+            if q != seat:
+                base.hands[q] = known[q]
+        base.deck = [-1] * len(deck)
+        base.deck_counts = [0] * state.num_companies
+        base.current_player = seat
+        base.pickup_phase = pickup
+        return base, seat, unseen, hand_sizes
+
+    def _determinize(self, info_state, seat, unseen, hand_sizes, deck_size):
+        pool = [c for c, n in enumerate(unseen) for _ in range(n)]
+        self._rng.shuffle(pool)
+        state = info_state.clone()
+        position = 0
+        for q, size in enumerate(hand_sizes):
+            if q != seat:
+                hand = state.hands[q]
+                for c in pool[position:position + size]:
+                    hand[c] += 1
+                position += size
+        # whatever is left over after the deck stands in for the cards removed at the start
+        state.deck = pool[position:position + deck_size]
+        state.deck_position = 0
+        for c in state.deck:
+            state.deck_counts[c] += 1
+        return state
+
+    def _iterate(self, root, state):
+        node = root
+        # selection and expansion
+        while not state.done:
+            legal = state.legal_actions()
+            if legal == 0:
+                break
+            untried = legal & ~node.child_bits
+            if untried:
+                action_id = self._random_action(untried)
+                child = _Node(node, action_id, state.current_player)
+                node.children[action_id] = child
+                node.child_bits |= 1 << action_id
+                state.apply(action_id)
+                node = child
+                break
+            best = None
+            best_value = -math.inf
+            for action_id, child in node.children.items():
+                if legal >> action_id & 1:
+                    value = child.total_reward / child.visits + self.exploration * math.sqrt(math.log(child.availability) / child.visits)
+                    if value > best_value:
+                        best = child
+                        best_value = value
+                    child.availability += 1
+            state.apply(best.action)
+            node = best
+
+        # random playout to the end of the game
+        while not state.done:
+            legal = state.legal_actions()
+            if legal == 0:
+                break
+            state.apply(self._random_action(legal))
+
+        coins = state.final_coins()
+        top = max(coins)
+        winners = coins.count(top)
+        while node is not None:
+            node.visits += 1
+            if node.player is not None and coins[node.player] == top:
+                node.total_reward += 1.0 / winners
+            node = node.parent
+
+    def _random_action(self, bits):
+        choices = []
+        action_id = 0
+        while bits:
+            if bits & 1:
+                choices.append(action_id)
+            bits >>= 1
+            action_id += 1
+        return self._rng.choice(choices)
+
+
+def make_ismcts_strategy(config=None, **kwargs):
+    """(pickup_strategy, putdown_strategy) backed by a fresh ISMCTSPlayer for a game played with config"""
+    return ISMCTSPlayer(config=config, **kwargs).strategy_pair()
+
+
+# Factories rather than strategy pairs: the bot keeps state between the decisions of one game and
+# searches that game's deck, so every seat of every game gets its own (see tournament.resolve_strategy)
+STRATEGIES_ISMCTS = {
+    "ismcts": make_ismcts_strategy,
+}
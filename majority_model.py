@@ -0,0 +1,103 @@
+from functools import lru_cache
+from math import comb
+import itertools
+import numpy as np
+
+# Closed-form end-game majorities. The hidden hands are dealt from the unseen pool, so for one company
+# the numbers of its cards landing in each opponent's hand follow a multivariate hypergeometric law:
+#   P(x_1..x_k) = prod C(h_q, x_q) * C(N - H, K - sum x) / C(N, K)
+# with N unseen cards, K of them of the company, hands of h_q cards and H = sum h_q. Hands hold a few
+# cards, so every (x_1..x_k) is enumerated for all companies at once and scored with the end-game rule.
+# Each company's majority and transfer only depend on that company's cards, so the probabilities and
+# the expected coins are exact; only quantities that couple the companies (who wins) are approximated.
+
+MAX_CARDS = 128
+# C(n, k) for every count the game can reach, zero where k > n
+COMB = np.array([[comb(n, k) for k in range(MAX_CARDS + 1)] for n in range(MAX_CARDS + 1)], dtype=np.float64)
+
+
+@lru_cache(maxsize=256)
+def _outcomes(hand_sizes):
+    """(outcomes, players) grid of how many cards of one company each hand can receive, with the ways
+    to place them in the hands and their total"""
+    x = np.array(list(itertools.product(*(range(h + 1) for h in hand_sizes))), dtype=np.int64)
+    return x, COMB[np.array(hand_sizes), x].prod(axis=1), x.sum(axis=1)
+
+
+@lru_cache(maxsize=65536)
+def _scored_outcomes(hand_sizes, company_shares):
+    """(outcomes, 2 * players + 1) end-game result of every outcome for one company's share counts:
+    which seat holds the majority (last of the first players + 1 columns: nobody), then each seat's transfer"""
+    x = _outcomes(hand_sizes)[0]
+    final = np.array(company_shares)[None, :] + x
+    is_max = final == final.max(axis=1, keepdims=True)
+    unique = is_max.sum(axis=1, keepdims=True) == 1
+    majority = is_max & unique
+    # same rule as be.score_games: the majority holder takes 3x what the others hold, which they pay
+    paid = np.where(unique & ~majority, final, 0)
+    transfer = np.where(majority, 3 * paid.sum(axis=1, keepdims=True), 0) - paid
+    return np.concatenate([majority, ~unique, transfer], axis=1).astype(np.float64)
+
+
+@lru_cache(maxsize=4096)
+def _scored_table(hand_sizes, share_columns):
+    # shares only change when a card is put down, so whole tables repeat from step to step
+    return np.stack([_scored_outcomes(hand_sizes, column) for column in share_columns])
+
+
+def outcome_transfers(shares, hand_sizes):
+    """(companies, outcomes, players) coins each seat gains or loses at scoring for every row of the
+    outcome grid for hand_sizes, whose rows count up the cards each hand gets, the last seat fastest"""
+    shares = np.asarray(shares)
+    hand_sizes = tuple(int(h) for h in hand_sizes)
+    return _scored_table(hand_sizes, tuple(map(tuple, shares.T.tolist())))[:, :, shares.shape[0] + 1:]
+
+
+def outcome_probabilities(unseen_counts, hand_sizes):
+    """(companies, outcomes) probability of each row of the outcome grid for hand_sizes, per company"""
+    if sum(hand_sizes) > sum(unseen_counts):
+        raise ValueError(f"hands of {sum(hand_sizes)} cards cannot be dealt from {sum(unseen_counts)} unseen cards")
+    return _probabilities(tuple(int(n) for n in unseen_counts), tuple(int(h) for h in hand_sizes))
+
+
+@lru_cache(maxsize=4096)
+def _probabilities(unseen_counts, hand_sizes):
+    unseen = np.array(unseen_counts)
+    _, ways, dealt = _outcomes(hand_sizes)
+    N, H = sum(unseen_counts), sum(hand_sizes)
+    rest = unseen[:, None] - dealt[None, :]                 # the company's cards left among the undealt ones
+    probabilities = ways * COMB[N - H, np.maximum(rest, 0)] / COMB[N, unseen][:, None]
+    return np.where(rest >= 0, probabilities, 0.0)
+
+
+def majority_distribution(shares, unseen_counts, hand_sizes):
+    """Probability of each final majority holder and expected coin transfer, per company.
+
+    shares is (players, companies) of cards already counted for each seat, unseen_counts the cards no
+    seat is known to hold and hand_sizes how many of them each seat is still dealt (0 for the seat
+    whose view this is, see BeliefTracker.score_inputs). Returns (companies, players + 1) probabilities,
+    the last column for no majority (a tie), and the (companies, players) expected coins each seat
+    gains or loses at scoring.
+    """
+    shares = np.asarray(shares)
+    num_players = shares.shape[0]
+    hand_sizes = tuple(int(h) for h in hand_sizes)
+    probabilities = outcome_probabilities(unseen_counts, hand_sizes)
+    scored = _scored_table(hand_sizes, tuple(map(tuple, shares.T.tolist())))
+    expected = np.einsum('co,cok->ck', probabilities, scored)
+    return expected[:, :num_players + 1], expected[:, num_players + 1:]
+
+
+def expected_final_coins(shares, coins, unseen_counts, hand_sizes):
+    """Exact expected coins of every seat after end-game scoring"""
+    _, transfer = majority_distribution(shares, unseen_counts, hand_sizes)
+    return np.asarray(coins) + transfer.sum(axis=0)
+
+
+def analytic_score(shares, coins, unseen_counts, seat, hand_sizes):
+    """Deterministic stand-in for be.determinized_scores' mean: the distance-from-average term is the
+    exact expectation, the win/loss term is taken from the expected final coins"""
+    final = expected_final_coins(shares, coins, unseen_counts, hand_sizes).tolist()
+    # first seat on ties, as max()/min() over player_list
+    win_value = 1 if final.index(max(final)) == seat else -1 if final.index(min(final)) == seat else 0
+    return 0.5 * (final[seat] - sum(final) / len(final)) + win_value
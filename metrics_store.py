@@ -0,0 +1,53 @@
+import json
+
+# Append-only training metrics: one JSON object per line, so writing an episode costs the same at
+# episode 50,000 as at episode 1 and nothing is kept in memory beyond the unflushed buffer.
+# Rows may carry different keys (e.g. phase timings only when profiling is on).
+
+
+class MetricsWriter:
+    """Buffers rows and appends them to a JSON-lines file every flush_every rows"""
+    def __init__(self, path, flush_every=100, append=False):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "a" if append else "w")
+        self._buffer = []
+
+    def write(self, row):
+        self._buffer.append(json.dumps(row))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_metrics(path):
+    """Yield the rows of a metrics file one at a time"""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_columns(path, columns, every=1):
+    """{column: values} for just the named columns, keeping every n-th row; missing values are None"""
+    result = {column: [] for column in columns}
+    for i, row in enumerate(read_metrics(path)):
+        if i % every == 0:
+            for column in columns:
+                result[column].append(row.get(column))
+    return result
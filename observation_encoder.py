@@ -0,0 +1,105 @@
+import numpy as np
+import s1_game_optimise_for_RL as sg
+from game_record import observed_action_id
+
+# StartupsEnv observations (GameConfig.observation_layout) without rebuilding them from the game objects.
+# Every seat's coins, hand, shares and chips are kept as one row of a float32 table, in the order the
+# observation lists them, and the market as its per-company counts and richest card's coins. A move
+# only rewrites the entries it changes, and an observation for any seat is a few slice copies out of
+# the tables into a preallocated buffer or a row the caller owns.
+
+
+class ObservationEncoder:
+    """Fixed-layout float32 observations of one game, for any seat, kept up to date move by move.
+
+    Build it once the hands are dealt and call record() after every execute_pickup/execute_putdown,
+    the same hook as game_record.GameRecorder. refresh() rebuilds everything from the game objects,
+    for changes made outside that hook such as end_game_and_score. The unseen-card section, when the
+    config has one, comes from a BeliefTracker fed the same moves.
+    """
+    def __init__(self, config, company_list, player_list, market, beliefs):
+        C = config.num_companies
+        self.num_companies = C
+        self.company_ids = sg.get_company_ids(company_list)
+        self.beliefs = beliefs
+        self._company_names = [c._name for c in company_list]
+        self._players = player_list
+        self._market = market
+        self._seats = {id(p): seat for seat, p in enumerate(player_list)}
+        self._hand_sizes = [len(p._hand) for p in player_list]
+
+        self._table = np.zeros((len(player_list), 1 + 3 * C), dtype=np.float32)  # coins, hand, shares, chips
+        self._market_table = np.zeros(2 * C, dtype=np.float32)                  # counts, then richest coins
+        layout = config.observation_layout
+        self._own = slice(0, layout["market"].start)
+        self._market_section = slice(layout["market"].start, layout["market_coins"].stop)
+        self._unseen = layout.get("unseen")
+        self._opponents = slice(layout["market_coins"].stop, (self._unseen or layout["phase"]).start)
+        self._phase = layout["phase"].start
+        # opponents are listed in seat order with their coins, shares and chips
+        columns = np.r_[0, 1 + C:1 + 3 * C]
+        self._opponent_index = [np.ix_([q for q in range(len(player_list)) if q != seat], columns)
+                                for seat in range(len(player_list))]
+        self.buffer = np.zeros(config.observation_size, dtype=np.float32)
+        self.refresh()
+
+    def refresh(self):
+        C = self.num_companies
+        for seat, p in enumerate(self._players):
+            row = self._table[seat]
+            row[0] = p._coins
+            hand = sg.get_card_dictionary(p._hand)
+            chips = {company._name for company in p._chips}
+            for c, name in enumerate(self._company_names):
+                row[1 + c] = hand.get(name, 0)
+                row[1 + C + c] = p._share_counts.get(name, 0)
+                row[1 + 2 * C + c] = name in chips
+            self._hand_sizes[seat] = len(p._hand)
+        self._market_table[:] = 0
+        for card in self._market:
+            c = self.company_ids[card._company]
+            self._market_table[c] += 1
+            self._market_table[C + c] = max(self._market_table[C + c], card._coins_on)
+
+    def record(self, player, action):
+        seat = self._seats[id(player)]
+        action_id = observed_action_id(player, action, self._hand_sizes[seat], self.company_ids)
+        self._hand_sizes[seat] = len(player._hand)
+        if action_id is None:
+            return
+        C = self.num_companies
+        row = self._table[seat]
+        row[0] = player._coins
+        market = self._market_table
+        if action_id == 0:
+            row[1 + self.company_ids[player._last_pickup._company]] += 1
+            # the draw paid a coin onto every market card of the companies the player has no chip for
+            market[C:] += (market[:C] > 0) & (row[1 + 2 * C:] == 0)
+        elif action_id <= C:
+            c = action_id - 1
+            row[1 + c] += 1
+            market[c] -= 1
+            name = self._company_names[c]
+            market[C + c] = max([card._coins_on for card in self._market if card._company == name], default=0)
+        else:
+            c = (action_id - 1 - C) % C
+            row[1 + c] -= 1
+            if action_id <= 2 * C:
+                row[1 + C + c] += 1
+                # a new share can move the anti-monopoly chip of that company between any seats
+                name = self._company_names[c]
+                for q, p in enumerate(self._players):
+                    self._table[q, 1 + 2 * C + c] = any(company._name == name for company in p._chips)
+            else:
+                market[c] += 1      # a card put down to the market carries no coins
+
+    def encode(self, seat, phase, out=None):
+        """Observation for seat, written into out (default: self.buffer, overwritten by the next call)"""
+        out = self.buffer if out is None else out
+        out[self._own] = self._table[seat]
+        out[self._market_section] = self._market_table
+        out[self._opponents] = self._table[self._opponent_index[seat]].ravel()
+        if self._unseen is not None:
+            out[self._unseen] = self.beliefs.unseen[seat]
+        out[self._phase] = phase
+        return out
@@ -7,7 +7,11 @@ import traceback
 import sys
 import s1_game_optimise_for_RL as sg 
 import RL_environment2 as sr
-import pandas as pd
+from vector_env import StartupsVectorEnv, ParallelStartupsVectorEnv
+from functools import partial
+import instrumentation
+import metrics_store
+from collections import deque
 from datetime import datetime
 import time
 import keras
@@ -24,9 +28,19 @@ def load_static_agent(filepath):
     
     return KerasStaticAgent(filepath)
 
-def plotLearning(x, scores, eps_history, filename):
+def load_static_agents(filepaths):
+    # picklable factory, so worker processes can load their own copies
+    return [load_static_agent(filepath) for filepath in filepaths]
+
+def plotLearning(metrics_path, filename, every=1):
     #print("Creating plot...")
     try:
+        # only the plotted columns are read back from the episode log
+        data = metrics_store.read_columns(metrics_path, ["episode", "score", "epsilon"], every)
+        x = [e + 1 for e in data["episode"]]
+        scores = data["score"]
+        eps_history = data["epsilon"]
+        
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
         
         # Plot scores
@@ -55,11 +69,75 @@ def plotLearning(x, scores, eps_history, filename):
 learn_interval = 8  # Learn every 4 steps
 global_step_count = 0  # Track total steps across all episodes
 episode_count = 0
+profile_phases = False  # per-episode phase timings in game_history, see instrumentation.py
+record_path = None  # e.g. "games.sgr" to keep every game as a binary game record, see game_record.py
+game_variant = "standard"  # a key of sg.VARIANTS; "small" trains faster, "extended" adds Woofy Railway
+num_players = 4
+unseen_features = False  # add the unseen-card counts to the observation; changes the network input size (71 -> 77 for 4 players), so needs a model trained with them
+analytic_reward = False  # deterministic closed-form reward shaping instead of sampled deals, see majority_model.py
+exact_reward_threshold = None  # e.g. 6: exact expected reward once that few cards are unseen, see endgame_solver.py
+num_envs = 1  # games played at once; above 1 they run in a StartupsVectorEnv and actions are chosen in batches
+num_workers = 0  # with num_envs above 1, run the games in this many processes (ParallelStartupsVectorEnv)
+
+def train_vectorized(agent, vec_env, num_episodes, game_history, recent_scores, profile_phases=False):
+    """Training loop over a StartupsVectorEnv: every step is one batched forward pass for all games.
+
+    With profile_phases, each episode row carries the phase timings of every game played in this
+    process since the previous row (the games run in lockstep, so they cannot be told apart).
+    """
+    if profile_phases and isinstance(vec_env, ParallelStartupsVectorEnv):
+        # the games run in the worker processes, whose counters nothing collects
+        raise ValueError("profile_phases cannot time ParallelStartupsVectorEnv workers; use num_workers = 0")
+    observations, infos = vec_env.reset()
+    masks = infos["action_mask"]
+    scores = np.zeros(vec_env.num_envs)
+    steps = np.zeros(vec_env.num_envs, dtype=np.int64)
+    start_times = [time.time()] * vec_env.num_envs
+    episode = 0
+    while episode < num_episodes:
+        actions = agent.choose_actions(observations, masks)
+        observations_, rewards, terminations, truncations, infos = vec_env.step(actions)
+        done = terminations | truncations
+        for i in range(vec_env.num_envs):
+            # a finished game's next state is its last observation, not the first one of the game replacing it
+            next_observation = infos["final_obs"][i] if done[i] else observations_[i]
+            agent.remember(observations[i], actions[i], rewards[i], next_observation, done[i])
+        scores += rewards
+        steps += 1
+
+        for i in np.flatnonzero(done):
+            final_info = infos["final_info"][i]
+            row = {
+                'episode': episode,
+                'score': float(scores[i]),
+                'runtime': time.time() - start_times[i],
+                'steps': int(steps[i]),
+                'rl_actions': int(steps[i]),
+                'epsilon': agent.epsilon,
+                'rl_rank': final_info.get('rl_rank'),
+                'rl_coins': final_info.get('rl_coins')
+            }
+            if profile_phases:
+                row.update(instrumentation.episode_report())
+            game_history.write(row)
+            recent_scores.append(scores[i])
+            scores[i] = 0
+            steps[i] = 0
+            start_times[i] = time.time()
+
+            # decay epsilon once per episode
+            agent.epsilon = max(agent.epsilon * agent.epsilon_dec, agent.epsilon_min)
+            if episode % 100 == 0 and episode > 0:
+                agent.save_model()
+            episode += 1
+
+        observations, masks = observations_, infos["action_mask"]
 
 
 if __name__ == '__main__':
     #print("Main block entered")
-    default_companies = [["Giraffe Beer", 5],["Bowwow Games",6],["Flamingo Soft",7],["Octo Coffee", 8],["Hippo Powertech", 9],["Elephant Mars Travel", 10]]
+    game_config = sg.get_game_config(game_variant, num_players, unseen_features=unseen_features)
+    default_companies = game_config.companies
     player_actions_pick_up = ["pickup_deck", "pickup_market"]
     player_actions_put_down = ["putdown_shares", "putdown_market"]
     
@@ -73,7 +151,7 @@ if __name__ == '__main__':
 
         s_agents = [static_agent_best, static_agent_best_2, static_agent_best_3, static_agent_best_4]
         # change the above if you do not want any old agents as players
-        env = sr.StartupsEnv(total_players=4, num_humans=0, default_company_list=default_companies, static_agents=s_agents)
+        env = sr.StartupsEnv(total_players=num_players, num_humans=0, default_company_list=default_companies, static_agents=s_agents, record_path=record_path, config=game_config, analytic_reward=analytic_reward, exact_reward_threshold=exact_reward_threshold)
         #print(f"Environment created successfully. Action space: {env.action_space}, Observation space: {env.observation_space}")
         
         epsilon_start = 1.0
@@ -83,140 +161,156 @@ if __name__ == '__main__':
         epsilon_decay = (epsilon_end / epsilon_start) ** (1.0 / (k * num_episodes))
     
         #print("Creating agent...")
-        # make input_dims match the observation space without hardcoding
-        agent = Agent(alpha=0.0001, gamma=0.99, n_actions=env.action_space.n, epsilon=0.0, batch_size=128, input_dims=env.observation_space.shape[0], epsilon_dec=epsilon_decay, epsilon_end=epsilon_end, mem_size=500000, fname='C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\StartupsGame\\startup_model_42.keras', best_fname='C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\StartupsGame\\startup_model_best.keras')
+        # network sizes come from the shared game config
+        agent = Agent(alpha=0.0001, gamma=0.99, n_actions=game_config.num_actions, epsilon=0.0, batch_size=128, input_dims=game_config.observation_size, epsilon_dec=epsilon_decay, epsilon_end=epsilon_end, mem_size=500000, fname='C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\StartupsGame\\startup_model_42.keras', best_fname='C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\StartupsGame\\startup_model_best.keras')
         #print("Agent created successfully")
         initial_weights = agent.q_eval.get_weights()[0].copy()
 
-        game_history = []
+        history_path = 'C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\game_history.jsonl'
+        game_history = metrics_store.MetricsWriter(history_path)
         action_history = []
 
-        scores = []
-        eps_history = []
+        recent_scores = deque(maxlen=101)  # enough for the running average
 
-        for i in range(num_episodes):
-            #print(f"Starting episode {i}")
-            done = False
-            score = 0
-            episode_count = 0
-            episode_start_time = time.time()  # Add this line
+        if profile_phases:
+            instrumentation.enable()
+
+        if num_envs > 1 and num_workers:
+            static_agents_fn = partial(load_static_agents, [r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_42.keras"] * 4)
+            vec_env = ParallelStartupsVectorEnv(num_envs, num_workers, num_players, 0, default_companies, static_agents_fn=static_agents_fn,
+                                                config=game_config, record_path=record_path, analytic_reward=analytic_reward, exact_reward_threshold=exact_reward_threshold)
+        elif num_envs > 1:
+            vec_env = StartupsVectorEnv(num_envs, num_players, 0, default_companies, s_agents, config=game_config,
+                                        record_path=record_path, analytic_reward=analytic_reward, exact_reward_threshold=exact_reward_threshold)
+        if num_envs > 1:
+            train_vectorized(agent, vec_env, num_episodes, game_history, recent_scores, profile_phases)
+            vec_env.close()
+        else:
+            for i in range(num_episodes):
+                #print(f"Starting episode {i}")
+                done = False
+                score = 0
+                episode_count = 0
+                episode_start_time = time.time()  # Add this line
             
-            try:
-                observation, info = env.reset()
-                #print(f"Episode {i} - Initial observation shape: {observation.shape}")
-            except Exception as e:
-                #print(f"Error during env.reset(): {e}")
-                traceback.print_exc()
-                continue
+                try:
+                    observation, info = env.reset()
+                    #print(f"Episode {i} - Initial observation shape: {observation.shape}")
+                except Exception as e:
+                    #print(f"Error during env.reset(): {e}")
+                    traceback.print_exc()
+                    continue
             
-            step_count = 0
-            rl_actions_taken = 0
-            max_steps = 50
+                step_count = 0
+                rl_actions_taken = 0
+                max_steps = 50
 
-            while not done and step_count < max_steps:
-                try:
-                    current_phase = env.state_controller.get_current_phase()
-                    #print(f"Step {step_count}, Phase: {current_phase}")
+                while not done and step_count < max_steps:
+                    try:
+                        current_phase = env.state_controller.get_current_phase()
+                        #print(f"Step {step_count}, Phase: {current_phase}")
 
-                    if current_phase in (sr.TurnPhase.RL_PUTDOWN, sr.TurnPhase.RL_PICKUP):
-                        action = agent.choose_action(observation, env)
-                        #print(f"RL agent choosing action {action}")
-                        rl_actions_taken += 1
+                        if current_phase in (sr.TurnPhase.RL_PUTDOWN, sr.TurnPhase.RL_PICKUP):
+                            action = agent.choose_action(observation, env)
+                            #print(f"RL agent choosing action {action}")
+                            rl_actions_taken += 1
 
-                        observation_, reward, terminated, truncated, info = env.step(action)
-                        done = terminated or truncated
+                            observation_, reward, terminated, truncated, info = env.step(action)
+                            done = terminated or truncated
                         
-                        if 'invalid_action' in info and info['invalid_action']:
-                            pass
-                            #print(f"Invalid action taken: {action}")
+                            if 'invalid_action' in info and info['invalid_action']:
+                                pass
+                                #print(f"Invalid action taken: {action}")
 
-                        agent.remember(observation, action, reward, observation_, done)
-                        observation = observation_
-                        score += reward
+                            agent.remember(observation, action, reward, observation_, done)
+                            observation = observation_
+                            score += reward
 
-                        global_step_count += 1
+                            global_step_count += 1
                         
-                        #if (global_step_count % learn_interval == 0 and 
-                        #    agent.memory.mem_cntr > agent.batch_size):
-                        #    agent.learn()
+                            #if (global_step_count % learn_interval == 0 and 
+                            #    agent.memory.mem_cntr > agent.batch_size):
+                            #    agent.learn()
                         
-                        #print(f"Action {action}, Reward: {reward}, Score: {score}")
+                            #print(f"Action {action}, Reward: {reward}, Score: {score}")
                         
-                    else:
-                        # Not RL agent's turn - step anyway to advance game state
-                        # Pass a dummy action (0) since other players will be handled internally
-                        observation_, reward, terminated, truncated, info = env.step(0)
-                        done = terminated or truncated
-                        observation = observation_
-                        #print(f"Other players' turn, game state advanced")
+                        else:
+                            # Not RL agent's turn - step anyway to advance game state
+                            # Pass a dummy action (0) since other players will be handled internally
+                            observation_, reward, terminated, truncated, info = env.step(0)
+                            done = terminated or truncated
+                            observation = observation_
+                            #print(f"Other players' turn, game state advanced")
 
-                    step_count += 1
+                        step_count += 1
 
                     
-                except Exception as e:
-                    #print(f"Error during step {step_count} of episode {i}: {e}")
-                    traceback.print_exc()
-                    break
+                    except Exception as e:
+                        #print(f"Error during step {step_count} of episode {i}: {e}")
+                        traceback.print_exc()
+                        break
 
-            #if done and (agent.memory.mem_cntr > agent.batch_size):
-            #    agent.learn() 
+                #if done and (agent.memory.mem_cntr > agent.batch_size):
+                #    agent.learn() 
             
-            if step_count >= max_steps:
-                pass
-                #print(f"Episode {i} exceeded {max_steps} steps, ending...")
-
-            episode_runtime = time.time() - episode_start_time
-            game_history.append({
-                'episode': i,
-                'score': score,
-                'runtime': episode_runtime,
-                'steps': step_count,
-                'rl_actions': rl_actions_taken,
-                'epsilon': agent.epsilon,
-                'rl_rank': env._calculate_player_rank()+1,
-                'rl_coins': env._get_coins_for_score()
-            })
-            eps_history.append(agent.epsilon)
-            scores.append(score)
-            avg_score = np.mean(scores[max(0, i-100):i+1])
-            #print(f'episode {i}, score {score:.2f}, average score {avg_score:.2f}, epsilon {agent.epsilon:.3f}')
+                if step_count >= max_steps:
+                    pass
+                    #print(f"Episode {i} exceeded {max_steps} steps, ending...")
+
+                episode_runtime = time.time() - episode_start_time
+                row = {
+                    'episode': i,
+                    'score': score,
+                    'runtime': episode_runtime,
+                    'steps': step_count,
+                    'rl_actions': rl_actions_taken,
+                    'epsilon': agent.epsilon,
+                    'rl_rank': env._calculate_player_rank()+1,
+                    'rl_coins': env._get_coins_for_score()
+                }
+                if profile_phases:
+                    row.update(instrumentation.episode_report())
+                game_history.write(row)
+                recent_scores.append(score)
+                avg_score = np.mean(recent_scores)
+                #print(f'episode {i}, score {score:.2f}, average score {avg_score:.2f}, epsilon {agent.epsilon:.3f}')
             
-            # decay epsilon once per episode
-            if agent.epsilon > agent.epsilon_min:
-                agent.epsilon = agent.epsilon * agent.epsilon_dec
-            else:
-                agent.epsilon = agent.epsilon_min
+                # decay epsilon once per episode
+                if agent.epsilon > agent.epsilon_min:
+                    agent.epsilon = agent.epsilon * agent.epsilon_dec
+                else:
+                    agent.epsilon = agent.epsilon_min
 
-            if i % 100 == 0 and i > 0:
-                try:
-                    agent.save_model()
-                    #print(f"Model saved at episode {i}")
+                if i % 100 == 0 and i > 0:
+                    try:
+                        agent.save_model()
+                        #print(f"Model saved at episode {i}")
 
-                    current_weights = agent.q_eval.get_weights()[0]
-                    weight_change = np.mean(np.abs(current_weights - initial_weights))
-                    print(f"Episode {i}: Weight change magnitude: {weight_change:.6f}")
+                        current_weights = agent.q_eval.get_weights()[0]
+                        weight_change = np.mean(np.abs(current_weights - initial_weights))
+                        print(f"Episode {i}: Weight change magnitude: {weight_change:.6f}")
                     
-                    # Check Q-values for a dummy state
-                    dummy_state = np.zeros((1, env.observation_space.shape[0]))
-                    q_values = agent.q_eval.predict(dummy_state, verbose=0)[0]
-                    print(f"Q-values: min={q_values.min():.3f}, max={q_values.max():.3f}, std={q_values.std():.3f}")
-                    print(f"Memory counter: {agent.memory.mem_cntr}, Epsilon: {agent.epsilon:.4f}")
-                except Exception as e:
-                    pass
-                    #print(f"Error saving model: {e}")
+                        # Check Q-values for a dummy state
+                        dummy_state = np.zeros((1, env.observation_space.shape[0]))
+                        q_values = agent.q_eval.predict(dummy_state, verbose=0)[0]
+                        print(f"Q-values: min={q_values.min():.3f}, max={q_values.max():.3f}, std={q_values.std():.3f}")
+                        print(f"Memory counter: {agent.memory.mem_cntr}, Epsilon: {agent.epsilon:.4f}")
+                    except Exception as e:
+                        pass
+                        #print(f"Error saving model: {e}")
             
-            if i % 1000 == 0 and i > 0:
-                pd.DataFrame(game_history).to_csv('C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\game_history.csv', index=False)
+                if i % 1000 == 0 and i > 0:
+                    game_history.flush()
                 
-                agent.save_best_model()
+                    agent.save_best_model()
 
-                static_agent_best = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
-                static_agent_best_2 = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
-                static_agent_best_3 = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
-                static_agent_best_4 = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
+                    static_agent_best = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
+                    static_agent_best_2 = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
+                    static_agent_best_3 = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
+                    static_agent_best_4 = load_static_agent(r"C:\Users\jezkn\OneDrive\Documents\Startups\startup_model_best.keras")
                 
-                s_agents =  None #[static_agent_best, static_agent_best_2, static_agent_best_3, static_agent_best_4]
-                env.static_agents = s_agents
+                    s_agents =  None #[static_agent_best, static_agent_best_2, static_agent_best_3, static_agent_best_4]
+                    env.static_agents = s_agents
                 
 
         # Final model save
@@ -229,13 +323,11 @@ if __name__ == '__main__':
 
         # After training loop, before plotting
         #print("Saving game history...")
-        pd.DataFrame(game_history).to_csv('C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\game_history.csv', index=False)
-        #print(f"Saved history for {len(game_history)} episodes")
+        game_history.close()
 
         #print("Training completed, creating plot...")
         filename = 'C:\\Users\\jezkn\\OneDrive\\Documents\\Startups\\startups_plot.png'
-        x = [i+1 for i in range(len(scores))]
-        plotLearning(x, scores, eps_history, filename)
+        plotLearning(history_path, filename)
         #print("Script completed successfully")
         
     except Exception as e:
@@ -1,6 +1,5 @@
 import random
 import time
-import copy
 #import startups_RL_environment
 
 class Company:
@@ -9,11 +8,7 @@ class Company:
         self._total_shares = total_shares
         #self._current_shares = current_shares
     def get_share_count(self, player):
-        share_count = 0
-        for card in player._shares:
-            if card._company == self._name:
-                share_count += 1
-        return share_count
+        return player._share_counts.get(self._name, 0)
     def get_sim_share_count(self, player):
         share_count = 0
         for card in player._simulate_shares:
@@ -21,17 +16,29 @@ class Company:
                 share_count += 1
         return share_count
 
+    def get_share_summary(self, player_list):
+        # total shares, highest holding and unique majority holder, from the players' running share counts
+        total = 0
+        max_value = -1
+        max_count = 0
+        holder = None
+        for p in player_list:
+            count = p._share_counts.get(self._name, 0)
+            total += count
+            if count > max_value:
+                max_value = count
+                max_count = 1
+                holder = p
+            elif count == max_value:
+                max_count += 1
+        if max_count != 1:
+            holder = None
+        return total, max(max_value, 0), holder
+
     def get_majority_holder(self, player_list):
-        company_shares_dictionary = {p: self.get_share_count(p) for p in player_list}
-        
-        if not company_shares_dictionary:
+        if not player_list:
             return None
-        
-        # Count how many times the maximum value appears
-        max_value = max(company_shares_dictionary.values())
-        max_count = list(company_shares_dictionary.values()).count(max_value)
-        
-        return max(company_shares_dictionary, key=company_shares_dictionary.get) if max_count == 1 else None
+        return self.get_share_summary(player_list)[2]
 
     def get_sim_majority_holder(self, player_list):
         company_shares_dictionary = {p: self.get_sim_share_count(p) for p in player_list}
@@ -54,6 +61,52 @@ class Company:
     def __str__(self):
         return f"(Name: {self._name}, Total Shares: {self._total_shares})"
 
+class ShareList(list):
+    """A player's share cards with a running count per company in .counts. Every way of changing the
+    list keeps the counts in step; counts is always the same dict, updated in place."""
+    def __init__(self, cards=()):
+        super().__init__(cards)
+        self.counts = get_card_dictionary(self)
+    def _recount(self):
+        self.counts.clear()
+        self.counts.update(get_card_dictionary(self))
+    def append(self, card):
+        super().append(card)
+        self.counts[card._company] = self.counts.get(card._company, 0) + 1
+    def remove(self, card):
+        super().remove(card)
+        self._recount()
+    def extend(self, cards):
+        super().extend(cards)
+        self._recount()
+    def __iadd__(self, cards):
+        super().__iadd__(cards)
+        self._recount()
+        return self
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._recount()
+        return self
+    def insert(self, index, card):
+        super().insert(index, card)
+        self._recount()
+    def pop(self, index=-1):
+        card = super().pop(index)
+        self._recount()
+        return card
+    def clear(self):
+        super().clear()
+        self.counts.clear()
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._recount()
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._recount()
+    def __reduce__(self):
+        # copies and pickles are rebuilt from the cards alone, which recounts them
+        return (ShareList, (list(self),))
+
 class Player:
     def __init__(self, number, coins, hand, shares, chips, human):
         self._number = number
@@ -62,12 +115,32 @@ class Player:
         self._simulate_coins = coins
         self._hand = hand
         self._shares = shares
-        self._simulate_shares = shares
+        self._simulate_shares = self._shares
         self._chips = chips
         self._human = human
         self.static_agent = None
         self._sim_hand = []
         self._last_pickup = None
+        self._rng = None  # random source for this player's choices; games hand every player their own stream
+    @property
+    def rng(self):
+        # None stands for the global random module, which is looked up here rather than held, so that
+        # players can still be copied and pickled
+        return random if self._rng is None else self._rng
+    @rng.setter
+    def rng(self, rng):
+        self._rng = None if rng is random else rng
+    @property
+    def _shares(self):
+        return self._share_list
+    @_shares.setter
+    def _shares(self, cards):
+        # replacing the shares (a deal, a determinization) recounts them
+        self._share_list = cards if isinstance(cards, ShareList) else ShareList(cards)
+    @property
+    def _share_counts(self):
+        # company name -> shares held
+        return self._share_list.counts
     def take_card_from_pile(self, deck):
         self._hand.append(deck[0])
         self._last_pickup = deck[0]
@@ -107,18 +180,19 @@ class Player:
         market.append(card)
         self._hand.remove(card)
         self._last_pickup = None
-    def add_chip(self, company, player_list):
-        if check_for_monopoly(player_list, company) == False:
+    def add_chip(self, company, player_list, summary=None):
+        # summary: company.get_share_summary(player_list), when the caller already has it
+        total, max_shares, _ = summary or company.get_share_summary(player_list)
+        if total <= 1:
             self._chips.add(company)
         else:
             share_count = company.get_share_count(self)
-            max_shares = find_monopoly_value(player_list, company)
             if share_count > max_shares:
                 self._chips.add(company)
-    def remove_chip(self, company, player_list):
+    def remove_chip(self, company, player_list, summary=None):
         if company in self._chips:
             share_count = company.get_share_count(self)
-            max_shares = find_monopoly_value(player_list, company)
+            max_shares = (summary or company.get_share_summary(player_list))[1]
             if share_count < max_shares:
                 self._chips.remove(company)
     def check_for_chip(self, company_name):
@@ -180,6 +254,335 @@ class Action:
             return self.type == other.type and self.target == other.target
         return NotImplemented
 
+class CompactGameState:
+    """Count-vector game state: companies are integer ids and every zone is a per-company count list"""
+    def __init__(self, company_list, num_players, starting_coins=10):
+        self.company_names = [c._name for c in company_list]
+        self.company_ids = {name: i for i, name in enumerate(self.company_names)}
+        self.total_shares = [c._total_shares for c in company_list]
+        self.num_companies = len(company_list)
+        self.num_players = num_players
+        n = self.num_companies
+        self.deck = []                  # company ids in draw order, top card at deck_position
+        self.deck_position = 0
+        self.deck_counts = [0] * n      # cards left in the deck per company
+        self.market = [0] * n
+        self.market_coins = [[] for _ in range(n)]  # coins on each market card, oldest (richest) first
+        self.hands = [[0] * n for _ in range(num_players)]
+        self.shares = [[0] * n for _ in range(num_players)]
+        self.chips = [[False] * n for _ in range(num_players)]
+        self.coins = [starting_coins] * num_players
+        self.last_pickup = [-1] * num_players
+        self.rng = random
+        # whose turn it is, for search with apply()/undo()
+        self.current_player = 0
+        self.pickup_phase = True
+        self.done = False
+        self._history = []
+
+    @classmethod
+    def from_game(cls, company_list, player_list, deck, market):
+        """Build the compact state from Card/Player objects"""
+        state = cls(company_list, len(player_list))
+        if player_list:
+            state.rng = player_list[0].rng
+        ids = state.company_ids
+        state.deck = [ids[card._company] for card in deck]
+        for c in state.deck:
+            state.deck_counts[c] += 1
+        for card in market:
+            c = ids[card._company]
+            state.market[c] += 1
+            state.market_coins[c].append(card._coins_on)
+        for coins in state.market_coins:
+            coins.sort(reverse=True)
+        for i, p in enumerate(player_list):
+            for card in p._hand:
+                state.hands[i][ids[card._company]] += 1
+            for card in p._shares:
+                state.shares[i][ids[card._company]] += 1
+            for company in p._chips:
+                state.chips[i][ids[company._name]] = True
+            state.coins[i] = p._coins
+            if p._last_pickup is not None:
+                state.last_pickup[i] = ids[p._last_pickup._company]
+        return state
+
+    def deck_size(self):
+        return len(self.deck) - self.deck_position
+
+    def company_id(self, company):
+        # accepts an id, a company name or a Company object
+        if isinstance(company, int):
+            return company
+        return self.company_ids[company._name if hasattr(company, '_name') else company]
+
+    def card_dictionary(self, counts):
+        return {self.company_names[c]: n for c, n in enumerate(counts) if n > 0}
+
+    def share_count(self, player, company):
+        return self.shares[player][company]
+
+    def count_card(self, player, company):
+        return self.shares[player][company] + self.hands[player][company]
+
+    def company_in_market(self, company):
+        return self.market[company] > 0
+
+    def check_for_monopoly(self, company):
+        total = 0
+        for p in range(self.num_players):
+            total += self.shares[p][company]
+        return total > 1
+
+    def find_monopoly_value(self, company):
+        max_shares = 0
+        for p in range(self.num_players):
+            if self.shares[p][company] > max_shares:
+                max_shares = self.shares[p][company]
+        return max_shares
+
+    def majority_holder(self, company, shares=None):
+        shares = self.shares if shares is None else shares
+        holder = None
+        max_value = -1
+        max_count = 0
+        for p in range(self.num_players):
+            value = shares[p][company]
+            if value > max_value:
+                max_value = value
+                max_count = 1
+                holder = p
+            elif value == max_value:
+                max_count += 1
+        return holder if max_count == 1 else None
+
+    def add_chip(self, player, company):
+        if not self.check_for_monopoly(company):
+            self.chips[player][company] = True
+        elif self.shares[player][company] > self.find_monopoly_value(company):
+            self.chips[player][company] = True
+
+    def remove_chip(self, player, company):
+        if self.chips[player][company]:
+            if self.shares[player][company] < self.find_monopoly_value(company):
+                self.chips[player][company] = False
+
+    def pickup_cost(self, player):
+        chips = self.chips[player]
+        return sum(n for c, n in enumerate(self.market) if not chips[c])
+
+    def pick_up_action_choice(self, player):
+        """Return list of valid pickup actions for the player"""
+        choices = []
+        if self.deck_size() > 0 and self.coins[player] >= self.pickup_cost(player):
+            choices.append("pickup_deck")
+        if self.market_pickup_companies(player):
+            choices.append("pickup_market")
+        return choices
+
+    def put_down_action_choice(self, player):
+        """Return list of valid putdown actions for the player"""
+        # as put_down_action_choice: its market check is handed the action name rather than a card, so it
+        # never passes and only putdown_shares is offered
+        if sum(self.hands[player]) > 0:
+            return ["putdown_shares"]
+        return []
+
+    def market_pickup_companies(self, player):
+        chips = self.chips[player]
+        return [c for c in range(self.num_companies) if self.market[c] > 0 and not chips[c]]
+
+    def legal_action_bits(self, player, pickup):
+        """Legal actions as an int, bit i set when action i of get_all_game_actions is allowed"""
+        C = self.num_companies
+        bits = 0
+        if pickup:
+            chips = self.chips[player]
+            cost = 0
+            for c in range(C):
+                if self.market[c] and not chips[c]:
+                    cost += self.market[c]
+                    bits |= 2 << c
+            if self.deck_size() > 0 and self.coins[player] >= cost:
+                bits |= 1
+        else:
+            hand = self.hands[player]
+            last = self.last_pickup[player]
+            for c in range(C):
+                if hand[c]:
+                    bits |= 1 << (1 + C + c)
+                    if c != last:
+                        bits |= 1 << (1 + 2 * C + c)
+        return bits
+
+    def take_card_from_pile(self, player):
+        c = self.deck[self.deck_position]
+        self.deck_position += 1
+        self.deck_counts[c] -= 1
+        self.hands[player][c] += 1
+        self.last_pickup[player] = c
+        return c
+
+    def take_card_from_market(self, player, company):
+        if self.market[company] > 0 and not self.chips[player][company]:
+            self.coins[player] += self.market_coins[company].pop(0)
+            self.market[company] -= 1
+            self.hands[player][company] += 1
+            self.last_pickup[player] = company
+
+    def picking_up_card(self, player, action, company=None):
+        if action not in self.pick_up_action_choice(player):
+            return
+        if action == "pickup_deck":
+            coins_required = self.pickup_cost(player)
+            self.take_card_from_pile(player)
+            if coins_required != 0:
+                self._add_market_coins(player, 1)
+                self.coins[player] -= coins_required
+        elif action == "pickup_market":
+            if company is None:
+                # same as input_card_for_pick_up: a random eligible market card
+                eligible = self.market_pickup_companies(player)
+                company = self.rng.choices(eligible, weights=[self.market[c] for c in eligible])[0]
+            self.take_card_from_market(player, self.company_id(company))
+
+    def putting_down_card(self, player, action, company):
+        c = self.company_id(company)
+        if self.hands[player][c] == 0:
+            return False
+        if action == 'putdown_market' and c == self.last_pickup[player]:
+            # the card just picked up cannot go straight back, as in return_all_putdown_choices
+            return False
+        self.hands[player][c] -= 1
+        self.last_pickup[player] = -1
+        if action == 'putdown_shares':
+            self.shares[player][c] += 1
+            self.add_chip(player, c)
+            for p in range(self.num_players):
+                self.remove_chip(p, c)
+        elif action == 'putdown_market':
+            self.market[c] += 1
+            self.market_coins[c].append(0)
+
+    def final_coins(self, shares=None):
+        # coins after end-of-game scoring, with every hand counted as shares; the state is left as it is
+        if shares is None:
+            shares = [[s + h for s, h in zip(self.shares[p], self.hands[p])] for p in range(self.num_players)]
+        coins = list(self.coins)
+        for c in range(self.num_companies):
+            majority_shareholder = self.majority_holder(c, shares)
+            if majority_shareholder is not None:
+                total_coins = 0
+                for p in range(self.num_players):
+                    if p != majority_shareholder:
+                        coins[p] -= shares[p][c]
+                        total_coins += shares[p][c]
+                coins[majority_shareholder] += total_coins * 3
+        return coins
+
+    def end_game_and_score(self):
+        for p in range(self.num_players):
+            for c in range(self.num_companies):
+                self.shares[p][c] += self.hands[p][c]
+                self.hands[p][c] = 0
+        self.coins = self.final_coins(self.shares)
+        return max(range(self.num_players), key=lambda p: self.coins[p])
+
+    def clone(self):
+        """Copy of the state sharing only the read-only parts (company tables and deck order)"""
+        state = CompactGameState.__new__(CompactGameState)
+        state.__dict__.update(self.__dict__)
+        state.deck_counts = self.deck_counts[:]
+        state.market = self.market[:]
+        state.market_coins = [coins[:] for coins in self.market_coins]
+        state.hands = [hand[:] for hand in self.hands]
+        state.shares = [shares[:] for shares in self.shares]
+        state.chips = [chips[:] for chips in self.chips]
+        state.coins = self.coins[:]
+        state.last_pickup = self.last_pickup[:]
+        state._history = []
+        return state
+
+    def legal_actions(self):
+        if self.done:
+            return 0
+        return self.legal_action_bits(self.current_player, self.pickup_phase)
+
+    def apply(self, action_id):
+        """Play a legal action id (get_all_game_actions order) for the player to move; undo() reverts it"""
+        C = self.num_companies
+        p = self.current_player
+        turn = (p, self.pickup_phase, self.done, self.last_pickup[p])
+        if action_id == 0:
+            coins_required = self.pickup_cost(p)
+            c = self.take_card_from_pile(p)
+            self._add_market_coins(p, 1)
+            self.coins[p] -= coins_required
+            self._history.append((0, c, coins_required, turn))
+        elif action_id <= C:
+            c = action_id - 1
+            gained = self.market_coins[c][0]
+            self.take_card_from_market(p, c)
+            self._history.append((1, c, gained, turn))
+        elif action_id <= 2 * C:
+            c = action_id - 1 - C
+            chips = tuple(self.chips[q][c] for q in range(self.num_players))
+            self.putting_down_card(p, 'putdown_shares', c)
+            self._history.append((2, c, chips, turn))
+        else:
+            c = action_id - 1 - 2 * C
+            self.putting_down_card(p, 'putdown_market', c)
+            self._history.append((3, c, None, turn))
+        self._advance_turn()
+
+    def undo(self):
+        kind, c, delta, turn = self._history.pop()
+        p, self.pickup_phase, self.done, self.last_pickup[p] = turn
+        self.current_player = p
+        if kind == 0:
+            self._add_market_coins(p, -1)
+            self.coins[p] += delta
+            self.hands[p][c] -= 1
+            self.deck_counts[c] += 1
+            self.deck_position -= 1
+        elif kind == 1:
+            self.hands[p][c] -= 1
+            self.market[c] += 1
+            self.market_coins[c].insert(0, delta)
+            self.coins[p] -= delta
+        elif kind == 2:
+            self.shares[p][c] -= 1
+            self.hands[p][c] += 1
+            for q in range(self.num_players):
+                self.chips[q][c] = delta[q]
+        else:
+            self.market[c] -= 1
+            self.market_coins[c].pop()
+            self.hands[p][c] += 1
+
+    def _add_market_coins(self, player, amount):
+        # a deck draw puts a coin on every market card the player holds no anti-monopoly chip for
+        chips = self.chips[player]
+        for c in range(self.num_companies):
+            if not chips[c]:
+                coins = self.market_coins[c]
+                for i in range(len(coins)):
+                    coins[i] += amount
+
+    def _advance_turn(self):
+        if self.pickup_phase:
+            self.pickup_phase = False
+            return
+        self.pickup_phase = True
+        self.current_player = (self.current_player + 1) % self.num_players
+        # a round always finishes; the game ends when the deck is empty as a new round starts
+        if self.current_player == 0 and self.deck_size() == 0:
+            self.done = True
+        elif self.legal_action_bits(self.current_player, True) == 0:
+            # nothing to pick up, so the player only puts down
+            self.pickup_phase = False
+
 
 default_companies = [["Giraffe Beer", 5],["Bowwow Games",6],["Flamingo Soft",7],["Octo Coffee", 8],["Hippo Powertech", 9],["Elephant Mars Travel", 10]]
 additional_companies = [["Woofy Railway", 11]]
@@ -205,34 +608,54 @@ def create_deck(company_list):
             n += 1
     return deck
 
-def create_players(no_players, no_humans):
+_card_pools = {}
+
+def get_card_pool(company_list):
+    """Full deck for a company configuration, built once and shared read-only by every game"""
+    key = tuple((c._name, c._total_shares) for c in company_list)
+    pool = _card_pools.get(key)
+    if pool is None:
+        pool = tuple(create_deck(company_list))
+        _card_pools[key] = pool
+    return pool
+
+def create_prepared_deck(company_list, cutoff, rng=random):
+    # shuffle indices into the shared pool; only cards that stay in the game get a Card of their own,
+    # since each carries its coins once in the market
+    pool = get_card_pool(company_list)
+    order = list(range(len(pool)))
+    rng.shuffle(order)
+    return [Card(pool[i]._company, 0) for i in order[cutoff:]]
+
+def create_players(no_players, no_humans, rng=random, starting_coins=10):
     player_list = []
     n = 1
     humans_created = 0
-    assign_avoid_loss_strategy_to = random.choice([2,4])
+    assign_avoid_loss_strategy_to = rng.choice([2,4])
     while n <= no_players:
         if humans_created < no_humans:
-            player = Player(n, 10, [], [], set(), True)
+            player = Player(n, starting_coins, [], [], set(), True)
             player.pickup_strategy = human_pickup_strategy
             player.putdown_strategy = human_putdown_strategy
             humans_created += 1
         elif humans_created == no_humans:
-            player = Player(n, 10, [], [], set(), False)
+            player = Player(n, starting_coins, [], [], set(), False)
             if n == assign_avoid_loss_strategy_to:
                 player.pickup_strategy = avoid_loss_ai_pickup_strategy
                 player.putdown_strategy = avoid_loss_ai_putdown_strategy
             else:
                 player.pickup_strategy = random_ai_pickup_strategy
                 player.putdown_strategy = random_ai_putdown_strategy
+        player.rng = rng
         player_list.append(player)
         n += 1
     return player_list
 
-def build_bot_pool(pool_size_per_strategy=3):
+def build_bot_pool(pool_size_per_strategy=3, starting_coins=10):
     pool = []
     for strat_name, (pickup, putdown) in STRATEGIES_BEST.items():
         for i in range(pool_size_per_strategy):
-            player = Player(-1, 10, [], [], set(), False)  # temp number, fixed later
+            player = Player(-1, starting_coins, [], [], set(), False)  # temp number, fixed later
             player.pickup_strategy = pickup
             player.putdown_strategy = putdown
             pool.append(player)
@@ -278,60 +701,64 @@ def create_players_RL_old(no_players, no_humans):
         n += 1
     return player_list
 
-def create_players_RL(no_players, no_humans):
+def create_players_RL(no_players, no_humans, rng=random, starting_coins=10):
     player_list = []
     
     # First add human players
     if no_humans > 0:
         for n in range(1, no_humans + 1):
-            player = Player(n, 10, [], [], set(), True)
+            player = Player(n, starting_coins, [], [], set(), True)
             player.pickup_strategy = human_pickup_strategy
             player.putdown_strategy = human_putdown_strategy
             player_list.append(player)
     
     # Build AI pool and sample
-    ai_pool = build_bot_pool(pool_size_per_strategy=5)  # generate more than enough AIs
-    chosen_ai = random.sample(ai_pool, no_players - no_humans)
+    ai_pool = build_bot_pool(pool_size_per_strategy=5, starting_coins=starting_coins)  # generate more than enough AIs
+    chosen_ai = rng.sample(ai_pool, no_players - no_humans)
     
     # Assign correct player numbers to AIs and add them
     for i, ai in enumerate(chosen_ai, start=no_humans + 1):
         ai._number = i
         player_list.append(ai)
-    
+
+    for player in player_list:
+        player.rng = rng
     return player_list
 
 # Modified game creation function
-def create_game_RL_with_static(default_companies, no_players, no_humans, static_agents, num_static_agents):
-    """Create game with static agents efficiently integrated"""
-    company_list = create_companies(default_companies)
-    player_list = create_players_RL_with_static(no_players, no_humans, static_agents, num_static_agents)
-    deck = create_deck(company_list)
-    starting_deck = copy.deepcopy(deck)
-    deck = prepare_deck(deck, 5)
-    deal_hands(deck, 3, player_list)
+def create_game_RL_with_static(default_companies, no_players, no_humans, static_agents, num_static_agents, compact=False, rng=random, config=None):
+    """Create game with static agents efficiently integrated; a config, when given, sets the rules and companies"""
+    config = config or get_game_config(default_companies, no_players)
+    company_list = config.create_companies()
+    player_list = create_players_RL_with_static(config.num_players, no_humans, static_agents, num_static_agents, rng, config.starting_coins)
+    deck = create_prepared_deck(company_list, config.removed_cards, rng)
+    starting_deck = config.card_pool
+    deal_hands(deck, config.hand_size, player_list)
+    if compact:
+        return company_list, player_list, deck, starting_deck, CompactGameState.from_game(company_list, player_list, deck, [])
     return company_list, player_list, deck, starting_deck
 
 
-def create_players_RL_with_static(no_players, no_humans, static_agents, num_static_agents):
+def create_players_RL_with_static(no_players, no_humans, static_agents, num_static_agents, rng=random, starting_coins=10):
     """Create players with some using static agents"""
     player_list = []
     static_agents = static_agents or []
     
     # Add human players
     for n in range(1, no_humans + 1):
-        player = Player(n, 10, [], [], set(), True)
+        player = Player(n, starting_coins, [], [], set(), True)
         player.pickup_strategy = human_pickup_strategy
         player.putdown_strategy = human_putdown_strategy
         player.static_agent = None
         player_list.append(player)
     
     # Add AI players
-    ai_pool = build_bot_pool(pool_size_per_strategy=5)
+    ai_pool = build_bot_pool(pool_size_per_strategy=5, starting_coins=starting_coins)
     num_ai_needed = no_players - no_humans
     
     # Add static agent players first
     for i in range(num_static_agents):
-        player = Player(no_humans + i + 1, 10, [], [], set(), False)
+        player = Player(no_humans + i + 1, starting_coins, [], [], set(), False)
         player.pickup_strategy = None  # Will use static agent instead
         player.putdown_strategy = None
         player.static_agent = static_agents[i]
@@ -340,12 +767,14 @@ def create_players_RL_with_static(no_players, no_humans, static_agents, num_stat
     # Fill remaining slots with regular AI
     remaining_ai_needed = num_ai_needed - num_static_agents
     if remaining_ai_needed > 0:
-        chosen_ai = random.sample(ai_pool, remaining_ai_needed)
+        chosen_ai = rng.sample(ai_pool, remaining_ai_needed)
         for i, ai in enumerate(chosen_ai, start=no_humans + num_static_agents + 1):
             ai._number = i
             ai.static_agent = None
             player_list.append(ai)
-    
+
+    for player in player_list:
+        player.rng = rng
     return player_list
 
 
@@ -358,11 +787,11 @@ def assign_player_strategy(strategy, num, strategy_dict):
         i += 1
     strategy_dict[strategy] = strat_list
 
-def shuffle_deck(deck):
-    random.shuffle(deck)
+def shuffle_deck(deck, rng=random):
+    rng.shuffle(deck)
 
-def prepare_deck(deck, cutoff):
-    shuffle_deck(deck)
+def prepare_deck(deck, cutoff, rng=random):
+    shuffle_deck(deck, rng)
     return deck[cutoff:]
 
 def deal_hands(deck, cutoff, player_list):
@@ -373,8 +802,9 @@ def deal_hands(deck, cutoff, player_list):
             del deck[0]
         counter += 1
 
-def simulate_deal_hands(start_deck, cutoff, player_list, skip_player):
-    sim_deck = copy.deepcopy(start_deck)
+def simulate_deal_hands(start_deck, cutoff, player_list, skip_player, rng=random):
+    # simulated hands only hold references to the starting deck's cards, which are never modified
+    sim_deck = start_deck
     counter = 0
 
     known_cards = []
@@ -394,7 +824,7 @@ def simulate_deal_hands(start_deck, cutoff, player_list, skip_player):
             remaining_deck.append(card)
             known_cards_dict[card._company] = known_cards_dict.get(card._company, 0) + 1
     
-    random.shuffle(remaining_deck)
+    rng.shuffle(remaining_deck)
 
     for p in player_list:
         p._sim_hand = []
@@ -484,6 +914,32 @@ def get_all_game_actions(player_actions_pick_up, player_actions_put_down, compan
             
     return actions
 
+def get_company_ids(company_list):
+    # company name -> position in company_list, the order used by get_all_game_actions
+    return {c._name: i for i, c in enumerate(company_list)}
+
+def legal_action_bits(player, market, company_ids, pickup):
+    """Same choices as return_all_pickup_choices / return_all_putdown_choices, as an int bitmask
+    aligned with get_all_game_actions (bit 0 pickup_deck, then pickup_market, putdown_shares, putdown_market)"""
+    C = len(company_ids)
+    bits = 0
+    if pickup:
+        coins_required = 0
+        for card in market:
+            if not player.check_for_chip(card._company):
+                coins_required += 1
+                bits |= 2 << company_ids[card._company]
+        if player._coins >= coins_required:
+            bits |= 1
+    else:
+        last = player._last_pickup._company if player._last_pickup is not None else None
+        for card in player._hand:
+            i = company_ids[card._company]
+            bits |= 1 << (1 + C + i)
+            if card._company != last:
+                bits |= 1 << (1 + 2 * C + i)
+    return bits
+
 def pick_up_action_choice(player, market, deck):
     """Return list of valid pickup actions for the player"""
     choices = []
@@ -564,9 +1020,11 @@ def putting_down_card(player, action, player_list, market, company_list, card_co
                 company_obj = company
                 break
         player.add_card_to_shares(chosen_card)
-        player.add_chip(company_obj, player_list)
+        # the chips only depend on the share counts, which stay put while they move, so one summary does
+        summary = company_obj.get_share_summary(player_list)
+        player.add_chip(company_obj, player_list, summary)
         for p in player_list:
-            p.remove_chip(company_obj, player_list)
+            p.remove_chip(company_obj, player_list, summary)
     elif action == 'putdown_market':
         company_name = card_company._name if hasattr(card_company, '_name') else card_company
         
@@ -581,22 +1039,10 @@ def putting_down_card(player, action, player_list, market, company_list, card_co
 
 def check_for_monopoly(player_list, company):
     # changed this logic because I was adding the first share before checking the monopoly
-    monopoly = False
-    shares_total = 0
-    for p in player_list:
-        player_shares = company.get_share_count(p)
-        shares_total += player_shares
-    if shares_total > 1:
-        monopoly = True
-    return monopoly
+    return company.get_share_summary(player_list)[0] > 1
 
 def find_monopoly_value(player_list, company):
-    max_shares = 0
-    for p in player_list:
-        player_shares = company.get_share_count(p)
-        if player_shares > max_shares:
-            max_shares = player_shares
-    return max_shares
+    return company.get_share_summary(player_list)[1]
 
 def input_card_for_pick_up(player, market):
     card_choices = []
@@ -610,7 +1056,7 @@ def input_card_for_pick_up(player, market):
         pass
 
     elif not player._human:
-        card_to_choose = random.choice(card_choices)
+        card_to_choose = player.rng.choice(card_choices)
         company_input = card_to_choose._company
         #coins_input = card_to_choose._coins_on
     return company_input
@@ -663,28 +1109,108 @@ def input_card_for_put_down(player):
                 
 
     elif not player._human:
-        card_chosen = random.choice(card_choices)
+        card_chosen = player.rng.choice(card_choices)
         card_company = card_chosen._company
 
     return card_company
 
-def create_game(default_companies, no_players, no_humans):
-    company_list = create_companies(default_companies)
-    player_list = create_players(no_players, no_humans)
+def create_game(default_companies, no_players, no_humans, rng=random, config=None):
+    # a config, when given, sets the rules and the companies; default_companies and no_players are then ignored
+    config = config or get_game_config(default_companies, no_players)
+    company_list = config.create_companies()
+    player_list = create_players(config.num_players, no_humans, rng, config.starting_coins)
     deck = create_deck(company_list)
-    deck = prepare_deck(deck, 5)
-    deal_hands(deck, 3, player_list)
+    deck = prepare_deck(deck, config.removed_cards, rng)
+    deal_hands(deck, config.hand_size, player_list)
     return company_list, player_list, deck
 
-def create_game_RL(default_companies, no_players, no_humans):
-    company_list = create_companies(default_companies)
-    player_list = create_players_RL(no_players, no_humans)
-    deck = create_deck(company_list)
-    starting_deck = copy.deepcopy(deck)
-    deck = prepare_deck(deck, 5)
-    deal_hands(deck, 3, player_list)
+def create_game_RL(default_companies, no_players, no_humans, compact=False, rng=random, config=None):
+    config = config or get_game_config(default_companies, no_players)
+    company_list = config.create_companies()
+    player_list = create_players_RL(config.num_players, no_humans, rng, config.starting_coins)
+    deck = create_prepared_deck(company_list, config.removed_cards, rng)
+    starting_deck = config.card_pool
+    deal_hands(deck, config.hand_size, player_list)
+    if compact:
+        # the compact state mirrors the deal; play can continue on either representation
+        return company_list, player_list, deck, starting_deck, CompactGameState.from_game(company_list, player_list, deck, [])
     return company_list, player_list, deck, starting_deck
 
+class GameConfig:
+    """Rules of one game variant and the tables derived from them, built once and shared by the engine,
+    the env and the agent instead of being re-derived every game"""
+    def __init__(self, companies=None, num_players=4, starting_coins=10, removed_cards=5, hand_size=3, unseen_features=False):
+        companies = default_companies if companies is None else companies
+        self.companies = [[name, total_shares] for name, total_shares in companies]
+        self.num_players = num_players
+        self.starting_coins = starting_coins
+        self.removed_cards = removed_cards
+        self.hand_size = hand_size
+        self.unseen_features = unseen_features
+
+        self.company_names = tuple(name for name, _ in self.companies)
+        self.total_shares = tuple(total_shares for _, total_shares in self.companies)
+        self.num_companies = len(self.companies)
+        self.company_ids = {name: i for i, name in enumerate(self.company_names)}
+        self.card_pool = get_card_pool(self.create_companies())
+        self.total_cards = len(self.card_pool)
+        # cards left to draw once the removed cards are set aside and the hands are dealt
+        self.deck_size = self.total_cards - removed_cards - hand_size * num_players
+        if self.deck_size <= 0:
+            # with nothing left to draw the game would end before anyone moves
+            raise ValueError(f"{self.total_cards} cards leave no deck after dealing {hand_size} to {num_players} players and removing {removed_cards}")
+
+        # action ids as in get_all_game_actions; the targets are only read for their names
+        self.actions = tuple(get_all_game_actions(player_actions_pick_up, player_actions_put_down, self.create_companies()))
+        self.num_actions = len(self.actions)
+
+        # StartupsEnv observation: own coins, hand, shares, chips, market counts and best market coins,
+        # then coins, shares and chips for each opponent, then the turn phase. With unseen_features the
+        # cards the agent has not seen (BeliefTracker.unseen) come before the phase; that changes the
+        # network input size, so models trained without them cannot be used with it
+        sections = [("coins", 1), ("hand", self.num_companies), ("shares", self.num_companies),
+                    ("chips", self.num_companies), ("market", self.num_companies), ("market_coins", self.num_companies)]
+        for i in range(num_players - 1):
+            sections += [(f"opponent_{i}_coins", 1), (f"opponent_{i}_shares", self.num_companies),
+                         (f"opponent_{i}_chips", self.num_companies)]
+        if unseen_features:
+            sections.append(("unseen", self.num_companies))
+        sections.append(("phase", 1))
+        self.observation_layout = {}
+        offset = 0
+        for name, size in sections:
+            self.observation_layout[name] = slice(offset, offset + size)
+            offset += size
+        self.observation_size = offset
+
+    def create_companies(self):
+        # a new list of Company objects for each game, from the config's companies
+        return create_companies(self.companies)
+
+    def __repr__(self):
+        return (f"GameConfig({self.num_companies} companies, {self.num_players} players, {self.starting_coins} coins, "
+                f"{self.removed_cards} removed, hands of {self.hand_size}{', unseen features' if self.unseen_features else ''})")
+
+VARIANTS = {
+    "standard": default_companies,
+    "extended": default_companies + additional_companies,    # adds Woofy Railway for bigger tables
+    "small": default_companies[:4],                         # fewer, shorter games for curriculum training
+}
+
+_game_configs = {}
+
+def get_game_config(companies=None, num_players=4, starting_coins=10, removed_cards=5, hand_size=3, unseen_features=False):
+    """Shared GameConfig for these rules, built on first use; companies may also be a VARIANTS name"""
+    if isinstance(companies, str):
+        companies = VARIANTS[companies]
+    companies = default_companies if companies is None else companies
+    key = (tuple((name, total_shares) for name, total_shares in companies), num_players, starting_coins, removed_cards, hand_size, unseen_features)
+    config = _game_configs.get(key)
+    if config is None:
+        config = GameConfig(companies, num_players, starting_coins, removed_cards, hand_size, unseen_features)
+        _game_configs[key] = config
+    return config
+
 def empty_hands(player_list):
     for player in player_list:
         player.put_hand_in_shares()
@@ -770,7 +1296,7 @@ def random_ai_pickup_strategy(player, market, deck, player_list):
     if not choices:
         
         return None
-    choice = random.choice(choices)
+    choice = player.rng.choice(choices)
     if choice == "pickup_market":
         target_company = input_card_for_pick_up(player, market)
         action_type = "pickup_market"
@@ -784,7 +1310,7 @@ def random_ai_putdown_strategy(player, market, deck, player_list):
     if not choices:
         return None
     while True:
-        choice = random.choice(choices)
+        choice = player.rng.choice(choices)
         target_company = input_card_for_put_down(player)
         if choices == "putdown_market":
             if not check_put_down_card_to_market(player, target_company):
@@ -794,18 +1320,39 @@ def random_ai_putdown_strategy(player, market, deck, player_list):
         return Action(action_type, target_company)
 
 def count_card(player, company):
-    count_card_in_shares = 0
+    count_card_in_shares = player._share_counts.get(company, 0)
     count_card_in_hand = 0
-    for s in player._shares:
-        if s._company == company:
-            count_card_in_shares += 1
     for h in player._hand:
         # may want to make the hand a list of card objects in future, quite confusing
         if h._company == company:
             count_card_in_hand += 1
     return count_card_in_shares + count_card_in_hand
 
-def avoid_loss_ai_pickup_strategy(player, market, deck, player_list):
+class TurnContext:
+    """Counts the heuristic strategies look up while weighing one decision, built once per decision
+    rather than once per candidate action and player. Pass one in to share it between strategies."""
+    def __init__(self, player, market, player_list):
+        # every seat's share counts, the deciding player's own included, as the strategies compare against all
+        self.share_counts = [p._share_counts for p in player_list]
+        own_counts = dict(player._share_counts)
+        for card in player._hand:
+            own_counts[card._company] = own_counts.get(card._company, 0) + 1
+        self.own_counts = own_counts
+        self.market_counts = {}
+        self.max_market_coins = {}
+        for card in market:
+            company = card._company
+            self.market_counts[company] = self.market_counts.get(company, 0) + 1
+            if card._coins_on > self.max_market_coins.get(company, -1):
+                self.max_market_coins[company] = card._coins_on
+
+    def count_card(self, company):
+        """Cards of company the player holds in hand and shares, as count_card"""
+        return self.own_counts.get(company, 0)
+
+def avoid_loss_ai_pickup_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_pickup_choices(player, market)
     good_choices = []
     bad_choices = []
@@ -816,9 +1363,8 @@ def avoid_loss_ai_pickup_strategy(player, market, deck, player_list):
             good_choices.append(c)
         if c.type == "pickup_market" and c.target is not None:
             company_name = c.target
-            count_card_for_player = count_card(player, company_name)
-            for p in player_list:
-                shares_dict = get_card_dictionary(p._shares)
+            count_card_for_player = context.count_card(company_name)
+            for shares_dict in context.share_counts:
                 if shares_dict.get(company_name, 0) > (count_card_for_player + 1):
                     bad_choices.append(c)
                 else:
@@ -827,20 +1373,21 @@ def avoid_loss_ai_pickup_strategy(player, market, deck, player_list):
     if len(good_choices) == 0:
         good_choices = bad_choices
 
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def avoid_loss_ai_putdown_strategy(player, market, deck, player_list):
+def avoid_loss_ai_putdown_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_putdown_choices(player, market)
 
     good_choices = []
     bad_choices = []
     for c in choices:
         company_name = c.target
-        count_card_for_player = count_card(player, company_name)
-        for p in player_list:
-            shares_dict = get_card_dictionary(p._shares)
+        count_card_for_player = context.count_card(company_name)
+        for shares_dict in context.share_counts:
             if c.type == "putdown_market":
                 if shares_dict.get(company_name, 0) == count_card_for_player - 1 and shares_dict.get(company_name, 0) > 0:
                     bad_choices.append(c)
@@ -857,11 +1404,13 @@ def avoid_loss_ai_putdown_strategy(player, market, deck, player_list):
     if len(good_choices) == 0:
         good_choices = bad_choices
     
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def seek_loss_ai_pickup_strategy(player, market, deck, player_list):
+def seek_loss_ai_pickup_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_pickup_choices(player, market)
     good_choices = []
     bad_choices = []
@@ -872,9 +1421,8 @@ def seek_loss_ai_pickup_strategy(player, market, deck, player_list):
             bad_choices.append(c)
         if c.type == "pickup_market" and c.target is not None:
             company_name = c.target
-            count_card_for_player = count_card(player, company_name)
-            for p in player_list:
-                shares_dict = get_card_dictionary(p._shares)
+            count_card_for_player = context.count_card(company_name)
+            for shares_dict in context.share_counts:
                 if shares_dict.get(company_name, 0) > (count_card_for_player + 1):
                     good_choices.append(c)
                 else:
@@ -883,20 +1431,21 @@ def seek_loss_ai_pickup_strategy(player, market, deck, player_list):
     if len(good_choices) == 0:
         good_choices = bad_choices
 
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def seek_loss_ai_putdown_strategy(player, market, deck, player_list):
+def seek_loss_ai_putdown_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_putdown_choices(player, market)
 
     good_choices = []
     bad_choices = []
     for c in choices:
         company_name = c.target
-        count_card_for_player = count_card(player, company_name)
-        for p in player_list:
-            shares_dict = get_card_dictionary(p._shares)
+        count_card_for_player = context.count_card(company_name)
+        for shares_dict in context.share_counts:
             if c.type == "putdown_market":
                 if shares_dict.get(company_name, 0) == count_card_for_player - 1 and shares_dict.get(company_name, 0) > 0:
                     good_choices.append(c)
@@ -913,11 +1462,13 @@ def seek_loss_ai_putdown_strategy(player, market, deck, player_list):
     if len(good_choices) == 0:
         good_choices = bad_choices
     
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def same_cards_ai_pickup_strategy(player, market, deck, player_list):
+def same_cards_ai_pickup_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_pickup_choices(player, market)
     good_choices = []
     bad_choices = []
@@ -928,7 +1479,7 @@ def same_cards_ai_pickup_strategy(player, market, deck, player_list):
             bad_choices.append(c)
         if c.type == "pickup_market" and c.target is not None:
             company_name = c.target
-            count_card_for_player = count_card(player, company_name)
+            count_card_for_player = context.count_card(company_name)
             if count_card_for_player > 0:
                 good_choices.append(c)
             else:
@@ -937,11 +1488,13 @@ def same_cards_ai_pickup_strategy(player, market, deck, player_list):
     if len(good_choices) == 0:
         good_choices = bad_choices
 
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def same_cards_ai_putdown_strategy(player, market, deck, player_list):
+def same_cards_ai_putdown_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_putdown_choices(player, market)
 
     good_choices = []
@@ -949,7 +1502,7 @@ def same_cards_ai_putdown_strategy(player, market, deck, player_list):
     ok_choices = []
     for c in choices:
         company_name = c.target
-        count_card_for_player = count_card(player, company_name)
+        count_card_for_player = context.count_card(company_name)
         if count_card_for_player > 0:
             if c.type == "putdown_market":
                 bad_choices.append(c)
@@ -963,11 +1516,13 @@ def same_cards_ai_putdown_strategy(player, market, deck, player_list):
     elif len(good_choices) == 0 and len(ok_choices) == 0:
         good_choices = bad_choices
     
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def different_cards_ai_pickup_strategy(player, market, deck, player_list):
+def different_cards_ai_pickup_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_pickup_choices(player, market)
     good_choices = []
     bad_choices = []
@@ -979,7 +1534,7 @@ def different_cards_ai_pickup_strategy(player, market, deck, player_list):
             ok_choices.append(c)
         if c.type == "pickup_market" and c.target is not None:
             company_name = c.target
-            count_card_for_player = count_card(player, company_name)
+            count_card_for_player = context.count_card(company_name)
             if count_card_for_player > 1:
                 bad_choices.append(c)
             elif count_card_for_player > 0:
@@ -992,11 +1547,13 @@ def different_cards_ai_pickup_strategy(player, market, deck, player_list):
     elif len(good_choices) == 0 and len(ok_choices) == 0:
         good_choices = bad_choices
 
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def different_cards_ai_putdown_strategy(player, market, deck, player_list):
+def different_cards_ai_putdown_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_putdown_choices(player, market)
 
     good_choices = []
@@ -1004,7 +1561,7 @@ def different_cards_ai_putdown_strategy(player, market, deck, player_list):
     ok_choices = []
     for c in choices:
         company_name = c.target
-        count_card_for_player = count_card(player, company_name)
+        count_card_for_player = context.count_card(company_name)
         if count_card_for_player > 1:
             if c.type == "putdown_market":
                 good_choices.append(c)
@@ -1023,11 +1580,13 @@ def different_cards_ai_putdown_strategy(player, market, deck, player_list):
     elif len(good_choices) == 0 and len(ok_choices) == 0:
         good_choices = bad_choices
     
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def gain_money_ai_pickup_strategy(player, market, deck, player_list):
+def gain_money_ai_pickup_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_pickup_choices(player, market)
 
     good_choices = []
@@ -1042,23 +1601,24 @@ def gain_money_ai_pickup_strategy(player, market, deck, player_list):
             good_choices.append(c)
         else:
             if c.type == "pickup_market" and c.target is not None:
-                for card in market:
-                    if card._company == c.target:
-                        ok_choices.append(c)
-                        if card._coins_on > 1:
-                            good_choices.append(c)
-                        break
+                # the first market card of a company is its oldest, so it carries the most coins
+                if c.target in context.max_market_coins:
+                    ok_choices.append(c)
+                    if context.max_market_coins[c.target] > 1:
+                        good_choices.append(c)
 
     if len(good_choices) == 0:
         good_choices = ok_choices
     elif len(good_choices) == 0 and len(ok_choices) == 0:
         good_choices = bad_choices
 
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
-def lose_unwanted_cards_ai_putdown_strategy(player, market, deck, player_list):
+def lose_unwanted_cards_ai_putdown_strategy(player, market, deck, player_list, context=None):
+    if context is None:
+        context = TurnContext(player, market, player_list)
     choices = return_all_putdown_choices(player, market)
 
     good_choices = []
@@ -1066,10 +1626,9 @@ def lose_unwanted_cards_ai_putdown_strategy(player, market, deck, player_list):
     bad_choices = []
     for c in choices:
         company_name = c.target
-        count_card_for_player = count_card(player, company_name)
-        count_card_in_market = get_card_dictionary(market).get(company_name, 0)
-        for p in player_list:
-            shares_dict = get_card_dictionary(p._shares)
+        count_card_for_player = context.count_card(company_name)
+        count_card_in_market = context.market_counts.get(company_name, 0)
+        for shares_dict in context.share_counts:
             if c.type == "putdown_market":
                 if count_card_for_player > 1:
                     bad_choices.append(c)
@@ -1090,7 +1649,7 @@ def lose_unwanted_cards_ai_putdown_strategy(player, market, deck, player_list):
     elif len(good_choices) == 0 and len(ok_choices) == 0:
         good_choices = bad_choices
     
-    choice = random.choice(good_choices)
+    choice = player.rng.choice(good_choices)
 
     return choice
 
@@ -1142,6 +1701,13 @@ STRATEGIES_SEEK_LOSS = {
     #"random": (random_ai_pickup_strategy, random_ai_putdown_strategy)
 }
 
+def get_strategy(name):
+    """(pickup_strategy, putdown_strategy) for a name in any of the strategy registries"""
+    for registry in (STRATEGIES, STRATEGIES_BENCHMARK, STRATEGIES_GOOD, STRATEGIES_BEST, STRATEGIES_BAD, STRATEGIES_SEEK_LOSS):
+        if name in registry:
+            return registry[name]
+    raise KeyError(f"Unknown strategy: {name}")
+
 def execute_pickup(player, action, market, deck):
     if action.type == "pickup_deck":
         picking_up_card(player, "pickup_deck", market, deck)
@@ -1155,6 +1721,26 @@ def execute_putdown(player, action, player_list, market, company_list):
         putting_down_card(player, "putdown_market", player_list, market, company_list, action.target)
     ai_end_turn_messages(player, market)
 
+def play_game(player_list, company_list, deck, market, recorder=None):
+    """Play a dealt game to the end with each player's own strategies, score it and return the winner.
+    A game_record.GameRecorder, if given, is told about every move."""
+    while len(deck) > 0:
+        for p in player_list:
+            pickup_action = p.pickup_strategy(p, market, deck, player_list)
+            if pickup_action:
+                execute_pickup(p, pickup_action, market, deck)
+                if recorder is not None:
+                    recorder.record(p, pickup_action)
+
+            putdown_action = p.putdown_strategy(p, market, deck, player_list)
+            if putdown_action:
+                execute_putdown(p, putdown_action, player_list, market, company_list)
+                if recorder is not None:
+                    recorder.record(p, putdown_action)
+
+    end_game_and_score(player_list, company_list)
+    return find_winner_simple(player_list)
+
 def end_game_and_score(player_list, company_list):
     empty_hands(player_list)
 
@@ -1165,11 +1751,9 @@ def end_game_and_score(player_list, company_list):
             
             for p in player_list:
                 if p != majority_shareholder:
-                    player_shares_dict = get_card_dictionary(p._shares)
-                    if company._name in player_shares_dict:  # Check if company exists in player's shares
-                        coins = player_shares_dict[company._name]  # Use company._name, not company_name
-                        p._coins -= coins
-                        total_coins += coins
+                    coins = p._share_counts.get(company._name, 0)
+                    p._coins -= coins
+                    total_coins += coins
             
             # Give 3x the collected coins to majority shareholder
             total_coins = total_coins * 3
@@ -1179,9 +1763,9 @@ def end_game_and_score(player_list, company_list):
     
     winner = find_winner_simple(player_list)
 
-def simulate_end_game_and_score(player_list, company_list, player, starting_deck):
+def simulate_end_game_and_score(player_list, company_list, player, starting_deck, rng=random, hand_size=3):
     #simulate_empty_hands(player_list)
-    simulate_deal_hands(starting_deck, 3, player_list, player)
+    simulate_deal_hands(starting_deck, hand_size, player_list, player, rng)
     simulate_empty_sim_hands(player_list)
     for p in player_list:
         p._simulate_coins = p._coins
@@ -0,0 +1,117 @@
+import argparse
+import json
+import random
+import sys
+import time
+import s1_game_optimise_for_RL as sg
+import game_record
+from tournament import seat_players
+
+PHASES = ("setup", "pickup_decision", "pickup", "putdown_decision", "putdown", "scoring")
+
+
+def simulate_game(lineup, seed, timings, writer=None, companies=None):
+    """Play one headless game, adding the time spent in each phase to timings; writer gets its game record"""
+    clock = time.perf_counter
+    t0 = clock()
+    rng = random.Random(seed)
+    config = sg.get_game_config(companies, len(lineup))
+    company_list = config.create_companies()
+    player_list = seat_players(lineup, rng, config.starting_coins, config)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    market = []
+    recorder = game_record.GameRecorder(company_list, player_list, deck, seed) if writer is not None else None
+    timings["setup"] += clock() - t0
+
+    turns = 0
+    while len(deck) > 0:
+        for p in player_list:
+            t0 = clock()
+            pickup_action = p.pickup_strategy(p, market, deck, player_list)
+            t1 = clock()
+            if pickup_action:
+                sg.execute_pickup(p, pickup_action, market, deck)
+                if recorder is not None:
+                    recorder.record(p, pickup_action)
+            t2 = clock()
+            putdown_action = p.putdown_strategy(p, market, deck, player_list)
+            t3 = clock()
+            if putdown_action:
+                sg.execute_putdown(p, putdown_action, player_list, market, company_list)
+                if recorder is not None:
+                    recorder.record(p, putdown_action)
+            t4 = clock()
+            timings["pickup_decision"] += t1 - t0
+            timings["pickup"] += t2 - t1
+            timings["putdown_decision"] += t3 - t2
+            timings["putdown"] += t4 - t3
+            turns += 1
+
+    t0 = clock()
+    sg.end_game_and_score(player_list, company_list)
+    winner = sg.find_winner_simple(player_list)
+    timings["scoring"] += clock() - t0
+    if recorder is not None:
+        writer.write(recorder.game)
+    return {
+        "seed": seed,
+        "lineup": list(lineup),
+        "coins": [p._coins for p in player_list],
+        "winner": player_list.index(winner),
+        "turns": turns,
+    }
+
+
+def run_simulation(lineup, games, seed=0, rotate=False, out=None, writer=None, companies=None):
+    timings = {phase: 0.0 for phase in PHASES}
+    turns = 0
+    start = time.perf_counter()
+    for i in range(games):
+        seats = lineup[i % len(lineup):] + lineup[:i % len(lineup)] if rotate else lineup
+        result = simulate_game(seats, seed + i, timings, writer, companies)
+        turns += result["turns"]
+        if out is not None:
+            out.write(json.dumps(result) + "\n")
+    elapsed = time.perf_counter() - start
+    return {
+        "games": games,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed,
+        "turns_per_sec": turns / elapsed,
+        "phase_seconds": timings,
+    }
+
+
+def print_report(report):
+    print(f"{report['games']} games in {report['seconds']:.2f}s: "
+          f"{report['games_per_sec']:.1f} games/s, {report['turns_per_sec']:.1f} turns/s", file=sys.stderr)
+    for phase, seconds in report["phase_seconds"].items():
+        share = 100 * seconds / report["seconds"] if report["seconds"] else 0.0
+        print(f"  {phase:<17}{seconds:>9.3f}s {share:>5.1f}%", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run complete games headless and report throughput")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seats", nargs="+", default=["avoid_loss", "random", "gain_money", "same_cards"],
+                        help="one strategy name per seat, from the STRATEGIES registries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rotate", action="store_true", help="rotate seats every game")
+    parser.add_argument("--output", help="file for per-game JSON lines (default stdout)")
+    parser.add_argument("--quiet", action="store_true", help="do not stream per-game results")
+    parser.add_argument("--record", help="append every game to this file as a binary game record")
+    parser.add_argument("--variant", default="standard", choices=sorted(sg.VARIANTS), help="company set to play with")
+    args = parser.parse_args()
+
+    out = None
+    if not args.quiet:
+        out = open(args.output, "w") if args.output else sys.stdout
+    writer = game_record.RecordWriter(args.record) if args.record else None
+    try:
+        print_report(run_simulation(args.seats, args.games, args.seed, args.rotate, out, writer, args.variant))
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import s1_game_optimise_for_RL as sg
+import batched_engine as be
+
+
+def snapshot(state):
+    return (state.hands, state.shares, state.chips, state.coins, state.market, state.market_coins,
+            state.last_pickup, state.deck[state.deck_position:], state.current_player, state.pickup_phase, state.done)
+
+
+def mask_bits(row):
+    return sum(1 << i for i, legal in enumerate(row) if legal)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("companies,num_players", [(None, 4), (None, 3), ("small", 3), ("extended", 5)])
+def test_batched_games_match_compact_state(seed, companies, num_players):
+    # every game is replayed move by move on a CompactGameState, which test_compact_state checks
+    # against the object engine
+    config = sg.get_game_config(companies, num_players)
+    engine = be.BatchedStartupsEngine.from_config(16, config, seed=seed)
+    rng = np.random.default_rng(seed)
+    states = [engine.to_compact(g) for g in range(engine.num_games)]
+    mask = engine.legal_action_mask()
+    while not engine.done.all():
+        actions = be.sample_legal_actions(mask, rng)
+        for g, state in enumerate(states):
+            assert mask_bits(mask[g]) == state.legal_actions()
+            if not state.done:
+                state.apply(int(actions[g]))
+                if state.pickup_phase and not state.done and state.legal_actions() == 0:
+                    # nothing to pick up: the engine moves straight on to the putdown, as the object engine does
+                    state.pickup_phase = False
+        live = ~engine.done
+        applied, mask = engine.step(actions)
+        assert applied[live].all()
+        for g, state in enumerate(states):
+            assert snapshot(engine.to_compact(g)) == snapshot(state)
+
+    final_coins = engine.score()
+    for g, state in enumerate(states):
+        assert engine.winner[g] == state.end_game_and_score()
+        assert final_coins[g].tolist() == state.coins
+
+
+def test_reset_deals_every_card_once():
+    config = sg.get_game_config(None, 4)
+    engine = be.BatchedStartupsEngine.from_config(8, config, seed=1)
+    cards = (np.stack([np.bincount(engine.removed[g], minlength=config.num_companies) for g in range(8)])
+             + engine.hands.sum(axis=1)
+             + np.stack([np.bincount(engine.deck[g], minlength=config.num_companies) for g in range(8)]))
+    assert (cards == np.array(config.total_shares)).all()
+    assert (engine.hands.sum(axis=2) == config.hand_size).all()
+    assert engine.deck.shape[1] == config.deck_size
+
+
+def test_round_robin_deal_skips_the_scoring_seat_and_empty_hands():
+    # seat 1 scores, seat 3 has no hidden cards; four cards go around seats 0, 2, 0, 2
+    assert be.round_robin_seats([2, 3, 2, 0], 1, 10).tolist() == [0, 2, 0, 2]
+    # a short pool runs out partway round: seats 0, 2 and 3 get one card each, then only seat 0 a second
+    assert be.round_robin_seats([2, 3, 3, 1], 1, 4).tolist() == [0, 2, 3, 0]
+    assert be.round_robin_seats([2, 3, 3, 1], 1, 0).tolist() == []
+
+
+def test_determinized_hand_sizes_short_pool_matches_exact_deals():
+    import endgame_solver
+    shares = np.array([[2, 0, 1], [0, 2, 1], [1, 1, 0], [0, 1, 2]])
+    coins = np.array([8, 11, 6, 9])
+    unseen = np.array([1, 2, 1])
+    hand_sizes = [3, 2, 3, 0]
+    scores = be.determinized_scores(shares, coins, unseen, 1, 100000, np.random.default_rng(0), hand_sizes=hand_sizes)
+    mean, variance = endgame_solver.exact_mean_and_variance(shares, coins, unseen, 1, hand_sizes=hand_sizes)
+    assert abs(scores.mean() - mean) < 4 * np.sqrt(variance / len(scores)) + 1e-9
+    # the four unseen cards go two each to seats 0 and 2; the scoring seat gets none despite its hand
+    dealt = np.bincount(be.round_robin_seats(hand_sizes, 1, unseen.sum()), minlength=4)
+    assert dealt.tolist() == [2, 0, 2, 0]
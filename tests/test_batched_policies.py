@@ -0,0 +1,97 @@
+from fractions import Fraction
+import numpy as np
+import pytest
+import s1_game_optimise_for_RL as sg
+import batched_engine as be
+
+
+class ScriptedRng:
+    """Stands in for a player's rng: follows a fixed path of choice indices, then takes the first option"""
+    def __init__(self, path):
+        self.path = path
+        self.branches = []
+
+    def choice(self, options):
+        depth = len(self.branches)
+        self.branches.append(len(options))
+        return options[self.path[depth] if depth < len(self.path) else 0]
+
+
+def exact_distribution(strategy, player, market, deck, player_list, action_id):
+    """{action id: probability} of a strategy's choice, every rng.choice branch enumerated"""
+    distribution = {}
+    stack = [()]
+    while stack:
+        path = stack.pop()
+        rng = ScriptedRng(path)
+        player.rng = rng
+        action = strategy(player, market, deck, player_list)
+        taken = list(path) + [0] * (len(rng.branches) - len(path))
+        for depth in range(len(path), len(rng.branches)):
+            for i in range(1, rng.branches[depth]):
+                stack.append(tuple(taken[:depth]) + (i,))
+        probability = Fraction(1)
+        for n in rng.branches:
+            probability /= n
+        key = action_id(action)
+        distribution[key] = distribution.get(key, 0) + probability
+    return distribution
+
+
+def object_position(engine, g, company_list):
+    """Player objects, market and deck for game g of a batched engine"""
+    names = [c._name for c in company_list]
+    player_list = []
+    for p in range(engine.num_players):
+        hand = [sg.Card(names[c], 0) for c in range(engine.num_companies) for _ in range(engine.hands[g, p, c])]
+        shares = [sg.Card(names[c], 0) for c in range(engine.num_companies) for _ in range(engine.shares[g, p, c])]
+        chips = {company_list[c] for c in range(engine.num_companies) if engine.chips[g, p, c]}
+        player = sg.Player(p + 1, int(engine.coins[g, p]), hand, shares, chips, False)
+        if engine.last_pickup[g, p] >= 0:
+            player._last_pickup = sg.Card(names[engine.last_pickup[g, p]], 0)
+        player_list.append(player)
+    market = [sg.Card(names[c], int(coins)) for c in range(engine.num_companies)
+              for coins in engine.market_coins[g, c, :engine.market[g, c]]]
+    deck = [sg.Card(names[c], 0) for c in engine.deck[g, engine.deck_position[g]:]]
+    return player_list, market, deck
+
+
+@pytest.mark.parametrize("name", sorted(be.POLICIES))
+def test_policies_match_object_strategy_distributions(name):
+    config = sg.get_game_config()
+    company_list = config.create_companies()
+    ids = sg.get_company_ids(company_list)
+    C = config.num_companies
+
+    def action_id(action):
+        if action is None:
+            return None
+        if action.type == "pickup_deck":
+            return 0
+        offset = {"pickup_market": 1, "putdown_shares": 1 + C, "putdown_market": 1 + 2 * C}[action.type]
+        return offset + ids[action.target]
+
+    engine = be.BatchedStartupsEngine.from_config(6, config, seed=len(name))
+    rng = np.random.default_rng(0)
+    mask = engine.legal_action_mask()
+    pickup_strategy, putdown_strategy = sg.get_strategy(name)
+    compared = 0
+    while not engine.done.all():
+        weights = be.policy_weights(be.BatchedTurnContext(engine, mask), *be.POLICIES[name])
+        for g in np.flatnonzero(~engine.done):
+            pickup = engine.phase[g] == be.PICKUP
+            if pickup and engine.deck_size()[g] == 0:
+                continue    # the object engine still offers a draw here, which then does nothing
+            player_list, market, deck = object_position(engine, g, company_list)
+            player = player_list[engine.current_player[g]]
+            strategy = pickup_strategy if pickup else putdown_strategy
+            expected = exact_distribution(strategy, player, market, deck, player_list, action_id)
+            total = weights[g].sum()
+            assert total > 0
+            got = {int(a): weights[g, a] / total for a in np.flatnonzero(weights[g])}
+            assert got.keys() == expected.keys()
+            assert all(got[a] == pytest.approx(float(p)) for a, p in expected.items())
+            compared += 1
+        actions = be.sample_legal_actions(mask, rng)
+        _, mask = engine.step(actions)
+    assert compared > 100
@@ -0,0 +1,57 @@
+import copy
+import random
+import pytest
+import s1_game_optimise_for_RL as sg
+from test_compact_state import deal_game
+
+
+def full_state(state):
+    return copy.deepcopy({k: v for k, v in state.__dict__.items() if k not in ("rng", "_history")})
+
+
+def legal_ids(state):
+    bits = state.legal_actions()
+    return [i for i in range(bits.bit_length()) if bits >> i & 1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_undo_restores_every_position(seed):
+    company_list, player_list, deck = deal_game(seed)
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, [])
+    chooser = random.Random(seed)
+    positions = []
+    while not state.done and legal_ids(state):
+        positions.append(full_state(state))
+        state.apply(chooser.choice(legal_ids(state)))
+    assert len(positions) > 20
+    while positions:
+        state.undo()
+        assert full_state(state) == positions.pop()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_clone_is_independent(seed):
+    company_list, player_list, deck = deal_game(seed)
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, [])
+    chooser = random.Random(seed)
+    for _ in range(15):
+        state.apply(chooser.choice(legal_ids(state)))
+    before = full_state(state)
+    clone = state.clone()
+    assert full_state(clone) == before
+    for _ in range(20):
+        if clone.done or not legal_ids(clone):
+            break
+        clone.apply(chooser.choice(legal_ids(clone)))
+    assert full_state(state) == before
+    # the original can still undo its own moves after the clone played on
+    state.undo()
+
+
+def test_final_coins_leaves_state_unchanged():
+    company_list, player_list, deck = deal_game(2)
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, [])
+    before = full_state(state)
+    coins = state.final_coins()
+    assert full_state(state) == before
+    assert state.end_game_and_score() is not None and state.coins == coins
@@ -0,0 +1,98 @@
+import random
+import pytest
+import s1_game_optimise_for_RL as sg
+from game_record import observed_action_id
+
+
+def deal_game(seed, companies=None, num_players=4):
+    rng = random.Random(seed)
+    config = sg.get_game_config(companies, num_players)
+    company_list = config.create_companies()
+    player_list = []
+    for n in range(num_players):
+        player = sg.Player(n + 1, config.starting_coins, [], [], set(), False)
+        player.rng = rng
+        player_list.append(player)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    return company_list, player_list, deck
+
+
+def snapshot(state):
+    return (state.hands, state.shares, state.chips, state.coins, state.market,
+            [sorted(coins) for coins in state.market_coins], state.last_pickup, state.deck[state.deck_position:])
+
+
+def random_action(bits, chooser):
+    legal = [i for i in range(bits.bit_length()) if bits >> i & 1]
+    return chooser.choice(legal) if legal else None
+
+
+def play_mirrored(seed, companies=None, num_players=4):
+    """Play a game of random legal moves on the object engine, mirroring every move into a CompactGameState
+    through its own picking_up_card/putting_down_card, and check both agree on the legal moves throughout"""
+    company_list, player_list, deck = deal_game(seed, companies, num_players)
+    market = []
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, market)
+    ids = sg.get_company_ids(company_list)
+    names = [c._name for c in company_list]
+    C = len(company_list)
+    chooser = random.Random(seed + 1000)
+    while len(deck) > 0:
+        for seat, p in enumerate(player_list):
+            assert state.pick_up_action_choice(seat) == sg.pick_up_action_choice(p, market, deck)
+            bits = sg.legal_action_bits(p, market, ids, True)
+            if not deck:
+                bits &= ~1      # picking_up_card ignores a draw from an empty deck
+            assert state.legal_action_bits(seat, True) == bits
+            action_id = random_action(bits, chooser)
+            if action_id is not None:
+                action = sg.Action("pickup_deck") if action_id == 0 else sg.Action("pickup_market", names[action_id - 1])
+                size = len(p._hand)
+                sg.execute_pickup(p, action, market, deck)
+                taken = observed_action_id(p, action, size, ids)
+                if taken == 0:
+                    state.picking_up_card(seat, "pickup_deck")
+                else:
+                    state.picking_up_card(seat, "pickup_market", taken - 1)
+
+            assert state.put_down_action_choice(seat) == sg.put_down_action_choice(p)
+            bits = sg.legal_action_bits(p, market, ids, False)
+            assert state.legal_action_bits(seat, False) == bits
+            action_id = random_action(bits, chooser)
+            if action_id is not None:
+                kind = "putdown_shares" if action_id <= 2 * C else "putdown_market"
+                company = (action_id - 1 - C) % C
+                sg.execute_putdown(p, sg.Action(kind, names[company]), player_list, market, company_list)
+                state.putting_down_card(seat, kind, company)
+            assert snapshot(state) == snapshot(sg.CompactGameState.from_game(company_list, player_list, deck, market))
+
+    sg.end_game_and_score(player_list, company_list)
+    assert state.end_game_and_score() == player_list.index(sg.find_winner_simple(player_list))
+    return state.coins, [p._coins for p in player_list]
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("companies,num_players", [(None, 4), (None, 3), ("small", 3), ("extended", 5)])
+def test_compact_state_matches_object_engine(seed, companies, num_players):
+    compact_coins, object_coins = play_mirrored(seed, companies, num_players)
+    assert compact_coins == object_coins
+
+
+def test_put_down_choices_match_object_engine():
+    company_list, player_list, deck = deal_game(3)
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, [])
+    assert state.put_down_action_choice(0) == sg.put_down_action_choice(player_list[0]) == ["putdown_shares"]
+    state.hands[0] = [0] * state.num_companies
+    assert state.put_down_action_choice(0) == []
+
+
+def test_card_just_picked_up_cannot_go_to_market():
+    company_list, player_list, deck = deal_game(5)
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, [])
+    c = state.take_card_from_pile(0)
+    hand = state.hands[0][:]
+    assert state.putting_down_card(0, "putdown_market", c) is False
+    assert state.hands[0] == hand and state.market[c] == 0
+    state.putting_down_card(0, "putdown_shares", c)
+    assert state.shares[0][c] == 1
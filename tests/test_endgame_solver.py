@@ -0,0 +1,95 @@
+import random
+import pytest
+import numpy as np
+import s1_game_optimise_for_RL as sg
+import batched_engine as be
+import endgame_solver
+from tournament import resolve_strategy, seat_players
+
+
+def test_registry_builds_a_player_per_seat_for_the_game_config():
+    config = sg.get_game_config("small", 3)
+    first = resolve_strategy("endgame", config)[0].__self__
+    second = resolve_strategy("endgame", config)[0].__self__
+    assert first is not second
+    assert [c._name for c in first.company_list] == list(config.company_names)
+
+
+def test_plays_a_small_variant_game_on_its_own_deck(monkeypatch):
+    rng = random.Random(2)
+    config = sg.get_game_config("small", 3)
+    company_list = config.create_companies()
+    player_list = seat_players(["endgame", "avoid_loss", "random"], rng, config.starting_coins, config)
+    solved = []
+    from_game = sg.CompactGameState.from_game
+
+    def recording_from_game(companies, *args):
+        state = from_game(companies, *args)
+        solved.append(state)
+        return state
+    monkeypatch.setattr(sg.CompactGameState, "from_game", recording_from_game)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    sg.play_game(player_list, company_list, deck, [])
+    # the bot solved the end of the game, on the variant's four companies
+    assert solved
+    assert all(state.total_shares == list(config.total_shares) for state in solved)
+
+
+def test_exact_mean_matches_sampled_deals():
+    shares = np.array([[2, 0, 1, 0, 3, 0], [0, 2, 1, 1, 0, 0], [1, 1, 0, 2, 0, 1], [0, 0, 2, 0, 1, 2]])
+    coins = np.array([8, 11, 6, 9])
+    unseen = np.array([1, 2, 1, 0, 2, 3])
+    mean, variance = endgame_solver.exact_mean_and_variance(shares, coins, unseen, 1)
+    scores = be.determinized_scores(shares, coins, unseen, 1, 200000, np.random.default_rng(0))
+    assert abs(scores.mean() - mean) < 4 * np.sqrt(variance / len(scores))
+    assert abs(scores.var() - variance) < 0.02 * variance
+
+
+def test_deal_cache_is_bounded_by_deals_held(monkeypatch):
+    monkeypatch.setattr(endgame_solver, "MAX_CACHED_DEALS", 500)
+    monkeypatch.setattr(endgame_solver, "_deal_cache", endgame_solver.OrderedDict())
+    monkeypatch.setattr(endgame_solver, "_cached_deals", 0)
+    for pool in [(3, 2, 1, 0, 2, 3), (1, 2, 1, 0, 2, 3), (2, 2, 2, 2, 1, 0), (1, 1, 1, 1, 1, 1)]:
+        probabilities, hands = endgame_solver._deal_arrays(pool, (3, 3))
+        assert probabilities.sum() == pytest.approx(1.0)
+        assert (hands.sum(axis=(1, 2)) == 6).all()
+        held = sum(len(p) for p, _ in endgame_solver._deal_cache.values())
+        assert held == endgame_solver._cached_deals
+        assert held <= 500 or len(endgame_solver._deal_cache) == 1
+    # the least recently used enumeration went first
+    assert ((3, 2, 1, 0, 2, 3), (3, 3)) not in endgame_solver._deal_cache
+
+
+def test_hidden_cards_leave_out_the_market():
+    rng = random.Random(4)
+    config = sg.get_game_config()
+    company_list = config.create_companies()
+    player_list = seat_players(["endgame", "avoid_loss", "avoid_loss", "random"], rng, config.starting_coins, config)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    market = [deck.pop() for _ in range(3)]
+    state = sg.CompactGameState.from_game(company_list, player_list, deck, market)
+    unseen, hand_sizes = endgame_solver.hidden_counts(state, 0)
+    assert sum(unseen) == len(deck) + config.removed_cards + 3 * config.hand_size
+    assert hand_sizes == [0, 3, 3, 3]
+
+
+def test_default_threshold_reaches_the_last_rounds(monkeypatch):
+    solved = []
+    action_values = endgame_solver.action_values
+
+    def counting_action_values(state, seat, pickup):
+        solved.append(seat)
+        return action_values(state, seat, pickup)
+    monkeypatch.setattr(endgame_solver, "action_values", counting_action_values)
+    config = sg.get_game_config()
+    for seed in range(2):
+        rng = random.Random(seed)
+        company_list = config.create_companies()
+        player_list = seat_players(["endgame", "avoid_loss", "avoid_loss", "avoid_loss"], rng, config.starting_coins, config)
+        deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+        sg.deal_hands(deck, config.hand_size, player_list)
+        before = len(solved)
+        sg.play_game(player_list, company_list, deck, [])
+        assert len(solved) > before
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+import s1_game_optimise_for_RL as sg
+import RL_environment2 as sr
+from vector_env import StartupsVectorEnv
+
+
+@pytest.mark.parametrize("companies,num_players", [("small", 7), (None, 14)])
+def test_config_without_a_deck_is_rejected(companies, num_players):
+    with pytest.raises(ValueError):
+        sg.get_game_config(companies, num_players)
+
+
+def test_smallest_deck_is_allowed():
+    config = sg.get_game_config("small", 6)
+    assert config.deck_size == 3
+
+
+def test_unseen_features_are_opt_in():
+    # the bundled startup_model_42.keras takes the 71 inputs of the default layout
+    default = sg.get_game_config()
+    assert default.observation_size == 71
+    assert "unseen" not in default.observation_layout
+    config = sg.get_game_config(unseen_features=True)
+    assert config.observation_size == 71 + config.num_companies
+    assert config.observation_layout["unseen"].stop == config.observation_layout["phase"].start
+
+
+@pytest.mark.parametrize("unseen_features", [False, True])
+def test_env_observation_follows_the_layout(unseen_features):
+    config = sg.get_game_config(unseen_features=unseen_features)
+    env = sr.StartupsEnv(4, 0, None, [], config=config)
+    obs, _ = env.reset(seed=3)
+    assert obs.shape == env.observation_space.shape == (config.observation_size,)
+    seat = env.player_list.index(env.agent_player)
+    if unseen_features:
+        assert list(obs[config.observation_layout["unseen"]]) == list(env.beliefs.unseen[seat])
+
+
+
+@pytest.mark.parametrize("hand_size", [2, 3, 4])
+def test_env_turns_follow_the_hand_size(hand_size):
+    games = StartupsVectorEnv(1, config=sg.GameConfig(None, 4, hand_size=hand_size))
+    env = games.envs[0]
+    rng = np.random.default_rng(0)
+    _, infos = games.reset(seed=1)
+    turns = []
+    terminated = [False]
+    while not terminated[0]:
+        turns.append((env.state_controller.current_phase, len(env.agent_player._hand)))
+        _, _, terminated, truncated, infos = games.step([rng.choice(np.flatnonzero(infos["action_mask"][0]))])
+        assert not truncated[0]
+    games.close()
+    # every turn is one pickup up to hand_size + 1 cards and one put-down back to hand_size
+    assert turns[::2] == [(sr.TurnPhase.RL_PICKUP, hand_size)] * len(turns[::2])
+    assert turns[1::2] == [(sr.TurnPhase.RL_PUTDOWN, hand_size + 1)] * len(turns[1::2])
@@ -0,0 +1,69 @@
+import random
+import pytest
+import s1_game_optimise_for_RL as sg
+import game_record
+
+
+def recorded_game(seed, variant="standard", num_players=4):
+    """Play a seeded heuristic game with a GameRecorder; (record, companies, state after every recorded move, final coins)"""
+    config = sg.get_game_config(variant, num_players)
+    company_list, player_list, deck = sg.create_game(None, 0, 0, rng=random.Random(seed), config=config)
+    market = []
+    recorder = game_record.GameRecorder(company_list, player_list, deck, seed)
+    snapshots = []
+
+    class Snapshots:
+        def record(self, player, action):
+            moves = len(recorder.game)
+            recorder.record(player, action)
+            if len(recorder.game) > moves:
+                state = sg.CompactGameState.from_game(company_list, player_list, deck, market)
+                snapshots.append((state.hands, state.shares, state.market, state.deck_size()))
+    sg.play_game(player_list, company_list, deck, market, Snapshots())
+    return recorder.game, company_list, snapshots, [p._coins for p in player_list]
+
+
+@pytest.mark.parametrize("seed", [None, 0, 12345])
+def test_bytes_round_trip(seed):
+    game = recorded_game(3)[0]
+    game.seed = seed
+    data = game.to_bytes()
+    copy = game_record.GameRecord.from_bytes(data)
+    assert (copy.total_shares, copy.hands, copy.deck, copy.starting_coins, copy.seed, copy.moves) == \
+           (game.total_shares, game.hands, game.deck, game.starting_coins, seed, game.moves)
+    assert copy.to_bytes() == data
+
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        game_record.GameRecord.from_bytes(b"XYZ" + bytes(20))
+
+
+def test_read_records_streams_every_record(tmp_path):
+    path = tmp_path / "games.sgr"
+    games = [recorded_game(seed)[0] for seed in range(4)]
+    with game_record.RecordWriter(path) as writer:
+        for game in games[:2]:
+            writer.write(game)
+    # appending to an existing file keeps the earlier records
+    with game_record.RecordWriter(path) as writer:
+        for game in games[2:]:
+            writer.write(game)
+    assert [game.to_bytes() for game in game_record.read_records(path)] == [game.to_bytes() for game in games]
+
+
+@pytest.mark.parametrize("variant,num_players", [("standard", 4), ("small", 3), ("extended", 6)])
+@pytest.mark.parametrize("seed", range(5))
+def test_replay_matches_the_object_engine(variant, num_players, seed):
+    game, company_list, snapshots, final_coins = recorded_game(seed, variant, num_players)
+    assert len(game) == len(snapshots) > 0
+    states = game.states(company_list)
+    next(states)
+    for (hands, shares, market, deck_size), state in zip(snapshots, states):
+        assert (state.hands, state.shares, state.market, state.deck_size()) == (hands, shares, market, deck_size)
+    middle = len(game) // 2
+    state = game.replay(middle, company_list)
+    assert (state.hands, state.shares, state.market, state.deck_size()) == snapshots[middle - 1]
+    assert game.replay(company_list=company_list).final_coins() == final_coins
+    # the share totals alone find the variant
+    assert game.replay().final_coins() == final_coins
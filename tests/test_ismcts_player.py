@@ -0,0 +1,50 @@
+import random
+import s1_game_optimise_for_RL as sg
+import ismcts_player
+from tournament import resolve_strategy, seat_players
+
+
+def test_registry_builds_a_player_per_seat_for_the_game_config():
+    config = sg.get_game_config("small", 3)
+    first = resolve_strategy("ismcts", config)[0].__self__
+    second = resolve_strategy("ismcts", config)[0].__self__
+    assert first is not second
+    for bot in (first, second):
+        assert [(c._name, c._total_shares) for c in bot.company_list] == list(zip(config.company_names, config.total_shares))
+
+
+def test_seat_players_hands_the_config_to_search_bots():
+    config = sg.get_game_config("small", 3)
+    player_list = seat_players(["ismcts", "avoid_loss", "random"], random.Random(0), config.starting_coins, config)
+    assert player_list[0].pickup_strategy.__self__.config is config
+
+
+def test_plays_a_small_variant_game():
+    rng = random.Random(4)
+    config = sg.get_game_config("small", 3)
+    company_list = config.create_companies()
+    player_list = seat_players(["avoid_loss", "random"], rng, config.starting_coins, config)
+    bot = sg.Player(3, config.starting_coins, [], [], set(), False)
+    bot.pickup_strategy, bot.putdown_strategy = ismcts_player.make_ismcts_strategy(config, iterations=20)
+    bot.rng = rng
+    player_list.append(bot)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    bot_player = bot.pickup_strategy.__self__
+    searched = []
+    information_state = bot_player._information_state
+
+    def recording_information_state(*args):
+        result = information_state(*args)
+        searched.append(result)
+        return result
+    bot_player._information_state = recording_information_state
+    market = []
+    sg.play_game(player_list, company_list, deck, market)
+    assert searched
+    for state, seat, unseen, hand_sizes in searched:
+        # the cards searched over are the variant's: hidden ones plus everything the bot can see
+        visible = sum(state.hands[seat]) + sum(state.market) + sum(map(sum, state.shares))
+        assert sum(unseen) + visible == config.total_cards
+    # every card dealt or drawn ends up as a share or in the market
+    assert sum(len(p._shares) for p in player_list) + len(market) == config.total_cards - config.removed_cards
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import batched_engine as be
+import endgame_solver
+import majority_model
+
+SHARES = np.array([[2, 0, 1, 0, 3, 0], [0, 2, 1, 1, 0, 0], [1, 1, 0, 2, 0, 1], [0, 0, 2, 0, 1, 2]])
+COINS = np.array([8, 11, 6, 9])
+UNSEEN = np.array([3, 2, 1, 0, 2, 3])
+
+
+def exact_deals(hand_sizes):
+    """(probabilities, final shares) of every deal of UNSEEN to hands of hand_sizes, by enumeration"""
+    probabilities, hands = endgame_solver._deal_arrays(tuple(UNSEEN.tolist()), tuple(hand_sizes))
+    return probabilities, SHARES[None] + hands
+
+
+@pytest.mark.parametrize("hand_sizes", [(2, 0, 3, 1), (0, 3, 3, 3), (1, 1, 1, 1)])
+def test_probabilities_sum_to_one(hand_sizes):
+    probabilities = majority_model.outcome_probabilities(UNSEEN, hand_sizes)
+    assert probabilities.sum(axis=1) == pytest.approx(np.ones(len(UNSEEN)))
+    majority, _ = majority_model.majority_distribution(SHARES, UNSEEN, hand_sizes)
+    assert majority.sum(axis=1) == pytest.approx(np.ones(len(UNSEEN)))
+
+
+@pytest.mark.parametrize("hand_sizes", [(2, 0, 3, 1), (0, 3, 3, 3), (1, 1, 1, 1)])
+def test_matches_exact_enumeration(hand_sizes):
+    probabilities, final_shares = exact_deals(hand_sizes)
+    final_coins, _, _ = be.score_games(final_shares, np.broadcast_to(COINS, (len(probabilities), len(COINS))))
+    expected = majority_model.expected_final_coins(SHARES, COINS, UNSEEN, hand_sizes)
+    assert expected == pytest.approx(probabilities @ final_coins)
+
+    # who ends up with each company's majority, the last column for a tie
+    is_max = final_shares == final_shares.max(axis=1, keepdims=True)
+    unique = is_max.sum(axis=1) == 1
+    holders = np.concatenate([is_max & unique[:, None], ~unique[:, None]], axis=1)
+    majority, _ = majority_model.majority_distribution(SHARES, UNSEEN, hand_sizes)
+    assert majority == pytest.approx(np.einsum('d,dkc->ck', probabilities, holders))
+
+
+def test_expected_coins_match_sampled_deals():
+    hand_sizes = [2, 0, 3, 1]
+    rng = np.random.default_rng(0)
+    num_samples = 50000
+    pool = np.repeat(np.arange(len(UNSEEN)), UNSEEN)
+    seats = be.round_robin_seats(hand_sizes, 1, len(pool))
+    cards = rng.permuted(np.tile(pool, (num_samples, 1)), axis=1)[:, :len(seats)]
+    shares = np.broadcast_to(SHARES, (num_samples,) + SHARES.shape).copy()
+    np.add.at(shares, (np.arange(num_samples)[:, None], seats[None, :], cards), 1)
+    final_coins, _, _ = be.score_games(shares, np.broadcast_to(COINS, (num_samples, len(COINS))))
+    expected = majority_model.expected_final_coins(SHARES, COINS, UNSEEN, hand_sizes)
+    assert final_coins.mean(axis=0) == pytest.approx(expected, abs=0.1)
+
+
+def test_hands_larger_than_the_pool_are_rejected():
+    unseen = np.array([1, 0, 1, 0, 0, 1])
+    with pytest.raises(ValueError):
+        majority_model.majority_distribution(SHARES, unseen, (2, 0, 1, 1))
+    with pytest.raises(ValueError):
+        majority_model.analytic_score(SHARES, COINS, unseen, 1, (2, 0, 1, 1))
+    # a pool that exactly fills the hands is fine
+    majority, _ = majority_model.majority_distribution(SHARES, unseen, (1, 0, 1, 1))
+    assert majority.sum(axis=1) == pytest.approx(np.ones(len(unseen)))
@@ -0,0 +1,68 @@
+import random
+import numpy as np
+import pytest
+import s1_game_optimise_for_RL as sg
+from belief_tracker import BeliefTracker
+from observation_encoder import ObservationEncoder
+
+
+def recounted_observation(config, company_list, player_list, market, beliefs, seat, phase):
+    """seat's observation rebuilt from the game objects, section by section as the original env did"""
+    names = [c._name for c in company_list]
+
+    def counts(cards):
+        held = sg.get_card_dictionary(cards)
+        return [held.get(name, 0) for name in names]
+
+    def chips(player):
+        held = {company._name for company in player._chips}
+        return [name in held for name in names]
+    me = player_list[seat]
+    obs = [me._coins] + counts(me._hand) + counts(me._shares) + chips(me) + counts(market)
+    obs += [max([card._coins_on for card in market if card._company == name], default=0) for name in names]
+    for q, p in enumerate(player_list):
+        if q != seat:
+            obs += [p._coins] + counts(p._shares) + chips(p)
+    if "unseen" in config.observation_layout:
+        obs += list(beliefs.unseen[seat])
+    return np.array(obs + [phase], dtype=np.float32)
+
+
+class CheckingRecorder:
+    """Feeds every move to the beliefs and the encoder, then checks every seat's observation"""
+    def __init__(self, config, company_list, player_list, market):
+        self.args = config, company_list, player_list, market
+        self.beliefs = BeliefTracker(company_list, player_list)
+        self.encoder = ObservationEncoder(config, company_list, player_list, market, self.beliefs)
+        self.checked = 0
+        self.check()
+
+    def record(self, player, action):
+        self.beliefs.record(player, action)
+        self.encoder.record(player, action)
+        self.check()
+
+    def check(self):
+        for seat in range(len(self.args[2])):
+            phase = 1 + seat % 3
+            expected = recounted_observation(*self.args, self.beliefs, seat, phase)
+            assert (self.encoder.encode(seat, phase) == expected).all()
+            out = np.zeros_like(expected)
+            self.encoder.encode(seat, phase, out)
+            assert (out == expected).all()
+            self.checked += 1
+
+
+@pytest.mark.parametrize("variant,num_players,unseen_features", [
+    ("standard", 4, False), ("standard", 4, True), ("small", 3, False), ("extended", 6, True)])
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_observations_match_a_recount(variant, num_players, unseen_features, seed):
+    config = sg.get_game_config(variant, num_players, unseen_features=unseen_features)
+    company_list, player_list, deck = sg.create_game(None, 0, 0, rng=random.Random(seed), config=config)
+    market = []
+    recorder = CheckingRecorder(config, company_list, player_list, market)
+    sg.play_game(player_list, company_list, deck, market, recorder)
+    assert recorder.checked > 20 * num_players
+    # end_game_and_score moves the hands into the shares outside the hook; refresh() catches up
+    recorder.encoder.refresh()
+    recorder.check()
@@ -0,0 +1,23 @@
+import copy
+import pickle
+import random
+import pytest
+import s1_game_optimise_for_RL as sg
+
+CLONES = [copy.deepcopy, lambda players: pickle.loads(pickle.dumps(players))]
+
+
+@pytest.mark.parametrize("clone", CLONES)
+def test_default_players_can_be_copied(clone):
+    _, player_list, _, _ = sg.create_game_RL(sg.default_companies, 4, 0)
+    copied = clone(player_list)
+    assert all(p.rng is random for p in copied)
+    assert [len(p._hand) for p in copied] == [len(p._hand) for p in player_list]
+
+
+@pytest.mark.parametrize("clone", CLONES)
+def test_seeded_players_keep_their_stream(clone):
+    _, player_list, _, _ = sg.create_game_RL(sg.default_companies, 4, 0, rng=random.Random(5))
+    copied = clone(player_list)
+    assert copied[0].rng is not player_list[0].rng
+    assert [copied[0].rng.random() for _ in range(3)] == [player_list[0].rng.random() for _ in range(3)]
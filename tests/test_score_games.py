@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import s1_game_optimise_for_RL as sg
+import batched_engine as be
+
+
+def score_with_objects(shares, coins, company_list):
+    """Final coins, winner and ranks from sg.end_game_and_score on Player objects holding these shares"""
+    player_list = []
+    for n, (row, start) in enumerate(zip(shares, coins)):
+        cards = [sg.Card(company._name, 0) for company, k in zip(company_list, row) for _ in range(k)]
+        player_list.append(sg.Player(n + 1, int(start), [], cards, set(), False))
+    sg.end_game_and_score(player_list, company_list)
+    final = [p._coins for p in player_list]
+    winner = player_list.index(sg.find_winner_simple(player_list))
+    # StartupsEnv._calculate_player_rank: position in a stable sort by coins, highest first
+    ordered = sorted(player_list, key=lambda p: p._coins, reverse=True)
+    return final, winner, [ordered.index(p) for p in player_list]
+
+
+@pytest.mark.parametrize("num_players", [2, 3, 4, 5])
+def test_score_games_matches_end_game_and_score(num_players):
+    rng = np.random.default_rng(num_players)
+    company_list = sg.create_companies(sg.default_companies)
+    num_games = 300
+    # small counts so that ties, both for majorities and for the win, are common
+    shares = rng.integers(0, 4, size=(num_games, num_players, len(company_list)))
+    coins = rng.integers(0, 12, size=(num_games, num_players))
+    final_coins, winner, rank = be.score_games(shares, coins)
+    for g in range(num_games):
+        final, best, ranks = score_with_objects(shares[g], coins[g], company_list)
+        assert final_coins[g].tolist() == final
+        assert winner[g] == best
+        assert rank[g].tolist() == ranks
+
+
+def test_score_games_matches_compact_final_coins():
+    rng = np.random.default_rng(7)
+    company_list = sg.create_companies(sg.default_companies)
+    state = sg.CompactGameState(company_list, 4)
+    shares = rng.integers(0, 6, size=(200, 4, len(company_list)))
+    coins = rng.integers(0, 20, size=(200, 4))
+    final_coins, _, _ = be.score_games(shares, coins)
+    for g in range(200):
+        state.coins = coins[g].tolist()
+        assert final_coins[g].tolist() == state.final_coins(shares[g].tolist())
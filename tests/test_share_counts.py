@@ -0,0 +1,103 @@
+import copy
+import pickle
+import pytest
+import s1_game_optimise_for_RL as sg
+from tournament import play_seated_game
+
+
+def recount(cards, name):
+    return sum(card._company == name for card in cards)
+
+
+def make_players(company_list):
+    players = [sg.Player(n + 1, 10, [], [], set(), False) for n in range(3)]
+    names = [c._name for c in company_list]
+    return players, names
+
+
+def test_counts_follow_every_list_mutation():
+    company_list = sg.create_companies(sg.default_companies)
+    players, names = make_players(company_list)
+    p = players[0]
+    p._shares.append(sg.Card(names[0], 0))
+    p._shares.extend([sg.Card(names[1], 0), sg.Card(names[1], 0)])
+    p._shares += [sg.Card(names[2], 0)]
+    p._shares.insert(0, sg.Card(names[2], 0))
+    p._shares[1] = sg.Card(names[3], 0)
+    p._shares.remove(sg.Card(names[1], 0))
+    del p._shares[0]
+    p._shares.pop()
+    for company in company_list:
+        assert company.get_share_count(p) == recount(p._shares, company._name)
+    p._shares = [sg.Card(names[4], 0)] * 2
+    assert p._share_counts == {names[4]: 2}
+    p._shares.clear()
+    assert p._share_counts == {}
+
+
+def test_majority_follows_direct_share_changes():
+    company_list = sg.create_companies(sg.default_companies)
+    players, names = make_players(company_list)
+    company = company_list[0]
+    players[0]._shares.append(sg.Card(names[0], 0))
+    assert company.get_majority_holder(players) is players[0]
+    # changes made without putting_down_card are seen straight away
+    players[1]._shares = [sg.Card(names[0], 0), sg.Card(names[0], 0)]
+    assert company.get_majority_holder(players) is players[1]
+    assert sg.find_monopoly_value(players, company) == 2
+    players[0]._shares.extend([sg.Card(names[0], 0)])
+    assert company.get_majority_holder(players) is None
+    assert sg.check_for_monopoly(players, company)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_play_matches_recounted_majorities(seed, monkeypatch):
+    # score every seeded game again with majorities recounted from the share cards, as the baseline did
+    lineup = ["random", "avoid_loss", "random", "avoid_loss"]
+    coins, winner = play_seated_game(lineup, seed)
+
+    def recounted_holder(company, player_list):
+        counts = {p: recount(p._shares, company._name) for p in player_list}
+        top = max(counts.values())
+        holders = [p for p, n in counts.items() if n == top]
+        return holders[0] if len(holders) == 1 else None
+
+    monkeypatch.setattr(sg.Company, "get_share_count", lambda company, p: recount(p._shares, company._name))
+    monkeypatch.setattr(sg.Company, "get_majority_holder", recounted_holder)
+    monkeypatch.setattr(sg.Company, "get_share_summary", lambda company, player_list: (
+        sum(recount(p._shares, company._name) for p in player_list),
+        max(recount(p._shares, company._name) for p in player_list),
+        recounted_holder(company, player_list)))
+    assert play_seated_game(lineup, seed) == (coins, winner)
+
+
+@pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy, lambda shares: pickle.loads(pickle.dumps(shares))])
+def test_copies_keep_their_own_counts(clone):
+    names = [c._name for c in sg.create_companies(sg.default_companies)]
+    shares = sg.ShareList([sg.Card(names[0], 0), sg.Card(names[0], 0), sg.Card(names[1], 0)])
+    copied = clone(shares)
+    assert type(copied) is sg.ShareList
+    assert copied.counts == {names[0]: 2, names[1]: 1}
+    copied.append(sg.Card(names[1], 0))
+    assert copied.counts == {names[0]: 2, names[1]: 2}
+    assert shares.counts == {names[0]: 2, names[1]: 1}
+
+
+def test_put_down_summarizes_the_company_once(monkeypatch):
+    company_list = sg.create_companies(sg.default_companies)
+    players, names = make_players(company_list)
+    players[1]._shares = [sg.Card(names[0], 0)]
+    players[1]._chips.add(company_list[0])
+    players[0]._hand = [sg.Card(names[0], 0), sg.Card(names[0], 0)]
+    summaries = []
+    get_share_summary = sg.Company.get_share_summary
+
+    def counting_summary(company, player_list):
+        summaries.append(company._name)
+        return get_share_summary(company, player_list)
+    monkeypatch.setattr(sg.Company, "get_share_summary", counting_summary)
+    sg.putting_down_card(players[0], "putdown_shares", players, [], company_list, names[0])
+    sg.putting_down_card(players[0], "putdown_shares", players, [], company_list, names[0])
+    assert summaries == [names[0], names[0]]
+    # once outnumbered, players[1] loses its chip
+    assert company_list[0] not in players[1]._chips
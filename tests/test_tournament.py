@@ -0,0 +1,30 @@
+from collections import Counter
+import pytest
+from tournament import build_schedule, run_tournament, play_seated_game
+
+
+@pytest.mark.parametrize("games", [1, 10, 24, 100, 1000])
+def test_schedule_plays_the_games_asked_for(games):
+    schedule = build_schedule(["random", "avoid_loss", "seek_loss", "same_cards"], 4, games)
+    assert len(schedule) == games
+    assert len({seed for _, seed in schedule}) == games
+    per_lineup = Counter(lineup for lineup, _ in schedule)
+    assert max(per_lineup.values()) - min(per_lineup.values()) <= 1
+
+
+def test_schedule_spreads_extra_games_over_lineups():
+    names = ["random", "avoid_loss", "seek_loss", "same_cards", "gain_money"]
+    schedule = build_schedule(names, 4, 5 * 4 + 5)
+    per_lineup = Counter(tuple(sorted(lineup)) for lineup, _ in schedule)
+    assert sorted(per_lineup.values()) == [5] * 5
+
+
+def test_variant_reaches_the_games():
+    coins, _ = play_seated_game(("random", "avoid_loss", "random"), 3, "small")
+    standard, _ = play_seated_game(("random", "avoid_loss", "random"), 3)
+    assert coins != standard
+
+
+def test_run_tournament_with_variant():
+    summary = run_tournament(["random", "avoid_loss"], seats=3, games=7, workers=1, companies="small", shard_size=3)
+    assert sum(s["games"] for s in summary.values()) == 7 * 3
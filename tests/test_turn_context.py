@@ -0,0 +1,84 @@
+import random
+import pytest
+import s1_game_optimise_for_RL as sg
+from tournament import play_seated_game
+
+# Seeded results of play_seated_game recorded before the heuristic strategies used TurnContext,
+# when every lookup was recounted from the Card lists: (lineup, seed, final coins, winning seat)
+RECORDED_GAMES = [
+    (('avoid_loss', 'different_cards', 'money_same', 'random_avoid'), 0, [4, 19, 15, 19], 1),
+    (('avoid_loss_2', 'gain_money', 'random', 'same_cards'), 1, [19, 22, 4, 19], 1),
+    (('avoid_seek', 'gain_random', 'random_2', 'seek_avoid'), 2, [8, 44, 5, 7], 1),
+    (('different_cards', 'money_same', 'random_avoid', 'seek_loss'), 3, [8, 23, 20, 7], 1),
+    (('gain_money', 'random', 'same_cards', 'avoid_loss'), 4, [7, 7, 27, 13], 2),
+    (('gain_random', 'random_2', 'seek_avoid', 'avoid_loss_2'), 5, [21, 14, 23, 8], 2),
+    (('money_same', 'random_avoid', 'seek_loss', 'avoid_seek'), 6, [19, 17, 16, 12], 0),
+    (('random', 'same_cards', 'avoid_loss', 'different_cards'), 7, [23, 15, 7, 11], 0),
+    (('random_2', 'seek_avoid', 'avoid_loss_2', 'gain_money'), 8, [22, 17, 7, 24], 3),
+    (('random_avoid', 'seek_loss', 'avoid_seek', 'gain_random'), 9, [19, 3, 25, 25], 2),
+    (('same_cards', 'avoid_loss', 'different_cards', 'money_same'), 10, [20, 8, 9, 17], 0),
+    (('seek_avoid', 'avoid_loss_2', 'gain_money', 'random'), 11, [18, 7, 14, 21], 3),
+    (('seek_loss', 'avoid_seek', 'gain_random', 'random_2'), 12, [3, 17, 25, 29], 3),
+    (('avoid_loss', 'different_cards', 'money_same', 'random_avoid'), 13, [7, 6, 36, 21], 2),
+    (('avoid_loss_2', 'gain_money', 'random', 'same_cards'), 14, [8, 7, 21, 20], 2),
+    (('avoid_seek', 'gain_random', 'random_2', 'seek_avoid'), 15, [18, 14, 16, 26], 3),
+    (('different_cards', 'money_same', 'random_avoid', 'seek_loss'), 16, [8, 24, 23, 7], 1),
+    (('gain_money', 'random', 'same_cards', 'avoid_loss'), 17, [21, 12, 15, 22], 3),
+    (('gain_random', 'random_2', 'seek_avoid', 'avoid_loss_2'), 18, [34, 30, 8, 4], 0),
+    (('money_same', 'random_avoid', 'seek_loss', 'avoid_seek'), 19, [9, 30, 14, 29], 1),
+    (('random', 'same_cards', 'avoid_loss', 'different_cards'), 20, [7, 31, 18, 8], 1),
+    (('random_2', 'seek_avoid', 'avoid_loss_2', 'gain_money'), 21, [15, 9, 7, 17], 3),
+    (('random_avoid', 'seek_loss', 'avoid_seek', 'gain_random'), 22, [20, 25, 5, 32], 3),
+    (('same_cards', 'avoid_loss', 'different_cards', 'money_same'), 23, [15, 38, 8, 3], 1),
+    (('seek_avoid', 'avoid_loss_2', 'gain_money', 'random'), 24, [22, 8, 8, 12], 0),
+    (('seek_loss', 'avoid_seek', 'gain_random', 'random_2'), 25, [14, 19, 14, 25], 3),
+]
+
+
+@pytest.mark.parametrize("lineup,seed,coins,winner", RECORDED_GAMES)
+def test_strategies_play_as_before_turn_context(lineup, seed, coins, winner):
+    assert play_seated_game(list(lineup), seed) == (coins, winner)
+
+
+def recounted_context(player, market, player_list):
+    own = sg.get_card_dictionary(player._shares)
+    for card in player._hand:
+        own[card._company] = own.get(card._company, 0) + 1
+    market_counts = sg.get_card_dictionary(market)
+    max_coins = {}
+    for card in market:
+        max_coins[card._company] = max(max_coins.get(card._company, -1), card._coins_on)
+    return [sg.get_card_dictionary(p._shares) for p in player_list], own, market_counts, max_coins
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_turn_context_matches_recounts(seed):
+    rng = random.Random(seed)
+    config = sg.get_game_config()
+    company_list = config.create_companies()
+    checked = []
+
+    def checking(strategy):
+        def decide(player, market, deck, player_list):
+            context = sg.TurnContext(player, market, player_list)
+            shares, own, market_counts, max_coins = recounted_context(player, market, player_list)
+            assert [dict(counts) for counts in context.share_counts] == shares
+            assert context.own_counts == own
+            assert context.market_counts == market_counts
+            assert context.max_market_coins == max_coins
+            for company in company_list:
+                assert context.count_card(company._name) == sg.count_card(player, company._name)
+            checked.append(1)
+            return strategy(player, market, deck, player_list, context)
+        return decide
+
+    player_list = []
+    for n, name in enumerate(["avoid_loss", "seek_loss", "same_cards", "gain_money"]):
+        player = sg.Player(n + 1, config.starting_coins, [], [], set(), False)
+        player.pickup_strategy, player.putdown_strategy = map(checking, sg.get_strategy(name))
+        player.rng = rng
+        player_list.append(player)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    sg.play_game(player_list, company_list, deck, [])
+    assert len(checked) > 50
@@ -0,0 +1,80 @@
+import multiprocessing
+import numpy as np
+import pytest
+import RL_environment2 as sr
+from vector_env import StartupsVectorEnv, ParallelStartupsVectorEnv
+
+
+def legal_actions(masks, rng):
+    return np.array([rng.choice(np.flatnonzero(row)) for row in masks])
+
+
+@pytest.mark.parametrize("seed", [0, 7, 21])
+def test_every_mask_has_a_legal_action(seed):
+    games = StartupsVectorEnv(4)
+    rng = np.random.default_rng(seed)
+    _, infos = games.reset(seed=seed)
+    assert (infos["action_mask"].sum(axis=1) > 0).all()
+    finished = 0
+    for _ in range(150):
+        _, _, terminations, truncations, infos = games.step(legal_actions(infos["action_mask"], rng))
+        assert not truncations.any()
+        assert (infos["action_mask"].sum(axis=1) > 0).all()
+        finished += terminations.sum()
+    # games were reset along the way, and their first masks are legal too
+    assert finished > 0
+    games.close()
+
+
+def test_plays_the_same_games_as_startups_env():
+    games = StartupsVectorEnv(3)
+    envs = [sr.StartupsEnv(4, 0, None, []) for _ in range(3)]
+    rng = np.random.default_rng(5)
+    _, infos = games.reset(seed=11)
+    for i, env in enumerate(envs):
+        env.reset(seed=11 + i)
+    for _ in range(60):
+        actions = legal_actions(infos["action_mask"], rng)
+        observations, rewards, terminations, _, infos = games.step(actions)
+        for i, env in enumerate(envs):
+            obs, reward, terminated, _, _ = env.step(int(actions[i]))
+            assert reward == rewards[i] and terminated == terminations[i]
+            # a finished game's row already holds the next game
+            assert terminated or (obs == observations[i]).all()
+        if terminations.any():
+            break
+    else:
+        pytest.fail("no game finished")
+    games.close()
+
+
+@pytest.mark.parametrize("context", [c for c in ("fork", "spawn") if c in multiprocessing.get_all_start_methods()])
+def test_parallel_env_matches_in_process_env(context):
+    games = StartupsVectorEnv(5)
+    parallel = ParallelStartupsVectorEnv(5, num_workers=2, context=context)
+    rng = np.random.default_rng(3)
+    try:
+        observations, infos = games.reset(seed=40)
+        parallel_observations, parallel_infos = parallel.reset(seed=40)
+        assert (observations == parallel_observations).all()
+        assert (infos["action_mask"] == parallel_infos["action_mask"]).all()
+        finished = 0
+        for _ in range(80):
+            actions = legal_actions(infos["action_mask"], rng)
+            results = games.step(actions)
+            parallel_results = parallel.step(actions)
+            for expected, got in zip(results[:4], parallel_results[:4]):
+                assert (expected == got).all()
+            infos, parallel_infos = results[4], parallel_results[4]
+            assert (infos["action_mask"] == parallel_infos["action_mask"]).all()
+            assert ("final_obs" in infos) == ("final_obs" in parallel_infos)
+            if "final_obs" in infos:
+                assert (infos["_final_obs"] == parallel_infos["_final_obs"]).all()
+                for i in np.flatnonzero(infos["_final_obs"]):
+                    assert (infos["final_obs"][i] == parallel_infos["final_obs"][i]).all()
+                    assert infos["final_info"][i] == parallel_infos["final_info"][i]
+                    finished += 1
+        assert finished > 0
+    finally:
+        games.close()
+        parallel.close()
@@ -0,0 +1,123 @@
+import argparse
+import functools
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import s1_game_optimise_for_RL as sg
+import ismcts_player
+import endgame_solver
+
+
+def resolve_strategy(name, config=None):
+    """(pickup_strategy, putdown_strategy) for a registered name; search bots are built new for the game played with config"""
+    if name in ismcts_player.STRATEGIES_ISMCTS:
+        return ismcts_player.STRATEGIES_ISMCTS[name](config=config)
+    if name in endgame_solver.STRATEGIES_ENDGAME:
+        return endgame_solver.STRATEGIES_ENDGAME[name](config=config)
+    return sg.get_strategy(name)
+
+
+def seat_players(lineup, rng=random, starting_coins=10, config=None):
+    """AI players using the named strategies, in seat order, all drawing from rng, for a game played with config"""
+    player_list = []
+    for seat, name in enumerate(lineup, start=1):
+        player = sg.Player(seat, starting_coins, [], [], set(), False)
+        player.pickup_strategy, player.putdown_strategy = resolve_strategy(name, config)
+        player.rng = rng
+        player_list.append(player)
+    return player_list
+
+
+def play_seated_game(lineup, seed, companies=None):
+    """Play one game with the named strategies in seat order; returns final coins and the winning seat"""
+    rng = random.Random(seed)
+    config = sg.get_game_config(companies, len(lineup))
+    company_list = config.create_companies()
+    player_list = seat_players(lineup, rng, config.starting_coins, config)
+    deck = sg.create_prepared_deck(company_list, config.removed_cards, rng)
+    sg.deal_hands(deck, config.hand_size, player_list)
+    winner = sg.play_game(player_list, company_list, deck, [])
+    return [p._coins for p in player_list], player_list.index(winner)
+
+
+def _play_shard(shard, companies=None):
+    # runs in a worker process; every game carries its own seed so results do not depend on sharding
+    return [(lineup, *play_seated_game(lineup, seed, companies)) for lineup, seed in shard]
+
+
+def build_schedule(strategy_names, seats, games, seed=0):
+    """Exactly `games` round-robin games, each lineup played in every seat rotation so first-player advantage cancels out"""
+    if len(strategy_names) >= seats:
+        lineups = list(itertools.combinations(strategy_names, seats))
+    else:
+        lineups = [l for l in itertools.combinations_with_replacement(strategy_names, seats) if len(set(l)) > 1]
+    rotations = [l[i:] + l[:i] for l in lineups for i in range(seats)]
+    per_rotation, extra = divmod(games, len(rotations))
+    # the games left over get one rotation each, spread over the lineups before their seat rotations
+    extra_rotations = set(sorted(range(len(rotations)), key=lambda k: (k % seats, k // seats))[:extra])
+    schedule = []
+    for k, lineup in enumerate(rotations):
+        for _ in range(per_rotation + (k in extra_rotations)):
+            schedule.append((lineup, seed * 1000003 + len(schedule)))
+    return schedule
+
+
+def summarise(results):
+    """Per-strategy games, win rate and mean coins, each with a 95% confidence interval"""
+    stats = {}
+    for lineup, coins, winner in results:
+        for seat, name in enumerate(lineup):
+            s = stats.setdefault(name, {"games": 0, "wins": 0, "coins": 0.0, "coins_sq": 0.0})
+            s["games"] += 1
+            s["wins"] += seat == winner
+            s["coins"] += coins[seat]
+            s["coins_sq"] += coins[seat] ** 2
+    summary = {}
+    for name, s in stats.items():
+        n = s["games"]
+        win_rate = s["wins"] / n
+        mean = s["coins"] / n
+        var = max(s["coins_sq"] / n - mean ** 2, 0.0)
+        summary[name] = {
+            "games": n,
+            "win_rate": win_rate,
+            "win_rate_ci": 1.96 * math.sqrt(win_rate * (1 - win_rate) / n),
+            "mean_coins": mean,
+            "mean_coins_ci": 1.96 * math.sqrt(var / n),
+        }
+    return summary
+
+
+def run_tournament(strategy_names, seats=4, games=1000, workers=None, seed=0, shard_size=200, companies=None):
+    """Summary of exactly `games` games (see build_schedule); companies may be a VARIANTS name"""
+    schedule = build_schedule(strategy_names, seats, games, seed)
+    shards = [schedule[i:i + shard_size] for i in range(0, len(schedule), shard_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_results in executor.map(functools.partial(_play_shard, companies=companies), shards):
+            results.extend(shard_results)
+    return summarise(results)
+
+
+def print_summary(summary, seats=4):
+    total = sum(s["games"] for s in summary.values()) // seats
+    print(f"{total} games")
+    print(f"{'strategy':<18}{'games':>8}{'win rate':>16}{'mean coins':>18}")
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["win_rate"]):
+        print(f"{name:<18}{s['games']:>8}{s['win_rate']:>9.3f} ±{s['win_rate_ci']:.3f}{s['mean_coins']:>11.2f} ±{s['mean_coins_ci']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round-robin tournament between registered strategies")
+    parser.add_argument("strategies", nargs="+", help="names from the STRATEGIES registries")
+    parser.add_argument("--seats", type=int, default=4)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variant", choices=sorted(sg.VARIANTS), default="standard", help="company set from sg.VARIANTS")
+    args = parser.parse_args()
+
+    summary = run_tournament(args.strategies, args.seats, args.games, args.workers, args.seed, companies=args.variant)
+    print_summary(summary, args.seats)
@@ -0,0 +1,297 @@
+import multiprocessing
+import os
+import traceback
+import numpy as np
+from gymnasium.vector import VectorEnv, AutoresetMode
+from gymnasium.vector.utils import batch_space
+import s1_game_optimise_for_RL as sg
+import RL_environment2 as sr
+
+
+class StartupsVectorEnv(VectorEnv):
+    """num_envs independent StartupsEnv games stepped together in one process.
+
+    Every step takes one action per game (each game is always waiting on its agent), and returns
+    stacked float32 observations, rewards, terminations and truncations. A finished game is reset in
+    the same step (gymnasium's SAME_STEP autoreset): the observation returned is the new game's, and the
+    last one of the finished game is in infos["final_obs"] with its info dict in infos["final_info"].
+    infos["action_mask"] always holds the legal actions of the observation returned, so a whole batch of
+    decisions can be made with one forward pass (see Agent.choose_actions). A new game is played up to the
+    agent's first pickup before it is returned, so every mask has a legal action; StartupsEnv.reset
+    instead leaves the opponents seated before the agent to move at the start of the first step.
+    """
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs, total_players=4, num_humans=0, default_company_list=None, static_agents=(),
+                 config=None, record_path=None, first_env=0, **env_kwargs):
+        # with record_path, env i appends its games to record_path.i so writers never share a file;
+        # first_env numbers the games on from there when they are split across processes
+        self.envs = [sr.StartupsEnv(total_players, num_humans, default_company_list, list(static_agents), config=config,
+                                    record_path=f"{record_path}.{first_env + i}" if record_path else None, **env_kwargs)
+                     for i in range(num_envs)]
+        self.num_envs = num_envs
+        self.config = self.envs[0].config
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self._observations = np.zeros((num_envs, self.config.observation_size), dtype=np.float32)
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminations = np.zeros(num_envs, dtype=np.bool_)
+        self._truncations = np.zeros(num_envs, dtype=np.bool_)
+        self._masks = np.zeros((num_envs, self.config.num_actions), dtype=np.int8)
+        self._bind_observations()
+
+    def _bind_observations(self):
+        # every env encodes its agent's observations straight into its row of the batch
+        for i, env in enumerate(self.envs):
+            env.observation_out = self._observations[i]
+            env.state = env._get_observation()
+
+    def reset(self, seed=None, options=None):
+        """Start a new game in every env; an int seed seeds env i with seed + i, a list gives one seed each"""
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+        for i, env in enumerate(self.envs):
+            self._start_game(i, seed=seeds[i], options=options)
+        self._terminations[:] = False
+        self._truncations[:] = False
+        return self._observations.copy(), {"action_mask": self._masks.copy()}
+
+    def step(self, actions):
+        finished = self._step_games(actions)
+        return (self._observations.copy(), self._rewards.copy(), self._terminations.copy(),
+                self._truncations.copy(), step_infos(self._masks, finished))
+
+    def _step_games(self, actions):
+        """Step every game, writing into the buffers in place; {env: (last observation, info)} of the finished ones"""
+        finished = {}
+        for i, env in enumerate(self.envs):
+            obs, reward, terminated, truncated, info = env.step(int(actions[i]))
+            self._rewards[i] = reward
+            self._terminations[i] = terminated
+            self._truncations[i] = truncated
+            if terminated or truncated:
+                # obs is this env's row of the batch, which the reset is about to overwrite
+                finished[i] = (obs.copy(), info)
+                self._start_game(i)
+            else:
+                self._masks[i] = env._return_valid_actions()
+        return finished
+
+    def _start_game(self, i, seed=None, options=None):
+        # reset env i and let the seats before the agent's move, as the first step would, so the
+        # observation and mask are the agent's first pickup
+        env = self.envs[i]
+        env.reset(seed=seed, options=options)
+        while env.state_controller.get_current_phase() == sr.TurnPhase.OTHER_PLAYERS:
+            env._execute_other_players_turn()
+        env.state = env._get_observation()
+        self._masks[i] = env._return_valid_actions()
+
+    def action_masks(self):
+        """(num_envs, actions) int8 legal actions of the current observations"""
+        return self._masks.copy()
+
+    def close_extras(self, **kwargs):
+        for env in self.envs:
+            env.close()
+
+
+def step_infos(masks, finished):
+    """The infos dict of a vector step from the action masks and {env: (last observation, info)} of finished games"""
+    infos = {"action_mask": masks.copy()}
+    if finished:
+        num_envs = len(masks)
+        final_obs = np.full(num_envs, None, dtype=object)
+        final_info = np.full(num_envs, None, dtype=object)
+        done = np.zeros(num_envs, dtype=np.bool_)
+        for i, (obs, info) in finished.items():
+            final_obs[i] = obs
+            final_info[i] = info
+            done[i] = True
+        infos.update({"final_obs": final_obs, "_final_obs": done, "final_info": final_info, "_final_info": done.copy()})
+    return infos
+
+
+# Shared-memory buffers of ParallelStartupsVectorEnv: name -> (ctypes code, numpy dtype, per-env shape)
+def _buffer_layout(config):
+    return {
+        "observations": ('f', np.float32, (config.observation_size,)),
+        "final_observations": ('f', np.float32, (config.observation_size,)),
+        "rewards": ('d', np.float64, ()),
+        "terminations": ('B', np.bool_, ()),
+        "truncations": ('B', np.bool_, ()),
+        "masks": ('b', np.int8, (config.num_actions,)),
+        "actions": ('q', np.int64, ()),
+    }
+
+
+def _buffer_views(raw_buffers, layout, num_envs):
+    return {name: np.frombuffer(raw_buffers[name], dtype=dtype).reshape((num_envs,) + shape)
+            for name, (_, dtype, shape) in layout.items()}
+
+
+def _worker(remote, parent_remote, raw_buffers, num_envs, first, count, env_kwargs, static_agents_fn):
+    # runs in a worker process: plays envs first..first+count-1 with their rows of the shared buffers as
+    # the StartupsVectorEnv buffers, so results are written straight into shared memory
+    parent_remote.close()
+    try:
+        if static_agents_fn is not None:
+            env_kwargs = dict(env_kwargs, static_agents=static_agents_fn())
+        games = StartupsVectorEnv(count, first_env=first, **env_kwargs)
+        views = _buffer_views(raw_buffers, _buffer_layout(games.config), num_envs)
+        rows = slice(first, first + count)
+        games._observations = views["observations"][rows]
+        games._rewards = views["rewards"][rows]
+        games._terminations = views["terminations"][rows]
+        games._truncations = views["truncations"][rows]
+        games._masks = views["masks"][rows]
+        games._bind_observations()
+        final_observations = views["final_observations"][rows]
+        actions = views["actions"][rows]
+        remote.send(("ready", None))
+    except Exception:
+        remote.send(("error", traceback.format_exc()))
+        return
+
+    while True:
+        command, data = remote.recv()
+        try:
+            if command == "step":
+                finished = games._step_games(actions)
+                for i, (obs, _) in finished.items():
+                    final_observations[i] = obs
+                # only the info dicts of finished games travel through the pipe
+                remote.send(("ok", {i: info for i, (_, info) in finished.items()}))
+            elif command == "reset":
+                games.reset(seed=data)
+                remote.send(("ok", None))
+            elif command == "close":
+                games.close()
+                remote.send(("ok", None))
+                return
+        except Exception:
+            remote.send(("error", traceback.format_exc()))
+
+
+class ParallelStartupsVectorEnv(VectorEnv):
+    """StartupsVectorEnv spread over worker processes, each playing a contiguous block of the games.
+
+    Observations, rewards, terminations, truncations, action masks and actions live in shared memory:
+    workers write their rows in place and the trainer reads them without pickling; only the info dicts
+    of finished games go through the pipes. step_async/step_wait let the trainer work while the games
+    run. Same observations, autoreset and infos as StartupsVectorEnv.
+
+    Static-agent opponents are built in each worker, by static_agents_fn (a picklable callable returning
+    the list, e.g. a functools.partial that loads Keras models) or else from static_agents, which are
+    then sent to the workers. Arguments must be picklable when the start method is spawn (Windows, macOS).
+    """
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs, num_workers=None, total_players=4, num_humans=0, default_company_list=None,
+                 static_agents=(), static_agents_fn=None, config=None, context=None, **env_kwargs):
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        self.config = config or sg.get_game_config(default_company_list, total_players)
+        self.num_envs = num_envs
+        probe = sr.StartupsEnv(total_players, num_humans, default_company_list, [], config=self.config)
+        self.single_observation_space = probe.observation_space
+        self.single_action_space = probe.action_space
+        probe.close()
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        ctx = multiprocessing.get_context(context)
+        layout = _buffer_layout(self.config)
+        raw_buffers = {name: ctx.RawArray(code, num_envs * int(np.prod(shape, dtype=np.int64)))
+                       for name, (code, _, shape) in layout.items()}
+        self._buffers = _buffer_views(raw_buffers, layout, num_envs)
+
+        env_kwargs = dict(env_kwargs, total_players=total_players, num_humans=num_humans,
+                          default_company_list=default_company_list, config=self.config)
+        if static_agents_fn is None:
+            env_kwargs["static_agents"] = list(static_agents)
+        self._remotes = []
+        self._processes = []
+        for first, count in _blocks(num_envs, num_workers):
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(target=_worker, daemon=True,
+                                  args=(worker_remote, remote, raw_buffers, num_envs, first, count, env_kwargs, static_agents_fn))
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append((first, count, process))
+        try:
+            self._receive_all()
+        except RuntimeError:
+            for _, _, process in self._processes:
+                process.terminate()
+            raise
+        self._waiting = False
+
+    def reset(self, seed=None, options=None):
+        """Start a new game everywhere; an int seed seeds env i with seed + i, a list gives one seed each"""
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+        for remote, (first, count, _) in zip(self._remotes, self._processes):
+            remote.send(("reset", seeds[first:first + count]))
+        self._receive_all()
+        return self._buffers["observations"].copy(), {"action_mask": self._buffers["masks"].copy()}
+
+    def step_async(self, actions):
+        self._buffers["actions"][:] = actions
+        for remote in self._remotes:
+            remote.send(("step", None))
+        self._waiting = True
+
+    def step_wait(self):
+        finished = {}
+        for (first, _, _), infos in zip(self._processes, self._receive_all()):
+            for i, info in infos.items():
+                finished[first + i] = (self._buffers["final_observations"][first + i].copy(), info)
+        self._waiting = False
+        buffers = self._buffers
+        return (buffers["observations"].copy(), buffers["rewards"].copy(), buffers["terminations"].copy(),
+                buffers["truncations"].copy(), step_infos(buffers["masks"], finished))
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def action_masks(self):
+        return self._buffers["masks"].copy()
+
+    def _receive_all(self):
+        replies = [remote.recv() for remote in self._remotes]
+        for status, data in replies:
+            if status == "error":
+                raise RuntimeError(f"StartupsEnv worker failed:\n{data}")
+        return [data for _, data in replies]
+
+    def close_extras(self, **kwargs):
+        if self._waiting:
+            self._receive_all()
+        for remote in self._remotes:
+            remote.send(("close", None))
+        try:
+            self._receive_all()
+        finally:
+            for _, _, process in self._processes:
+                process.join()
+            for remote in self._remotes:
+                remote.close()
+
+
+def _blocks(num_envs, num_workers):
+    """(first env, count) per worker, as even as possible"""
+    base, extra = divmod(num_envs, num_workers)
+    first = 0
+    for k in range(num_workers):
+        count = base + (k < extra)
+        yield first, count
+        first += count